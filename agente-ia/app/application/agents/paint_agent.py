@@ -8,6 +8,7 @@ from app.application.tools.visual_generation_tool import create_visual_generatio
 from app.domain.services.llm_client import ILLMClient
 from app.infrastructure.services.embedding_service import EmbeddingService
 from app.infrastructure.llm.prompt_templates.paint_prompt import SYSTEM_PROMPT
+from app.infrastructure.llm.rate_limit_governor import RateLimitGovernor
 from app.infrastructure.logging.logger import get_logger
 
 logger = get_logger(__name__)
@@ -20,13 +21,15 @@ class PaintAgent:
         api_client: APIClient,
         embedding_service: EmbeddingService,
         model: str = "gpt-4o-mini",
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        rate_limit_governor: Optional[RateLimitGovernor] = None
     ):
         self.llm_client = llm_client
         self.api_client = api_client
         self.embedding_service = embedding_service
         self.model = model
         self.temperature = temperature
+        self.rate_limit_governor = rate_limit_governor
         self._agent = None
         logger.info("paint_agent_initialized", model=model, temperature=temperature)
 
@@ -40,10 +43,13 @@ class PaintAgent:
             create_visual_generation_tool(self.llm_client)
         ]
         
-        # Criar modelo com temperature configurado
+        # Criar modelo com temperature configurado; as chamadas passam pelo controle de vazão
+        governor = self.rate_limit_governor
         llm = ChatOpenAI(
             model=self.model,
-            temperature=self.temperature
+            temperature=self.temperature,
+            http_client=governor.http_client() if governor else None,
+            http_async_client=governor.async_http_client() if governor else None
         )
         
         # create_agent não aceita temperature diretamente, usar modelo configurado
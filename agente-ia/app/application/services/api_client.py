@@ -1,16 +1,42 @@
 from typing import List, Dict, Optional
+import base64
 import httpx
 import time
+import numpy as np
 from app.infrastructure.logging.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Formatos de envio do embedding para o back-api: "json" (lista de floats) ou compactado
+PACKED_DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+
+def pack_embedding(embedding: List[float], dtype: str = "float32") -> Dict:
+    """Compacta o embedding em base64 de floats little-endian (campo packed_embedding do back-api)"""
+    data = np.asarray(embedding, dtype=PACKED_DTYPES[dtype]).tobytes()
+    return {
+        "dtype": dtype,
+        "dim": len(embedding),
+        "data": base64.b64encode(data).decode("ascii")
+    }
+
 
 class APIClient:
-    def __init__(self, base_url: str = "http://localhost:8000"):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        embedding_encoding: str = "float32",
+        min_score: Optional[float] = None,
+        diversity: Optional[float] = None
+    ):
+        if embedding_encoding != "json" and embedding_encoding not in PACKED_DTYPES:
+            raise ValueError("embedding_encoding deve ser 'json', 'float32' ou 'float16'")
         self.base_url = base_url
+        self.embedding_encoding = embedding_encoding
+        self.min_score = min_score
+        self.diversity = diversity
         self.client = httpx.AsyncClient(base_url=base_url, timeout=30.0)
-        logger.info("api_client_initialized", base_url=base_url)
+        logger.info("api_client_initialized", base_url=base_url, embedding_encoding=embedding_encoding, min_score=min_score, diversity=diversity)
 
     async def get_all_paints(
         self,
@@ -108,7 +134,10 @@ class APIClient:
         self,
         query_embedding: List[float],
         environment: Optional[str] = None,
-        top_k: int = 5
+        top_k: int = 5,
+        min_score: Optional[float] = None,
+        filters: Optional[Dict] = None,
+        diversity: Optional[float] = None
     ) -> List[Dict]:
         """
         Busca semântica via endpoint do back-api.
@@ -118,16 +147,24 @@ class APIClient:
             query_embedding: Embedding da query do usuário (gerado localmente)
             environment: "interno" ou "externo" (opcional)
             top_k: Número de resultados desejados
+            min_score: Similaridade mínima (padrão: o do cliente)
+            filters: Filtros de atributos (line, finish_type, surface_type, features_any, features_all)
+            diversity: Peso da diversidade (MMR) entre os resultados (padrão: o do cliente)
         
         Returns:
-            Lista de tintas encontradas
+            Lista de tintas encontradas, cada uma com distance/score
         """
-        payload = {
-            "embedding": query_embedding,
-            "top_k": top_k
-        }
+        payload = {"top_k": top_k}
+        payload.update(self._embedding_payload(query_embedding))
         if environment:
             payload["environment"] = environment
+        payload.update(self._filters_payload(filters))
+        diversity = diversity if diversity is not None else self.diversity
+        if diversity:
+            payload["diversity"] = diversity
+        min_score = min_score if min_score is not None else self.min_score
+        if min_score is not None:
+            payload["min_score"] = min_score
         
         start_time = time.time()
         try:
@@ -136,6 +173,7 @@ class APIClient:
                 method="POST",
                 endpoint="/api/v1/paints/search",
                 embedding_size=len(query_embedding),
+                embedding_encoding=self.embedding_encoding,
                 top_k=top_k,
                 environment=environment
             )
@@ -178,14 +216,107 @@ class APIClient:
             )
             raise
 
-    async def search_paints(self, query: str, environment: Optional[str] = None) -> List[Dict]:
-        """Busca simples por texto (fallback)"""
-        paints = await self.get_all_paints(environment=environment, limit=1000)
-        query_lower = query.lower()
-        filtered = []
-        for paint in paints:
-            if (query_lower in paint.get("name", "").lower() or
-                query_lower in paint.get("color", "").lower() or
-                query_lower in paint.get("surface_type", "").lower()):
-                filtered.append(paint)
-        return filtered[:10]
+    @staticmethod
+    def _filters_payload(filters: Optional[Dict]) -> Dict:
+        """Filtros de atributos preenchidos (o back-api os aplica dentro da busca vetorial)"""
+        return {name: value for name, value in (filters or {}).items() if value}
+
+    def _embedding_payload(self, query_embedding: List[float]) -> Dict:
+        """Campo do embedding no formato configurado (lista JSON ou compactado)"""
+        if self.embedding_encoding == "json":
+            return {"embedding": query_embedding}
+        return {"packed_embedding": pack_embedding(query_embedding, self.embedding_encoding)}
+
+    async def search_hybrid(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None,
+        environment: Optional[str] = None,
+        top_k: int = 5,
+        min_score: Optional[float] = None,
+        filters: Optional[Dict] = None,
+        diversity: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Busca híbrida via endpoint do back-api.
+        O back-api combina busca textual (full-text) e vetorial (pgvector) com
+        reciprocal rank fusion em uma única consulta no PostgreSQL.
+        
+        Args:
+            query: Texto da busca do usuário
+            query_embedding: Embedding da query (opcional; sem ele a busca é apenas textual)
+            environment: "interno" ou "externo" (opcional)
+            top_k: Número de resultados desejados
+            min_score: Similaridade mínima dos candidatos vetoriais (padrão: o do cliente)
+            filters: Filtros de atributos (line, finish_type, surface_type, features_any, features_all)
+            diversity: Peso da diversidade (MMR) entre os resultados (padrão: o do cliente)
+        
+        Returns:
+            Lista de tintas encontradas, cada uma com distance/score
+        """
+        payload = {"query": query, "top_k": top_k}
+        if query_embedding is not None:
+            payload.update(self._embedding_payload(query_embedding))
+        if environment:
+            payload["environment"] = environment
+        payload.update(self._filters_payload(filters))
+        diversity = diversity if diversity is not None else self.diversity
+        if diversity:
+            payload["diversity"] = diversity
+        min_score = min_score if min_score is not None else self.min_score
+        if min_score is not None:
+            payload["min_score"] = min_score
+        
+        start_time = time.time()
+        try:
+            logger.debug(
+                "api_request_started",
+                method="POST",
+                endpoint="/api/v1/paints/search/hybrid",
+                embedding_size=len(query_embedding) if query_embedding is not None else 0,
+                embedding_encoding=self.embedding_encoding,
+                top_k=top_k,
+                environment=environment
+            )
+            response = await self.client.post(
+                "/api/v1/paints/search/hybrid",
+                json=payload
+            )
+            response.raise_for_status()
+            result = response.json()
+            elapsed_time = time.time() - start_time
+            logger.info(
+                "api_request_success",
+                method="POST",
+                endpoint="/api/v1/paints/search/hybrid",
+                status_code=response.status_code,
+                results_count=len(result) if isinstance(result, list) else 1,
+                elapsed_time=round(elapsed_time, 3)
+            )
+            return result
+        except httpx.HTTPStatusError as e:
+            elapsed_time = time.time() - start_time
+            logger.error(
+                "api_request_http_error",
+                method="POST",
+                endpoint="/api/v1/paints/search/hybrid",
+                status_code=e.response.status_code,
+                elapsed_time=round(elapsed_time, 3),
+                exc_info=True
+            )
+            raise
+        except httpx.RequestError as e:
+            elapsed_time = time.time() - start_time
+            logger.error(
+                "api_request_network_error",
+                method="POST",
+                endpoint="/api/v1/paints/search/hybrid",
+                error=str(e),
+                elapsed_time=round(elapsed_time, 3),
+                exc_info=True
+            )
+            raise
+
+    async def search_paints(self, query: str, environment: Optional[str] = None, top_k: int = 10) -> List[Dict]:
+        """Busca por texto (full-text no back-api, sem embedding)"""
+        return await self.search_hybrid(query, environment=environment, top_k=top_k)
@@ -1,5 +1,5 @@
 from langchain.tools import tool
-from typing import Optional
+from typing import List, Optional
 import json
 import time
 from app.application.services.api_client import APIClient
@@ -16,65 +16,80 @@ def create_paint_search_tool(
     @tool
     async def retrieve_paint_context(
         query: str,
-        environment: Optional[str] = None
+        environment: Optional[str] = None,
+        finish_type: Optional[str] = None,
+        surface_type: Optional[str] = None,
+        line: Optional[str] = None,
+        features: Optional[List[str]] = None
     ) -> str:
         """
-        Busca tintas usando RAG (busca semântica).
-        Gera embedding da query localmente e envia para back-api que faz busca semântica.
+        Busca tintas usando RAG (busca híbrida: semântica + termos exatos).
+        Gera embedding da query localmente e envia, junto com o texto, para o back-api,
+        que combina busca vetorial e full-text (ex: nomes de cor como "Verde Garrafa").
         Retorna informações detalhadas das tintas mais relevantes baseado na query do usuário.
         
         Args:
             query: Texto de busca (ex: "tinta branca para quarto", "azul externo")
             environment: "interno" ou "externo" (opcional, filtra resultados)
+            finish_type: Acabamento exigido pelo usuário, ex: "fosco", "acetinado", "semibrilho" (opcional)
+            surface_type: Superfície exigida, ex: "madeira", "parede", "metal" (opcional)
+            line: Linha exigida: "Premium" ou "Standard" (opcional)
+            features: Características desejadas; retorna tintas com ao menos uma delas,
+                ex: ["lavável", "antimofo"] (opcional)
         
         Returns:
-            JSON string com tintas encontradas e seus detalhes completos
+            JSON string com tintas encontradas, seus detalhes completos e o score de relevância
+            (resultados vetoriais pouco similares já vêm descartados pelo back-api)
         """
         start_time = time.time()
         logger.info(
             "paint_search_tool_started",
             tool="retrieve_paint_context",
             query=query,
-            environment=environment
+            environment=environment,
+            finish_type=finish_type,
+            surface_type=surface_type,
+            line=line,
+            features=features
         )
         
         try:
             # 1. RAG: Gera embedding da query localmente
             logger.debug("generating_embedding", query=query)
-            query_embedding = await embedding_service.generate_embedding(query)
-            logger.debug("embedding_generated", embedding_size=len(query_embedding))
+            query_embedding = None
+            try:
+                query_embedding = await embedding_service.generate_embedding(query)
+                logger.debug("embedding_generated", embedding_size=len(query_embedding))
+            except Exception as e:
+                # Sem embedding o back-api ainda faz a parte textual da busca
+                logger.warning("embedding_failed", falling_back_to="text_search", error=str(e))
             
-            # 2. Busca semântica no back-api (que faz similarity search no PostgreSQL)
-            logger.info("semantic_search_started", environment=environment, top_k=5)
-            paints_data = await api_client.search_semantic(
+            # 2. Busca híbrida no back-api (full-text + similarity search no PostgreSQL),
+            # com os filtros de atributos aplicados dentro da própria busca
+            filters = {
+                "finish_type": finish_type,
+                "surface_type": surface_type,
+                "line": line,
+                "features_any": features
+            }
+            logger.info("hybrid_search_started", environment=environment, top_k=5)
+            paints_data = await api_client.search_hybrid(
+                query=query,
                 query_embedding=query_embedding,
                 environment=environment,
-                top_k=5
+                top_k=5,
+                filters=filters
             )
             
-            if paints_data:
-                elapsed_time = time.time() - start_time
-                logger.info(
-                    "paint_search_tool_success",
-                    tool="retrieve_paint_context",
-                    results_count=len(paints_data),
-                    elapsed_time=round(elapsed_time, 3),
-                    method="semantic_search"
-                )
-                return json.dumps(paints_data, ensure_ascii=False)
-            
-            # 3. Fallback: busca simples por texto se RAG não retornar resultados
-            logger.warning("semantic_search_empty", falling_back_to="text_search")
-            paints = await api_client.search_paints(query, environment)
             elapsed_time = time.time() - start_time
             logger.info(
                 "paint_search_tool_success",
                 tool="retrieve_paint_context",
-                results_count=len(paints[:5]),
+                results_count=len(paints_data),
                 elapsed_time=round(elapsed_time, 3),
-                method="text_search_fallback"
+                method="hybrid_search" if query_embedding is not None else "text_search"
             )
-            return json.dumps(paints[:5], ensure_ascii=False)
+            return json.dumps(paints_data, ensure_ascii=False)
             
         except Exception as e:
             elapsed_time = time.time() - start_time
@@ -2,6 +2,7 @@ from dotenv import load_dotenv
 load_dotenv()
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
+from typing import Optional
 
 class OpenAISettings(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="OPENAI_")
@@ -13,6 +14,24 @@ class OpenAISettings(BaseSettings):
 class APISettings(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="API_")
     base_url: str = Field(default="http://localhost:8000", description="URL base da API back-api")
+    embedding_encoding: str = Field(default="float32", description="Envio do embedding na busca: 'float32', 'float16' (compactados) ou 'json'")
+    min_score: Optional[float] = Field(default=0.3, ge=-1, le=1, description="Similaridade mínima dos resultados vetoriais da busca (None desativa)")
+    diversity: Optional[float] = Field(default=None, ge=0, le=1, description="Peso da diversidade (MMR) dos resultados da busca, evitando várias cores do mesmo produto (None desativa)")
+
+
+class EmbeddingSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="EMBEDDING_")
+    provider: str = Field(default="openai", pattern="^(openai|local)$", description="Provedor dos embeddings das queries: 'openai' ou 'local' (hashing em CPU); deve ser o mesmo do back-api")
+
+
+class RateLimitSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="RATE_LIMIT_")
+    enabled: bool = Field(default=True, description="Passa as chamadas à OpenAI (chat, embeddings, imagens) por token buckets por modelo, dimensionados pelos cabeçalhos x-ratelimit-*")
+    headroom: float = Field(default=0.9, gt=0, le=1, description="Fração do limite informado pela OpenAI usada pelo processo")
+    requests_per_minute: Optional[int] = Field(default=None, ge=1, description="Limite de requisições por minuto até a primeira resposta de cada modelo (None: sem limite até lá)")
+    tokens_per_minute: Optional[int] = Field(default=None, ge=1, description="Limite de tokens por minuto até a primeira resposta de cada modelo (None: sem limite até lá)")
+    backoff_base_seconds: float = Field(default=1.0, gt=0, description="Espera após um 429 sem retry-after; dobra a cada 429 seguido")
+    backoff_max_seconds: float = Field(default=60.0, gt=0, description="Espera máxima após um 429")
 
 
 class DatabaseSettings(BaseSettings):
@@ -24,6 +43,8 @@ class Settings:
     def __init__(self):
         self.openai = OpenAISettings()
         self.api = APISettings()
+        self.embedding = EmbeddingSettings()
+        self.rate_limit = RateLimitSettings()
         self.database = DatabaseSettings()
     
     @property
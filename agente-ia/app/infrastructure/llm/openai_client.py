@@ -3,6 +3,7 @@ import time
 from openai import AsyncOpenAI
 from app.infrastructure.config.settings import settings
 from app.infrastructure.logging.logger import get_logger
+from app.infrastructure.llm.rate_limit_governor import get_rate_limit_governor
 from app.domain.services.llm_client import ILLMClient
 from app.infrastructure.services.embedding_service import IEmbeddingClient
 
@@ -12,7 +13,12 @@ logger = get_logger(__name__)
 class OpenAIClient(ILLMClient, IEmbeddingClient):
     def __init__(self):
         self.api_key = settings.openai.api_key
-        self.client = AsyncOpenAI(api_key=self.api_key)
+        # Embeddings e imagens passam pelo controle de vazão compartilhado com o ChatOpenAI do agente
+        governor = get_rate_limit_governor()
+        self.client = AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=governor.async_http_client() if governor else None
+        )
         self.model = settings.openai.model
         self.embedding_model = settings.openai.embedding_model
         logger.info("openai_client_initialized", model=self.model, embedding_model=self.embedding_model)
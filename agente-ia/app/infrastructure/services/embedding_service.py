@@ -14,7 +14,7 @@ class IEmbeddingClient(ABC):
 
 
 class EmbeddingService:
-    """Serviço para geração de embeddings usando OpenAI"""
+    """Serviço para geração de embeddings (OpenAI ou LocalEmbeddingClient, conforme EMBEDDING_PROVIDER)"""
     def __init__(self, embedding_client: IEmbeddingClient, model: str = "text-embedding-3-small"):
         self.embedding_client = embedding_client
         self.model = model
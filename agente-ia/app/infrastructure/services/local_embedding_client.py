@@ -0,0 +1,57 @@
+from collections import Counter
+from typing import Dict, List
+import hashlib
+import math
+import re
+import unicodedata
+import numpy as np
+from app.infrastructure.services.embedding_service import IEmbeddingClient
+from app.infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Mesmos valores do LocalHashingEmbeddingProvider do back-api: os vetores das queries
+# precisam ser idênticos aos gravados no catálogo com EMBEDDING_PROVIDER=local
+LOCAL_EMBEDDING_DIMENSIONS = 1536
+LOCAL_EMBEDDING_MODEL = f"local-hashing-{LOCAL_EMBEDDING_DIMENSIONS}"
+LOCAL_WORD_WEIGHT = 1.0
+LOCAL_BIGRAM_WEIGHT = 0.5
+LOCAL_TRIGRAM_WEIGHT = 0.25
+
+
+def local_features(text: str) -> Dict[str, float]:
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(char for char in normalized if not unicodedata.combining(char))
+    words = re.findall(r"[a-z0-9]+", normalized)
+
+    counts: Counter = Counter()
+    for word in words:
+        counts[f"w:{word}"] += 1
+        padded = f"<{word}>"
+        for start in range(len(padded) - 2):
+            counts[f"c:{padded[start:start + 3]}"] += 1
+    for first, second in zip(words, words[1:]):
+        counts[f"b:{first} {second}"] += 1
+
+    weights = {"w": LOCAL_WORD_WEIGHT, "b": LOCAL_BIGRAM_WEIGHT, "c": LOCAL_TRIGRAM_WEIGHT}
+    return {
+        feature: weights[feature[0]] * (1.0 + math.log(count))
+        for feature, count in counts.items()
+    }
+
+
+class LocalEmbeddingClient(IEmbeddingClient):
+    """Embeddings locais por hashing de features (CPU, sem rede); mesmo algoritmo do back-api"""
+    def __init__(self, dimensions: int = LOCAL_EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+        logger.info("local_embedding_client_initialized", model=LOCAL_EMBEDDING_MODEL)
+
+    async def create_embedding(self, text: str, model: str = None) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float64)
+        for feature, weight in local_features(text).items():
+            value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[value % self.dimensions] += weight if value >> 63 else -weight
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            raise ValueError("Texto sem termos para gerar embedding local")
+        return (vector / norm).astype(np.float32).tolist()
@@ -1,11 +1,13 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
 from app.infrastructure.llm.openai_client import OpenAIClient
+from app.infrastructure.llm.rate_limit_governor import get_rate_limit_governor
 from app.domain.services.llm_client import ILLMClient
 from app.application.services.api_client import APIClient
 from app.application.agents.paint_agent import PaintAgent
 from app.infrastructure.config.settings import settings
 from app.infrastructure.services.embedding_service import EmbeddingService
+from app.infrastructure.services.local_embedding_client import LocalEmbeddingClient, LOCAL_EMBEDDING_MODEL
 from app.domain.repositories.conversation_repository import ConversationRepository
 from app.infrastructure.repositories.conversation_repository_impl import ConversationRepositoryImpl
 from app.infrastructure.database.connection import get_db
@@ -16,12 +18,19 @@ def get_openai_client() -> OpenAIClient:
 
 
 def get_api_client() -> APIClient:
-    return APIClient(base_url=settings.api.base_url)
+    return APIClient(
+        base_url=settings.api.base_url,
+        embedding_encoding=settings.api.embedding_encoding,
+        min_score=settings.api.min_score,
+        diversity=settings.api.diversity
+    )
 
 
 def get_embedding_service(
     openai_client: OpenAIClient = Depends(get_openai_client)
 ) -> EmbeddingService:
+    if settings.embedding.provider == "local":
+        return EmbeddingService(embedding_client=LocalEmbeddingClient(), model=LOCAL_EMBEDDING_MODEL)
     return EmbeddingService(embedding_client=openai_client, model=settings.openai.embedding_model)
 
 
@@ -38,5 +47,6 @@ def get_paint_agent(
         llm_client=llm_client,
         api_client=api_client,
         embedding_service=embedding_service,
-        model=settings.openai.model
+        model=settings.openai.model,
+        rate_limit_governor=get_rate_limit_governor()
     )
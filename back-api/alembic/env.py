@@ -14,6 +14,7 @@ from app.infrastructure.config.settings import settings
 from app.infrastructure.database.models import PaintModel 
 from app.infrastructure.database.models import UserModel  
 from app.infrastructure.database.models import SessionModel  
+from app.infrastructure.database.models import EmbeddingCacheModel
 
 config = context.config
 
@@ -0,0 +1,49 @@
+"""Add per-environment partial vector indexes
+
+Revision ID: a2c3d4e5f6a7
+Revises: f0a1b2c3d4e5
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2c3d4e5f6a7'
+down_revision: Union[str, Sequence[str], None] = 'f0a1b2c3d4e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENVIRONMENTS = ('interno', 'externo')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Um índice por ambiente: a busca filtrada percorre só o grafo do ambiente,
+    # sem descartar vizinhos do outro. A consulta precisa trazer o ambiente como
+    # literal (environment = 'interno') para o planejador escolher o índice parcial.
+    for environment in ENVIRONMENTS:
+        op.execute(f"""
+            CREATE INDEX paints_embedding_{environment}_idx 
+            ON paints 
+            USING hnsw (embedding vector_cosine_ops)
+            WITH (m = 16, ef_construction = 64)
+            WHERE environment = '{environment}'
+        """)
+        op.execute(f"""
+            CREATE INDEX paints_embedding_short_{environment}_idx 
+            ON paints 
+            USING hnsw (embedding_short halfvec_cosine_ops)
+            WITH (m = 16, ef_construction = 64)
+            WHERE environment = '{environment}'
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for environment in ENVIRONMENTS:
+        op.execute(f'DROP INDEX IF EXISTS paints_embedding_short_{environment}_idx')
+        op.execute(f'DROP INDEX IF EXISTS paints_embedding_{environment}_idx')
@@ -0,0 +1,36 @@
+"""Add binary quantized embedding index
+
+Revision ID: b3d4e5f6a7b8
+Revises: a2c3d4e5f6a7
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d4e5f6a7b8'
+down_revision: Union[str, Sequence[str], None] = 'a2c3d4e5f6a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Índice de expressão sobre o sinal de cada dimensão (192 bytes por linha):
+    # etapa inicial da busca com SEARCH_FIRST_PASS=binary, reordenada pelo vetor completo.
+    # A expressão precisa ser idêntica à usada em PaintRepositoryImpl._nearest_sql
+    op.execute("""
+        CREATE INDEX paints_embedding_binary_idx 
+        ON paints 
+        USING hnsw ((CAST(binary_quantize(embedding) AS bit(1536))) bit_hamming_ops)
+        WITH (m = 16, ef_construction = 64)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP INDEX IF EXISTS paints_embedding_binary_idx')
@@ -0,0 +1,38 @@
+"""Create embedding cache table
+
+Revision ID: c4e5f6a7b8c9
+Revises: b3d4e5f6a7b8
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e5f6a7b8c9'
+down_revision: Union[str, Sequence[str], None] = 'b3d4e5f6a7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Cache de embeddings endereçado pelo conteúdo: sha256(modelo + texto) -> embedding.
+    # Compartilhado pela API e pelo ETL; não referencia paints (sobrevive a recargas do catálogo)
+    op.create_table(
+        'embedding_cache',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('embedding', Vector(1536), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('embedding_cache')
@@ -0,0 +1,44 @@
+"""Replace untrained ivfflat embedding index with hnsw
+
+Revision ID: c7d1e2f3a4b5
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d1e2f3a4b5'
+down_revision: Union[str, Sequence[str], None] = 'a1b2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # O ivfflat anterior foi criado com a tabela vazia: os centróides (lists = 100)
+    # nunca foram treinados com dados reais. O hnsw não depende de treino e pode ser
+    # criado em tabela vazia; para trocar de método ou reajustar parâmetros depois,
+    # use POST /api/v1/paints/vector-index/rebuild.
+    op.execute('DROP INDEX IF EXISTS paints_embedding_idx')
+    op.execute("""
+        CREATE INDEX paints_embedding_idx 
+        ON paints 
+        USING hnsw (embedding vector_cosine_ops)
+        WITH (m = 16, ef_construction = 64)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP INDEX IF EXISTS paints_embedding_idx')
+    op.execute("""
+        CREATE INDEX paints_embedding_idx 
+        ON paints 
+        USING ivfflat (embedding vector_cosine_ops)
+        WITH (lists = 100)
+    """)
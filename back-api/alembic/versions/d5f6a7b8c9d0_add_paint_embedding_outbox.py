@@ -0,0 +1,56 @@
+"""Add paint embedding outbox columns
+
+Revision ID: d5f6a7b8c9d0
+Revises: c4e5f6a7b8c9
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f6a7b8c9d0'
+down_revision: Union[str, Sequence[str], None] = 'c4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Outbox de embeddings: a tinta é gravada como 'pending' e o EmbeddingWorker
+    # gera o embedding depois ('ready'), com novas tentativas até 'failed'
+    op.execute("""
+        ALTER TABLE paints
+        ADD COLUMN embedding_status varchar(10) NOT NULL DEFAULT 'pending',
+        ADD COLUMN embedding_attempts integer NOT NULL DEFAULT 0,
+        ADD COLUMN embedding_error text,
+        ADD COLUMN embedding_next_attempt_at timestamptz,
+        ADD COLUMN embedding_locked_until timestamptz
+    """)
+    op.execute("UPDATE paints SET embedding_status = 'ready' WHERE embedding IS NOT NULL")
+    op.create_check_constraint(
+        'check_embedding_status',
+        'paints',
+        "embedding_status IN ('pending', 'ready', 'failed')"
+    )
+    
+    # Fila do worker: só as linhas pendentes, na ordem em que são reivindicadas
+    op.execute("""
+        CREATE INDEX paints_embedding_pending_idx
+        ON paints (embedding_next_attempt_at NULLS FIRST, id)
+        WHERE embedding_status = 'pending'
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP INDEX IF EXISTS paints_embedding_pending_idx')
+    op.drop_constraint('check_embedding_status', 'paints', type_='check')
+    op.drop_column('paints', 'embedding_locked_until')
+    op.drop_column('paints', 'embedding_next_attempt_at')
+    op.drop_column('paints', 'embedding_error')
+    op.drop_column('paints', 'embedding_attempts')
+    op.drop_column('paints', 'embedding_status')
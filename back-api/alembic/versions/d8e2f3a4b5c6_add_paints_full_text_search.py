@@ -0,0 +1,58 @@
+"""Add full-text search column to paints
+
+Revision ID: d8e2f3a4b5c6
+Revises: c7d1e2f3a4b5
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e2f3a4b5c6'
+down_revision: Union[str, Sequence[str], None] = 'c7d1e2f3a4b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('ALTER TABLE paints ADD COLUMN IF NOT EXISTS search_tsv tsvector')
+    
+    # Trigger em vez de coluna gerada: array_to_string (features) não é IMMUTABLE.
+    # Pesos: nome/cor (A) > acabamento/superfície (B) > características (C)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION paints_search_tsv_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_tsv :=
+                setweight(to_tsvector('portuguese', coalesce(NEW.name, '')), 'A') ||
+                setweight(to_tsvector('portuguese', coalesce(NEW.color, '')), 'A') ||
+                setweight(to_tsvector('portuguese', coalesce(NEW.finish_type, '')), 'B') ||
+                setweight(to_tsvector('portuguese', coalesce(NEW.surface_type, '')), 'B') ||
+                setweight(to_tsvector('portuguese', coalesce(array_to_string(NEW.features, ' '), '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER paints_search_tsv_trigger
+        BEFORE INSERT OR UPDATE OF name, color, surface_type, finish_type, features
+        ON paints
+        FOR EACH ROW EXECUTE FUNCTION paints_search_tsv_update()
+    """)
+    
+    # Preenche as linhas existentes (o UPDATE dispara o trigger)
+    op.execute('UPDATE paints SET name = name')
+    
+    op.execute('CREATE INDEX paints_search_tsv_idx ON paints USING gin (search_tsv)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP INDEX IF EXISTS paints_search_tsv_idx')
+    op.execute('DROP TRIGGER IF EXISTS paints_search_tsv_trigger ON paints')
+    op.execute('DROP FUNCTION IF EXISTS paints_search_tsv_update()')
+    op.execute('ALTER TABLE paints DROP COLUMN IF EXISTS search_tsv')
@@ -0,0 +1,45 @@
+"""Add unique index on normalized paint name
+
+Revision ID: e6a7b8c9d0e1
+Revises: d5f6a7b8c9d0
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a7b8c9d0e1'
+down_revision: Union[str, Sequence[str], None] = 'd5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nomes repetidos (sem diferenciar maiúsculas nem espaços nas pontas) impedem o índice.
+    # Não remove nada sozinha: quais tintas manter é decisão de quem revisa os dados.
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT lower(btrim(name)) AS normalized_name, array_agg(id ORDER BY id) AS ids
+        FROM paints
+        GROUP BY lower(btrim(name))
+        HAVING count(*) > 1
+        ORDER BY normalized_name
+    """)).fetchall()
+    if duplicates:
+        listing = "\n".join(f"  - '{row.normalized_name}': ids {list(row.ids)}" for row in duplicates)
+        raise RuntimeError(
+            f"{len(duplicates)} nomes de tinta repetidos (sem diferenciar maiúsculas nem espaços nas pontas).\n"
+            f"{listing}\n"
+            "Remova ou renomeie as duplicatas e rode a migração novamente."
+        )
+    # A expressão precisa ser idêntica ao ON CONFLICT de PaintRepositoryImpl.upsert_many
+    op.execute('CREATE UNIQUE INDEX paints_name_normalized_key ON paints (lower(btrim(name)))')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP INDEX IF EXISTS paints_name_normalized_key')
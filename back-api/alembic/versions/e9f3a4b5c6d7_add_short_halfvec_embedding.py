@@ -0,0 +1,63 @@
+"""Add reduced-dimension halfvec embedding column
+
+Revision ID: e9f3a4b5c6d7
+Revises: d8e2f3a4b5c6
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9f3a4b5c6d7'
+down_revision: Union[str, Sequence[str], None] = 'd8e2f3a4b5c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Requer pgvector >= 0.7 (halfvec, subvector, l2_normalize)
+    op.execute('ALTER TABLE paints ADD COLUMN IF NOT EXISTS embedding_short halfvec(256)')
+    
+    # Os embeddings text-embedding-3 podem ser encurtados: as primeiras 256 dimensões
+    # renormalizadas equivalem a pedir dimensions=256 à OpenAI. O trigger mantém a
+    # coluna em sincronia com o embedding completo.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION paints_embedding_short_update() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.embedding IS NULL THEN
+                NEW.embedding_short := NULL;
+            ELSE
+                NEW.embedding_short := l2_normalize(subvector(NEW.embedding, 1, 256))::halfvec(256);
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER paints_embedding_short_trigger
+        BEFORE INSERT OR UPDATE OF embedding
+        ON paints
+        FOR EACH ROW EXECUTE FUNCTION paints_embedding_short_update()
+    """)
+    
+    op.execute('UPDATE paints SET embedding = embedding WHERE embedding IS NOT NULL')
+    
+    op.execute("""
+        CREATE INDEX paints_embedding_short_idx 
+        ON paints 
+        USING hnsw (embedding_short halfvec_cosine_ops)
+        WITH (m = 16, ef_construction = 64)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP INDEX IF EXISTS paints_embedding_short_idx')
+    op.execute('DROP TRIGGER IF EXISTS paints_embedding_short_trigger ON paints')
+    op.execute('DROP FUNCTION IF EXISTS paints_embedding_short_update()')
+    op.execute('ALTER TABLE paints DROP COLUMN IF EXISTS embedding_short')
@@ -0,0 +1,38 @@
+"""Add indexes for paint attribute filters
+
+Revision ID: f0a1b2c3d4e5
+Revises: e9f3a4b5c6d7
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0a1b2c3d4e5'
+down_revision: Union[str, Sequence[str], None] = 'e9f3a4b5c6d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # As expressões precisam ser idênticas às usadas em PaintRepositoryImpl._attribute_filter_sql
+    op.execute('CREATE INDEX paints_finish_type_lower_idx ON paints (lower(finish_type))')
+    # surface_type é uma lista separada por vírgulas ("parede, concreto, gesso")
+    op.execute(r"""
+        CREATE INDEX paints_surface_types_idx 
+        ON paints 
+        USING gin (regexp_split_to_array(lower(btrim(surface_type)), '\s*,\s*'))
+    """)
+    op.execute('CREATE INDEX paints_features_idx ON paints USING gin (features)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP INDEX IF EXISTS paints_features_idx')
+    op.execute('DROP INDEX IF EXISTS paints_surface_types_idx')
+    op.execute('DROP INDEX IF EXISTS paints_finish_type_lower_idx')
@@ -1,9 +1,95 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from dataclasses import replace
 from datetime import datetime
+import asyncio
+import base64
+import binascii
+import json
 from sqlalchemy.orm import Session
-from app.domain.entities.paint import Paint
+from app.domain.entities.paint import Paint, normalize_paint_name
+from app.domain.entities.search import SemanticSearchQuery, PaintSearchHit, PaintSearchFilters, SearchExplanation
 from app.domain.repositories.paint_repository import PaintRepository
-from app.infrastructure.services.embedding_service import EmbeddingService
+from app.domain.repositories.embedding_cache_repository import EmbeddingCacheRepository
+from app.infrastructure.services.embedding_service import AsyncEmbeddingService, EmbeddingService, embedding_cache_key
+from app.infrastructure.cache.lru_cache import LRUCache
+from app.infrastructure.cache.search_result_cache import SearchResultCache, embedding_fingerprint
+import numpy as np
+
+# Maior deslocamento alcançável por cursor: índices hnsw devolvem no máximo
+# ef_search (<= 1000) linhas por varredura
+MAX_SEARCH_OFFSET = 500
+
+
+def _paint_text(paint: Paint) -> str:
+    """Texto do embedding de uma tinta (o mesmo de generate_embedding_for_paint)"""
+    return EmbeddingService.build_paint_text(
+        name=paint.name,
+        color=paint.color,
+        surface_type=paint.surface_type,
+        environment=paint.environment,
+        finish_type=paint.finish_type,
+        features=paint.features,
+        line=paint.line
+    )
+
+
+def _embed_paint_texts(
+    embedding_service: EmbeddingService,
+    texts: List[str],
+    embedding_cache: Optional[EmbeddingCacheRepository]
+) -> List[List[float]]:
+    """Embeddings dos textos, na ordem da entrada; só os ausentes do cache vão ao provedor (uma vez cada)"""
+    if embedding_cache is None:
+        return embedding_service.generate_embeddings(texts)
+    keys = [embedding_cache_key(embedding_service.model, text) for text in texts]
+    found = embedding_cache.get_many(keys)
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            missing.setdefault(key, text)
+    if missing:
+        generated = dict(zip(missing, embedding_service.generate_embeddings(list(missing.values()))))
+        embedding_cache.put_many(embedding_service.model, generated)
+        found.update(generated)
+    return [found[key] for key in keys]
+
+
+async def _embed_paint_texts_async(
+    embedding_service: AsyncEmbeddingService,
+    texts: List[str],
+    embedding_cache: Optional[EmbeddingCacheRepository]
+) -> List[List[float]]:
+    """Versão assíncrona de _embed_paint_texts (cache consultado em thread separada)"""
+    if embedding_cache is None:
+        return await embedding_service.generate_embeddings(texts)
+    keys = [embedding_cache_key(embedding_service.model, text) for text in texts]
+    found = await asyncio.to_thread(embedding_cache.get_many, keys)
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            missing.setdefault(key, text)
+    if missing:
+        generated = dict(zip(missing, await embedding_service.generate_embeddings(list(missing.values()))))
+        await asyncio.to_thread(embedding_cache.put_many, embedding_service.model, generated)
+        found.update(generated)
+    return [found[key] for key in keys]
+
+
+async def _embed_paint_text_async(
+    embedding_service: AsyncEmbeddingService,
+    text: str,
+    embedding_cache: Optional[EmbeddingCacheRepository]
+) -> List[float]:
+    """Versão assíncrona de _embed_paint_texts para um texto (cache consultado em thread separada)"""
+    if embedding_cache is None:
+        return await embedding_service.generate_embedding(text)
+    key = embedding_cache_key(embedding_service.model, text)
+    cached = (await asyncio.to_thread(embedding_cache.get_many, [key])).get(key)
+    if cached is not None:
+        return cached
+    embedding = await embedding_service.generate_embedding(text)
+    await asyncio.to_thread(embedding_cache.put_many, embedding_service.model, {key: embedding})
+    return embedding
 
 
 def create_paint(
@@ -15,7 +101,9 @@ def create_paint(
     finish_type: str,
     features: List[str],
     line: str,
-    embedding_service: EmbeddingService
+    embedding_service: EmbeddingService,
+    result_cache: Optional[SearchResultCache] = None,
+    embedding_cache: Optional[EmbeddingCacheRepository] = None
 ) -> Paint:
     """
     Cria uma nova tinta e gera embedding automaticamente.
@@ -30,12 +118,14 @@ def create_paint(
         features: Lista de features
         line: Linha da tinta
         embedding_service: Serviço para gerar embeddings (obrigatório)
+        result_cache: Cache de resultados de busca a invalidar (opcional)
+        embedding_cache: Cache persistente de embeddings, consultado antes do provedor (opcional)
     
     Returns:
         Paint: Tinta criada
         
     Raises:
-        ValueError: Se não conseguir gerar embedding
+        ValueError: Se não conseguir gerar embedding ou se o nome já existir
     """
     now = datetime.now()
     paint = Paint(
@@ -56,24 +146,290 @@ def create_paint(
     
     # Gerar embedding automaticamente (obrigatório)
     try:
-        embedding = embedding_service.generate_embedding_for_paint(
-            name=created_paint.name,
-            color=created_paint.color,
-            surface_type=created_paint.surface_type,
-            environment=created_paint.environment,
-            finish_type=created_paint.finish_type,
-            features=created_paint.features,
-            line=created_paint.line
-        )
+        embedding = _embed_paint_texts(embedding_service, [_paint_text(created_paint)], embedding_cache)[0]
         repository.update_embedding(created_paint.id, embedding)
     except Exception as e:
         # Se falhar ao gerar embedding, deletar a tinta criada
         repository.delete(created_paint.id)
         raise ValueError(f"Erro ao gerar embedding para a tinta: {str(e)}")
     
+    if result_cache is not None:
+        result_cache.invalidate()
+    return created_paint
+
+
+async def create_paint_async(
+    repository: PaintRepository,
+    name: str,
+    color: str,
+    surface_type: str,
+    environment: str,
+    finish_type: str,
+    features: List[str],
+    line: str,
+    embedding_service: AsyncEmbeddingService,
+    result_cache: Optional[SearchResultCache] = None,
+    embedding_cache: Optional[EmbeddingCacheRepository] = None
+) -> Paint:
+    """
+    Versão assíncrona de create_paint.
+    
+    O embedding é aguardado sem bloquear o event loop; as operações no banco
+    (sessão síncrona) rodam em thread separada.
+    
+    Raises:
+        ValueError: Se não conseguir gerar embedding ou se o nome já existir
+    """
+    now = datetime.now()
+    paint = Paint(
+        id=0,  # Será definido pelo banco
+        name=name,
+        color=color,
+        surface_type=surface_type,
+        environment=environment,
+        finish_type=finish_type,
+        features=features,
+        line=line,
+        created_at=now,
+        updated_at=now
+    )
+    
+    # Criar tinta no banco
+    created_paint = await asyncio.to_thread(repository.create, paint)
+    
+    # Gerar embedding automaticamente (obrigatório)
+    try:
+        embedding = await _embed_paint_text_async(embedding_service, _paint_text(created_paint), embedding_cache)
+        await asyncio.to_thread(repository.update_embedding, created_paint.id, embedding)
+    except Exception as e:
+        # Se falhar ao gerar embedding, deletar a tinta criada
+        await asyncio.to_thread(repository.delete, created_paint.id)
+        raise ValueError(f"Erro ao gerar embedding para a tinta: {str(e)}")
+    
+    if result_cache is not None:
+        result_cache.invalidate()
     return created_paint
 
 
+def create_paint_deferred(
+    repository: PaintRepository,
+    name: str,
+    color: str,
+    surface_type: str,
+    environment: str,
+    finish_type: str,
+    features: List[str],
+    line: str,
+    result_cache: Optional[SearchResultCache] = None
+) -> Paint:
+    """
+    Cria uma nova tinta com embedding_status 'pending' (outbox).
+    
+    O embedding é gerado depois pelo worker de embeddings, então a escrita não
+    depende do provedor. Até lá a tinta não aparece na busca semântica.
+    
+    Returns:
+        Paint: Tinta criada
+        
+    Raises:
+        ValueError: Se o nome já existir
+    """
+    now = datetime.now()
+    paint = Paint(
+        id=0,  # Será definido pelo banco
+        name=name,
+        color=color,
+        surface_type=surface_type,
+        environment=environment,
+        finish_type=finish_type,
+        features=features,
+        line=line,
+        created_at=now,
+        updated_at=now
+    )
+    created_paint = repository.create(paint)
+    if result_cache is not None:
+        result_cache.invalidate()
+    return created_paint
+
+
+def create_paints(
+    repository: PaintRepository,
+    paints: List[Dict],
+    embedding_service: EmbeddingService,
+    result_cache: Optional[SearchResultCache] = None,
+    embedding_cache: Optional[EmbeddingCacheRepository] = None
+) -> List[Paint]:
+    """
+    Cria várias tintas, gerando os embeddings em lote (poucas requisições ao provedor)
+    e gravando tudo com INSERTs de várias linhas em uma transação.
+    
+    Os embeddings são gerados antes de gravar: se o lote falhar, nenhuma tinta é criada.
+    
+    Args:
+        repository: Repositório de tintas
+        paints: Dicionários com name, color, surface_type, environment,
+            finish_type, features e line
+        embedding_service: Serviço para gerar embeddings (obrigatório)
+        result_cache: Cache de resultados de busca a invalidar (opcional)
+        embedding_cache: Cache persistente de embeddings, consultado antes do provedor (opcional)
+    
+    Returns:
+        List[Paint]: Tintas criadas, na ordem da entrada
+        
+    Raises:
+        ValueError: Se não conseguir gerar os embeddings
+    """
+    if not paints:
+        return []
+    embeddings = _embed_paint_dicts(embedding_service, paints, embedding_cache)
+    created_paints = repository.create_many(_paints_from_dicts(paints), embeddings)
+    
+    if result_cache is not None:
+        result_cache.invalidate()
+    return created_paints
+
+
+def upsert_paints(
+    repository: PaintRepository,
+    paints: List[Dict],
+    embedding_service: EmbeddingService,
+    result_cache: Optional[SearchResultCache] = None,
+    embedding_cache: Optional[EmbeddingCacheRepository] = None
+) -> Tuple[List[Paint], List[Paint]]:
+    """
+    Cria ou atualiza várias tintas pelo nome (sem diferenciar maiúsculas nem espaços
+    nas pontas), com os embeddings gerados em lote: reexecutar com os mesmos dados
+    não altera nada.
+    
+    Nomes repetidos na entrada valem pela primeira ocorrência. Com embedding_cache,
+    tintas já carregadas antes não geram requisições ao provedor.
+    
+    Args:
+        repository: Repositório de tintas
+        paints: Dicionários com name, color, surface_type, environment,
+            finish_type, features e line
+        embedding_service: Serviço para gerar embeddings (obrigatório)
+        result_cache: Cache de resultados de busca a invalidar (opcional)
+        embedding_cache: Cache persistente de embeddings, consultado antes do provedor (opcional)
+    
+    Returns:
+        Tuple[List[Paint], List[Paint]]: (criadas, atualizadas); as sem mudança não aparecem
+        
+    Raises:
+        ValueError: Se não conseguir gerar os embeddings
+    """
+    batch = unique_paints(paints)
+    if not batch:
+        return [], []
+    embeddings = _embed_paint_dicts(embedding_service, batch, embedding_cache)
+    return upsert_embedded_paints(repository, batch, embeddings, result_cache)
+
+
+async def embed_paints_async(
+    embedding_service: AsyncEmbeddingService,
+    paints: List[Dict],
+    embedding_cache: Optional[EmbeddingCacheRepository] = None
+) -> Tuple[List[Dict], List[List[float]]]:
+    """
+    Etapa de embeddings de upsert_paints, assíncrona (para sobrepor a gravação de um
+    lote com os embeddings dos próximos; ver upsert_embedded_paints).
+    
+    Returns:
+        (tintas sem nomes repetidos, embeddings na mesma ordem)
+        
+    Raises:
+        ValueError: Se não conseguir gerar os embeddings
+    """
+    batch = unique_paints(paints)
+    if not batch:
+        return [], []
+    try:
+        texts = [_paint_dict_text(paint_data) for paint_data in batch]
+        return batch, await _embed_paint_texts_async(embedding_service, texts, embedding_cache)
+    except Exception as e:
+        raise ValueError(f"Erro ao gerar embeddings para as tintas: {str(e)}")
+
+
+def upsert_embedded_paints(
+    repository: PaintRepository,
+    paints: List[Dict],
+    embeddings: List[List[float]],
+    result_cache: Optional[SearchResultCache] = None
+) -> Tuple[List[Paint], List[Paint]]:
+    """
+    Etapa de gravação de upsert_paints: grava tintas cujos embeddings já foram gerados
+    (embed_paints_async), em um comando e uma transação.
+    
+    Returns:
+        Tuple[List[Paint], List[Paint]]: (criadas, atualizadas); as sem mudança não aparecem
+    """
+    if not paints:
+        return [], []
+    created_paints, updated_paints = repository.upsert_many(_paints_from_dicts(paints), embeddings)
+    
+    if result_cache is not None and (created_paints or updated_paints):
+        result_cache.invalidate()
+    return created_paints, updated_paints
+
+
+def unique_paints(paints: List[Dict]) -> List[Dict]:
+    """
+    Tintas sem nomes repetidos (normalize_paint_name: sem diferenciar maiúsculas nem
+    espaços nas pontas); vale a primeira ocorrência. len(paints) - len(resultado) é o
+    número de repetidas descartadas.
+    """
+    by_name: Dict[str, Dict] = {}
+    for paint_data in paints:
+        by_name.setdefault(normalize_paint_name(paint_data["name"]), paint_data)
+    return list(by_name.values())
+
+
+def _paint_dict_text(paint_data: Dict) -> str:
+    """Texto do embedding de uma tinta em dicionário (o mesmo de _paint_text)"""
+    return EmbeddingService.build_paint_text(
+        name=paint_data["name"],
+        color=paint_data["color"],
+        surface_type=paint_data["surface_type"],
+        environment=paint_data["environment"],
+        finish_type=paint_data["finish_type"],
+        features=paint_data["features"],
+        line=paint_data["line"]
+    )
+
+
+def _embed_paint_dicts(
+    embedding_service: EmbeddingService,
+    paints: List[Dict],
+    embedding_cache: Optional[EmbeddingCacheRepository]
+) -> List[List[float]]:
+    """Embeddings de tintas em dicionários (create_paints/upsert_paints), na ordem da entrada"""
+    try:
+        texts = [_paint_dict_text(paint_data) for paint_data in paints]
+        return _embed_paint_texts(embedding_service, texts, embedding_cache)
+    except Exception as e:
+        raise ValueError(f"Erro ao gerar embeddings para as tintas: {str(e)}")
+
+
+def _paints_from_dicts(paints: List[Dict]) -> List[Paint]:
+    now = datetime.now()
+    return [
+        Paint(
+            id=0,  # Será definido pelo banco
+            name=paint_data["name"],
+            color=paint_data["color"],
+            surface_type=paint_data["surface_type"],
+            environment=paint_data["environment"],
+            finish_type=paint_data["finish_type"],
+            features=paint_data["features"],
+            line=paint_data["line"],
+            created_at=now,
+            updated_at=now
+        )
+        for paint_data in paints
+    ]
+
+
 def get_paint_by_id(repository: PaintRepository, paint_id: int) -> Optional[Paint]:
     """Busca uma tinta por ID"""
     return repository.get_by_id(paint_id)
@@ -90,6 +446,65 @@ def get_all_paints(
     return repository.get_all(skip=skip, limit=limit, environment=environment, line=line)
 
 
+def update_paint_deferred(
+    repository: PaintRepository,
+    paint_id: int,
+    name: str,
+    color: str,
+    surface_type: str,
+    environment: str,
+    finish_type: str,
+    features: List[str],
+    line: str,
+    result_cache: Optional[SearchResultCache] = None
+) -> Optional[Paint]:
+    """
+    Atualiza uma tinta e a coloca na fila do worker de embeddings (outbox).
+    
+    O embedding anterior continua sendo usado na busca até o worker gravar o novo.
+    
+    Returns:
+        Paint atualizada ou None se não encontrada
+        
+    Raises:
+        ValueError: Se o nome já pertencer a outra tinta
+    """
+    existing_paint = repository.get_by_id(paint_id)
+    if not existing_paint:
+        return None
+    
+    updated_paint = Paint(
+        id=paint_id,
+        name=name,
+        color=color,
+        surface_type=surface_type,
+        environment=environment,
+        finish_type=finish_type,
+        features=features,
+        line=line,
+        created_at=existing_paint.created_at,
+        updated_at=datetime.now()
+    )
+    
+    result = repository.update(paint_id, updated_paint)
+    if result:
+        repository.mark_embedding_pending(result.id)
+        result = replace(result, embedding_status="pending")
+        if result_cache is not None:
+            result_cache.invalidate()
+    return result
+
+
+def get_embedding_outbox_status(repository: PaintRepository) -> Dict[str, int]:
+    """Número de tintas por embedding_status (pending, ready, failed)"""
+    return repository.embedding_status_counts()
+
+
+def retry_failed_embeddings(repository: PaintRepository) -> int:
+    """Devolve para a fila do worker as tintas cujo embedding falhou em todas as tentativas"""
+    return repository.retry_failed_embeddings()
+
+
 def update_paint(
     repository: PaintRepository,
     paint_id: int,
@@ -100,7 +515,9 @@ def update_paint(
     finish_type: str,
     features: List[str],
     line: str,
-    embedding_service: EmbeddingService
+    embedding_service: EmbeddingService,
+    result_cache: Optional[SearchResultCache] = None,
+    embedding_cache: Optional[EmbeddingCacheRepository] = None
 ) -> Optional[Paint]:
     """
     Atualiza uma tinta existente e regenera embedding automaticamente.
@@ -116,12 +533,14 @@ def update_paint(
         features: Lista de features
         line: Linha da tinta
         embedding_service: Serviço para gerar embeddings (obrigatório)
+        result_cache: Cache de resultados de busca a invalidar (opcional)
+        embedding_cache: Cache persistente de embeddings, consultado antes do provedor (opcional)
     
     Returns:
         Paint atualizada ou None se não encontrada
         
     Raises:
-        ValueError: Se não conseguir regenerar embedding
+        ValueError: Se não conseguir regenerar embedding ou se o nome já pertencer a outra tinta
     """
     existing_paint = repository.get_by_id(paint_id)
     if not existing_paint:
@@ -145,36 +564,357 @@ def update_paint(
     # Regenerar embedding (obrigatório)
     if result:
         try:
-            embedding = embedding_service.generate_embedding_for_paint(
-                name=result.name,
-                color=result.color,
-                surface_type=result.surface_type,
-                environment=result.environment,
-                finish_type=result.finish_type,
-                features=result.features,
-                line=result.line
-            )
+            embedding = _embed_paint_texts(embedding_service, [_paint_text(result)], embedding_cache)[0]
             repository.update_embedding(result.id, embedding)
         except Exception as e:
             raise ValueError(f"Erro ao regenerar embedding para a tinta: {str(e)}")
+        finally:
+            # A linha mudou (mesmo se o embedding falhar): resultados anteriores ficam inválidos
+            if result_cache is not None:
+                result_cache.invalidate()
+    
+    return result
+
+
+async def update_paint_async(
+    repository: PaintRepository,
+    paint_id: int,
+    name: str,
+    color: str,
+    surface_type: str,
+    environment: str,
+    finish_type: str,
+    features: List[str],
+    line: str,
+    embedding_service: AsyncEmbeddingService,
+    result_cache: Optional[SearchResultCache] = None,
+    embedding_cache: Optional[EmbeddingCacheRepository] = None
+) -> Optional[Paint]:
+    """
+    Versão assíncrona de update_paint (embedding aguardado sem bloquear o event loop).
+    
+    Returns:
+        Paint atualizada ou None se não encontrada
+        
+    Raises:
+        ValueError: Se não conseguir regenerar embedding ou se o nome já pertencer a outra tinta
+    """
+    existing_paint = await asyncio.to_thread(repository.get_by_id, paint_id)
+    if not existing_paint:
+        return None
+    
+    updated_paint = Paint(
+        id=paint_id,
+        name=name,
+        color=color,
+        surface_type=surface_type,
+        environment=environment,
+        finish_type=finish_type,
+        features=features,
+        line=line,
+        created_at=existing_paint.created_at,
+        updated_at=datetime.now()
+    )
+    
+    result = await asyncio.to_thread(repository.update, paint_id, updated_paint)
+    
+    # Regenerar embedding (obrigatório)
+    if result:
+        try:
+            embedding = await _embed_paint_text_async(embedding_service, _paint_text(result), embedding_cache)
+            await asyncio.to_thread(repository.update_embedding, result.id, embedding)
+        except Exception as e:
+            raise ValueError(f"Erro ao regenerar embedding para a tinta: {str(e)}")
+        finally:
+            # A linha mudou (mesmo se o embedding falhar): resultados anteriores ficam inválidos
+            if result_cache is not None:
+                result_cache.invalidate()
     
     return result
 
 
-def delete_paint(repository: PaintRepository, paint_id: int) -> bool:
-    """Deleta uma tinta"""
-    return repository.delete(paint_id)
+def delete_paint(
+    repository: PaintRepository,
+    paint_id: int,
+    result_cache: Optional[SearchResultCache] = None
+) -> bool:
+    """Deleta uma tinta e invalida o cache de resultados de busca"""
+    deleted = repository.delete(paint_id)
+    if deleted and result_cache is not None:
+        result_cache.invalidate()
+    return deleted
 
 
 def search_semantic_paints(
     repository: PaintRepository,
     query_embedding: List[float],
     top_k: int = 5,
-    environment: Optional[str] = None
-) -> List[Paint]:
-    """Busca semântica de tintas usando embeddings"""
-    return repository.search_semantic(
+    environment: Optional[str] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    result_cache: Optional[SearchResultCache] = None,
+    min_score: Optional[float] = None,
+    offset: int = 0,
+    filters: Optional[PaintSearchFilters] = None,
+    diversity: Optional[float] = None
+) -> List[PaintSearchHit]:
+    """
+    Busca semântica de tintas usando embeddings.
+    
+    Com result_cache, buscas com embedding praticamente igual e mesmos
+    parâmetros reaproveitam o resultado até a próxima escrita no catálogo.
+    
+    Returns:
+        Resultados com distância e score (1 - distância), do mais para o menos similar
+    """
+    key = None
+    if result_cache is not None:
+        key = result_cache.make_key(
+            query_embedding,
+            top_k=top_k,
+            environment=environment,
+            ef_search=ef_search,
+            probes=probes,
+            min_score=min_score,
+            offset=offset,
+            filters=_filters_key(filters),
+            diversity=diversity or None
+        )
+        if key is not None:
+            cached = result_cache.get(key)
+            if cached is not None:
+                return cached
+    
+    hits = repository.search_semantic(
         query_embedding=query_embedding,
         top_k=top_k,
-        environment=environment
+        environment=environment,
+        ef_search=ef_search,
+        probes=probes,
+        min_score=min_score,
+        offset=offset,
+        filters=filters,
+        diversity=diversity
+    )
+    if key is not None:
+        result_cache.set(key, hits)
+    return hits
+
+
+def _filters_key(filters: Optional[PaintSearchFilters]) -> Optional[str]:
+    """Representação estável dos filtros para chaves de cache e cursores (None se vazios)"""
+    if filters is None or filters.is_empty():
+        return None
+    return repr(filters)
+
+
+def encode_search_cursor(offset: int, fingerprint: str) -> str:
+    """Cursor opaco da próxima página: deslocamento + impressão digital da busca"""
+    payload = json.dumps({"offset": offset, "fingerprint": fingerprint}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(cursor: str, fingerprint: str) -> int:
+    """
+    Lê o deslocamento de um cursor de busca.
+    
+    Raises:
+        ValueError: Se o cursor for inválido ou de outra busca (query/parâmetros diferentes)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        offset = int(payload["offset"])
+        cursor_fingerprint = payload["fingerprint"]
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        raise ValueError("Cursor de busca inválido")
+    if cursor_fingerprint != fingerprint:
+        raise ValueError("Cursor de busca pertence a outra consulta")
+    if offset < 0 or offset > MAX_SEARCH_OFFSET:
+        raise ValueError("Cursor de busca inválido")
+    return offset
+
+
+def search_semantic_paints_page(
+    repository: PaintRepository,
+    query_embedding: List[float],
+    top_k: int = 5,
+    environment: Optional[str] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    min_score: Optional[float] = None,
+    cursor: Optional[str] = None,
+    result_cache: Optional[SearchResultCache] = None,
+    filters: Optional[PaintSearchFilters] = None,
+    diversity: Optional[float] = None
+) -> Tuple[List[PaintSearchHit], Optional[str]]:
+    """
+    Página da busca semântica, a partir do cursor devolvido pela página anterior.
+    
+    Buscas com diversity são reordenadas por MMR e não são paginadas.
+    
+    Returns:
+        Tupla (resultados, cursor da próxima página ou None se não houver mais)
+        
+    Raises:
+        ValueError: Se o cursor for inválido ou de outra busca
+    """
+    fingerprint = embedding_fingerprint(
+        query_embedding,
+        top_k=top_k,
+        environment=environment,
+        min_score=min_score,
+        filters=_filters_key(filters)
+    )
+    if diversity and cursor:
+        raise ValueError("A busca com diversity não suporta cursor")
+    offset = 0
+    if cursor:
+        # Sem impressão digital (embedding inválido) o cursor não pode ser validado:
+        # ignorá-lo devolveria a primeira página de novo, com um cursor novo, em loop
+        if fingerprint is None:
+            raise ValueError("Cursor de busca inválido para esta consulta")
+        offset = decode_search_cursor(cursor, fingerprint)
+    
+    hits = search_semantic_paints(
+        repository=repository,
+        query_embedding=query_embedding,
+        top_k=top_k,
+        environment=environment,
+        ef_search=ef_search,
+        probes=probes,
+        result_cache=result_cache,
+        min_score=min_score,
+        offset=offset,
+        filters=filters,
+        diversity=diversity
+    )
+    
+    next_cursor = None
+    # Página cheia: pode haver mais vizinhos (com min_score, acima do corte)
+    if not diversity and fingerprint is not None and len(hits) == top_k and offset + top_k <= MAX_SEARCH_OFFSET:
+        next_cursor = encode_search_cursor(offset + top_k, fingerprint)
+    return hits, next_cursor
+
+
+def explain_semantic_paints(
+    repository: PaintRepository,
+    query_embedding: List[float],
+    top_k: int = 5,
+    environment: Optional[str] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    min_score: Optional[float] = None,
+    filters: Optional[PaintSearchFilters] = None
+) -> SearchExplanation:
+    """
+    Busca semântica com diagnóstico (plano de execução, índices usados e tempos).
+    
+    Não usa o cache de resultados nem o índice em memória: a consulta sempre vai ao banco.
+    """
+    return repository.explain_semantic(
+        query_embedding=query_embedding,
+        top_k=top_k,
+        environment=environment,
+        ef_search=ef_search,
+        probes=probes,
+        min_score=min_score,
+        filters=filters
+    )
+
+
+def search_paints_hybrid(
+    repository: PaintRepository,
+    query: str,
+    query_embedding: Optional[List[float]] = None,
+    top_k: int = 5,
+    environment: Optional[str] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    min_score: Optional[float] = None,
+    filters: Optional[PaintSearchFilters] = None,
+    diversity: Optional[float] = None
+) -> List[PaintSearchHit]:
+    """Busca híbrida de tintas (texto + embedding); sem embedding, apenas textual"""
+    return repository.search_hybrid(
+        query_text=query,
+        query_embedding=query_embedding,
+        top_k=top_k,
+        environment=environment,
+        ef_search=ef_search,
+        probes=probes,
+        min_score=min_score,
+        filters=filters,
+        diversity=diversity
+    )
+
+
+def search_semantic_paints_batch(
+    repository: PaintRepository,
+    queries: List[SemanticSearchQuery]
+) -> List[List[PaintSearchHit]]:
+    """Executa várias buscas semânticas de uma vez, mantendo a ordem das consultas"""
+    return repository.search_semantic_batch(queries)
+
+
+def normalize_query_text(query: str) -> str:
+    """Normaliza o texto da busca (caixa e espaços) para uso como chave de cache"""
+    return " ".join(query.split()).lower()
+
+
+def search_paints_by_text(
+    repository: PaintRepository,
+    embedding_service: EmbeddingService,
+    query: str,
+    top_k: int = 5,
+    environment: Optional[str] = None,
+    embedding_cache: Optional[LRUCache] = None,
+    result_cache: Optional[SearchResultCache] = None,
+    min_score: Optional[float] = None,
+    cursor: Optional[str] = None,
+    filters: Optional[PaintSearchFilters] = None,
+    diversity: Optional[float] = None
+) -> Tuple[List[PaintSearchHit], Optional[str]]:
+    """
+    Busca semântica a partir do texto da query, gerando o embedding no servidor.
+    
+    Args:
+        repository: Repositório de tintas
+        embedding_service: Serviço para gerar o embedding da query
+        query: Texto da busca
+        top_k: Número de resultados
+        environment: Filtro opcional por ambiente
+        embedding_cache: Cache de embeddings por texto normalizado (opcional)
+        result_cache: Cache de resultados de busca (opcional)
+        min_score: Similaridade mínima dos resultados (opcional)
+        cursor: Cursor da página anterior (opcional)
+        filters: Filtros de linha, acabamento, superfície e características (opcional)
+        diversity: Peso da diversidade entre os resultados, 0 a 1 (opcional, sem cursor)
+    
+    Returns:
+        Tupla (resultados mais relevantes, cursor da próxima página ou None)
+        
+    Raises:
+        ValueError: Se a query for vazia ou o cursor inválido
+    """
+    normalized_query = normalize_query_text(query)
+    if not normalized_query:
+        raise ValueError("Texto da busca não pode ser vazio")
+    
+    embedding = embedding_cache.get(normalized_query) if embedding_cache is not None else None
+    if embedding is None:
+        embedding = np.asarray(embedding_service.generate_embedding(normalized_query), dtype=np.float32)
+        if embedding_cache is not None:
+            embedding_cache.set(normalized_query, embedding)
+    
+    return search_semantic_paints_page(
+        repository=repository,
+        query_embedding=embedding,
+        top_k=top_k,
+        environment=environment,
+        min_score=min_score,
+        cursor=cursor,
+        result_cache=result_cache,
+        filters=filters,
+        diversity=diversity
     )
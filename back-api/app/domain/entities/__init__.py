@@ -1,5 +1,7 @@
 from app.domain.entities.paint import Paint
 from app.domain.entities.user import User
 from app.domain.entities.session import Session
+from app.domain.entities.search import SemanticSearchQuery, PaintSearchHit, PaintSearchFilters, SearchExplanation
+from app.domain.entities.embedding_job import EmbeddingJob
 
-__all__ = ["Paint", "User", "Session"]
+__all__ = ["Paint", "User", "Session", "SemanticSearchQuery", "PaintSearchHit", "PaintSearchFilters", "SearchExplanation", "EmbeddingJob"]
@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+from app.domain.entities.paint import Paint
+
+@dataclass
+class EmbeddingJob:
+    """Tinta reivindicada pelo worker de embeddings (outbox)"""
+    paint: Paint  # updated_at identifica a versão reivindicada
+    attempts: int  # Tentativas que já falharam
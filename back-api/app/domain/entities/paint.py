@@ -15,6 +15,7 @@ class Paint:
     line: str  # Ex: "Premium", "Standard"
     created_at: datetime
     updated_at: datetime
+    embedding_status: str = "pending"  # "pending", "ready" ou "failed"
 
     def __post_init__(self):
         """Validações básicas após inicialização"""
@@ -23,3 +24,11 @@ class Paint:
                 f"Environment deve ser 'interno' ou 'externo', "
                 f"recebido: {self.environment}"
             )
+
+
+def normalize_paint_name(name: str) -> str:
+    """
+    Chave de unicidade do nome da tinta, idêntica a lower(btrim(name)) no banco
+    (índice paints_name_normalized_key): btrim remove só espaços, não tabs nem quebras de linha.
+    """
+    return name.strip(" ").lower()
@@ -0,0 +1,65 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from app.domain.entities.paint import Paint
+
+@dataclass
+class PaintSearchFilters:
+    """Filtros de atributos aplicados dentro da busca (além do environment)"""
+    line: Optional[str] = None  # Igualdade exata (ex: "Premium")
+    finish_type: Optional[str] = None  # Sem diferenciar maiúsculas (ex: "acetinado")
+    surface_type: Optional[str] = None  # Uma das superfícies da lista (ex: "madeira")
+    features_any: List[str] = field(default_factory=list)  # Contém ao menos uma
+    features_all: List[str] = field(default_factory=list)  # Contém todas
+    
+    def is_empty(self) -> bool:
+        return not (self.line or self.finish_type or self.surface_type or self.features_any or self.features_all)
+    
+    def matches(self, paint: Paint) -> bool:
+        """Mesma semântica dos filtros SQL, para buscas fora do banco (índice em memória)"""
+        if self.line and paint.line != self.line:
+            return False
+        if self.finish_type and (paint.finish_type or "").lower() != self.finish_type.lower():
+            return False
+        if self.surface_type:
+            surfaces = [surface.strip() for surface in (paint.surface_type or "").lower().split(",")]
+            if self.surface_type.strip().lower() not in surfaces:
+                return False
+        features = set(paint.features or [])
+        if self.features_any and not features.intersection(self.features_any):
+            return False
+        if self.features_all and not features.issuperset(self.features_all):
+            return False
+        return True
+
+@dataclass
+class SemanticSearchQuery:
+    """Consulta de busca semântica (um embedding e seus parâmetros)"""
+    embedding: List[float]  # Lista de floats ou np.ndarray (embedding compactado)
+    top_k: int = 5
+    environment: Optional[str] = None
+    ef_search: Optional[int] = None  # hnsw.ef_search (recall x latência)
+    probes: Optional[int] = None  # ivfflat.probes (recall x latência)
+    min_score: Optional[float] = None  # Similaridade mínima (1 - distância de cosseno)
+    filters: Optional[PaintSearchFilters] = None
+
+@dataclass
+class PaintSearchHit:
+    """Resultado de uma busca: a tinta e o quão relevante ela é para a query"""
+    paint: Paint
+    distance: Optional[float] = None  # Distância de cosseno ao embedding da query (None: sem parte vetorial)
+    score: Optional[float] = None  # Similaridade (1 - distância) ou, na busca híbrida, score de fusão
+
+@dataclass
+class SearchExplanation:
+    """Diagnóstico de uma busca semântica: resultados, plano de execução e tempos"""
+    hits: List[PaintSearchHit]
+    plan: Any  # Saída de EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)
+    indexes: List[str]  # Índices usados pelo plano
+    rows_scanned: int  # Linhas lidas pelas varreduras (incluindo as descartadas por filtros)
+    candidates: int  # Linhas devolvidas pelas varreduras para ordenação/limite
+    shared_hit_blocks: int
+    shared_read_blocks: int
+    planning_ms: float
+    execution_ms: float  # Tempo de execução medido pelo PostgreSQL (EXPLAIN ANALYZE)
+    settings: Dict[str, str] = field(default_factory=dict)  # Ajustes aplicados na transação
+    timings: Dict[str, float] = field(default_factory=dict)  # Tempos medidos na aplicação (ms)
@@ -1,5 +1,6 @@
 from app.domain.repositories.paint_repository import PaintRepository
 from app.domain.repositories.user_repository import UserRepository
 from app.domain.repositories.session_repository import SessionRepository
+from app.domain.repositories.embedding_cache_repository import EmbeddingCacheRepository
 
-__all__ = ["PaintRepository", "UserRepository", "SessionRepository"]
+__all__ = ["PaintRepository", "UserRepository", "SessionRepository", "EmbeddingCacheRepository"]
@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Sequence
+
+class EmbeddingCacheRepository(ABC):
+    """Interface abstrata para o cache persistente de embeddings (endereçado pelo conteúdo)"""
+    
+    @abstractmethod
+    def get_many(self, content_hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """Busca embeddings por hash; hashes sem entrada ficam de fora do resultado"""
+        pass
+    
+    @abstractmethod
+    def put_many(self, model: str, embeddings: Dict[str, List[float]]) -> None:
+        """Grava embeddings por hash (entradas existentes são mantidas)"""
+        pass
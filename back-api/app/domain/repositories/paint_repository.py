@@ -1,13 +1,37 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from app.domain.entities.paint import Paint
+from app.domain.entities.embedding_job import EmbeddingJob
+from app.domain.entities.search import SemanticSearchQuery, PaintSearchHit, PaintSearchFilters, SearchExplanation
 
 class PaintRepository(ABC):
     """Interface abstrata para repositório de Paint"""
     
     @abstractmethod
     def create(self, paint: Paint) -> Paint:
-        """Cria uma nova tinta"""
+        """Cria uma nova tinta (ValueError se já existir uma com o mesmo nome normalizado)"""
+        pass
+    
+    @abstractmethod
+    def create_many(self, paints: List[Paint], embeddings: Optional[List[List[float]]] = None) -> List[Paint]:
+        """
+        Cria várias tintas em uma transação, com os embeddings ('ready') ou sem eles ('pending').
+        Retorna as tintas criadas na ordem da entrada.
+        """
+        pass
+    
+    @abstractmethod
+    def upsert_many(
+        self,
+        paints: List[Paint],
+        embeddings: Optional[List[List[float]]] = None
+    ) -> Tuple[List[Paint], List[Paint]]:
+        """
+        Insere ou atualiza várias tintas pelo nome normalizado (sem diferenciar
+        maiúsculas nem espaços nas pontas), em uma transação. Tintas sem mudança
+        não são tocadas. Retorna (criadas, atualizadas).
+        """
         pass
     
     @abstractmethod
@@ -28,7 +52,7 @@ class PaintRepository(ABC):
     
     @abstractmethod
     def update(self, paint_id: int, paint: Paint) -> Optional[Paint]:
-        """Atualiza uma tinta existente"""
+        """Atualiza uma tinta existente (ValueError se o novo nome já pertencer a outra tinta)"""
         pass
     
     @abstractmethod
@@ -41,12 +65,105 @@ class PaintRepository(ABC):
         self,
         query_embedding: List[float],
         top_k: int = 5,
-        environment: Optional[str] = None
-    ) -> List[Paint]:
-        """Busca semântica usando embeddings (pgvector)"""
+        environment: Optional[str] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        min_score: Optional[float] = None,
+        offset: int = 0,
+        filters: Optional[PaintSearchFilters] = None,
+        diversity: Optional[float] = None
+    ) -> List[PaintSearchHit]:
+        """
+        Busca semântica usando embeddings (pgvector), da mais para a menos similar.
+        
+        ef_search/probes ajustam o índice aproximado; min_score descarta resultados com
+        similaridade menor; offset pula os primeiros vizinhos (paginação); filters
+        restringe por linha, acabamento, superfície e características; diversity (0 a 1)
+        reordena os candidatos por maximal marginal relevance (sem offset).
+        """
+        pass
+    
+    @abstractmethod
+    def explain_semantic(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        environment: Optional[str] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        min_score: Optional[float] = None,
+        filters: Optional[PaintSearchFilters] = None
+    ) -> SearchExplanation:
+        """
+        Executa a busca semântica no banco e devolve também o plano de execução
+        (EXPLAIN ANALYZE) e os tempos, para diagnóstico.
+        """
+        pass
+    
+    @abstractmethod
+    def search_hybrid(
+        self,
+        query_text: str,
+        query_embedding: Optional[List[float]] = None,
+        top_k: int = 5,
+        environment: Optional[str] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        min_score: Optional[float] = None,
+        filters: Optional[PaintSearchFilters] = None,
+        diversity: Optional[float] = None
+    ) -> List[PaintSearchHit]:
+        """
+        Busca híbrida: combina busca textual (full-text) e vetorial com reciprocal rank fusion.
+        
+        min_score descarta candidatos vetoriais com similaridade menor (os que casam
+        com o texto são mantidos); filters vale para as duas listas; diversity (0 a 1)
+        reordena os resultados fundidos por maximal marginal relevance.
+        """
+        pass
+    
+    @abstractmethod
+    def search_semantic_batch(self, queries: List[SemanticSearchQuery]) -> List[List[PaintSearchHit]]:
+        """Executa várias buscas semânticas de uma vez, retornando os resultados na ordem das consultas"""
         pass
     
     @abstractmethod
     def update_embedding(self, paint_id: int, embedding: List[float]) -> bool:
-        """Atualiza o embedding de uma tinta"""
+        """Atualiza o embedding de uma tinta (embedding_status passa a 'ready')"""
+        pass
+    
+    @abstractmethod
+    def mark_embedding_pending(self, paint_id: int) -> bool:
+        """Coloca a tinta na fila do worker de embeddings (embedding_status 'pending')"""
+        pass
+    
+    @abstractmethod
+    def claim_pending_embeddings(self, limit: int, lease_seconds: float) -> List[EmbeddingJob]:
+        """Reivindica até limit tintas pendentes por lease_seconds (linhas já reivindicadas são puladas)"""
+        pass
+    
+    @abstractmethod
+    def complete_embedding(self, paint_id: int, embedding: List[float], claimed_updated_at: datetime) -> bool:
+        """Grava o embedding gerado pelo worker; False se a tinta mudou ou foi removida desde a reivindicação"""
+        pass
+    
+    @abstractmethod
+    def fail_embedding(
+        self,
+        paint_id: int,
+        error: str,
+        claimed_updated_at: datetime,
+        retry_at: Optional[datetime]
+    ) -> bool:
+        """Registra a falha; volta para a fila em retry_at ou, sem retry_at, fica 'failed'"""
+        pass
+    
+    @abstractmethod
+    def retry_failed_embeddings(self) -> int:
+        """Devolve as tintas 'failed' para a fila. Retorna o número de tintas"""
+        pass
+    
+    @abstractmethod
+    def embedding_status_counts(self) -> Dict[str, int]:
+        """Número de tintas por embedding_status"""
         pass
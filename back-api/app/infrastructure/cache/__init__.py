@@ -0,0 +1,4 @@
+from app.infrastructure.cache.lru_cache import LRUCache
+from app.infrastructure.cache.search_result_cache import SearchResultCache
+
+__all__ = ["LRUCache", "SearchResultCache"]
@@ -0,0 +1,102 @@
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+import hashlib
+import threading
+import numpy as np
+from app.infrastructure.cache.lru_cache import LRUCache
+from app.infrastructure.config.settings import settings
+
+# Escala da quantização do embedding normalizado para int8 (componentes em [-1, 1])
+QUANTIZATION_SCALE = 127
+
+
+def embedding_fingerprint(query_embedding: Sequence[float], **params: Any) -> Optional[str]:
+    """
+    Hash do embedding quantizado (normalizado, int8) e dos parâmetros da busca.
+
+    Returns:
+        Hex do blake2b, ou None se o embedding for nulo/inválido
+    """
+    vector = np.asarray(query_embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vector)) if vector.ndim == 1 else 0.0
+    if norm == 0.0 or not np.isfinite(norm):
+        return None
+    quantized = np.round(vector / norm * QUANTIZATION_SCALE).astype(np.int8)
+
+    digest = hashlib.blake2b(quantized.tobytes(), digest_size=16)
+    for name in sorted(params):
+        digest.update(f"|{name}={params[name]}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SearchResultCache:
+    """
+    Cache de resultados da busca semântica com invalidação por versão do catálogo.
+
+    A chave combina a versão do catálogo com um hash do embedding quantizado
+    (normalizado e arredondado para int8) e dos parâmetros da busca, então
+    embeddings que só diferem em escala ou ruído abaixo da quantização
+    compartilham a entrada. Escritas no catálogo incrementam a versão: buscas
+    iniciadas antes da escrita gravam sob a versão antiga e nunca são servidas.
+
+    A versão é do processo; com vários workers o TTL limita o tempo em que um
+    worker pode servir resultados anteriores a uma escrita feita em outro.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl_seconds: Optional[float] = 300.0):
+        self._cache = LRUCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self._version_lock = threading.Lock()
+        self.catalog_version = 0
+
+    def make_key(self, query_embedding: Sequence[float], **params: Any) -> Optional[Hashable]:
+        """
+        Monta a chave da busca, ou None se o embedding não puder ser cacheado.
+
+        Args:
+            query_embedding: Embedding da query
+            **params: Parâmetros que alteram o resultado (top_k, environment, ...)
+        """
+        fingerprint = embedding_fingerprint(query_embedding, **params)
+        if fingerprint is None:
+            return None
+        return (self.catalog_version, fingerprint)
+
+    def get(self, key: Hashable) -> Optional[List[Any]]:
+        """Retorna uma cópia do resultado em cache ou None"""
+        value = self._cache.get(key)
+        return list(value) if value is not None else None
+
+    def set(self, key: Hashable, results: List[Any]) -> None:
+        """Armazena o resultado de uma busca"""
+        self._cache.set(key, list(results))
+
+    def invalidate(self) -> int:
+        """
+        Incrementa a versão do catálogo e descarta as entradas atuais.
+
+        Returns:
+            Nova versão do catálogo
+        """
+        with self._version_lock:
+            self.catalog_version += 1
+            version = self.catalog_version
+        self._cache.clear()
+        return version
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso do cache e versão atual do catálogo"""
+        return {**self._cache.stats(), "catalog_version": self.catalog_version}
+
+
+@lru_cache(maxsize=None)
+def get_search_result_cache() -> Optional[SearchResultCache]:
+    """Retorna o cache (único no processo) de resultados da busca semântica; None se desabilitado"""
+    if settings.search.result_cache_size == 0:
+        return None
+    return SearchResultCache(
+        maxsize=settings.search.result_cache_size,
+        ttl_seconds=settings.search.result_cache_ttl_seconds
+    )
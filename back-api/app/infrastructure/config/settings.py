@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional
 from pydantic import Field
 
 class DatabaseSettings(BaseSettings):
@@ -7,6 +8,7 @@ class DatabaseSettings(BaseSettings):
     url: str = Field(..., description="URL de conexão do PostgreSQL")
     pool_size: int = Field(default=5, description="Tamanho do pool de conexões")
     max_overflow: int = Field(default=10, description="Máximo de overflow do pool")
+    prepare_threshold: int = Field(default=5, ge=0, description="Execuções de uma mesma consulta na conexão antes de prepará-la no servidor (psycopg)")
 
 class AppSettings(BaseSettings):
     """Configurações gerais da aplicação"""
@@ -29,6 +31,54 @@ class SecuritySettings(BaseSettings):
     algorithm: str = Field(default="HS256", description="Algoritmo JWT")
     access_token_expire_minutes: int = Field(default=30, ge=1, le=1440, description="Tempo de expiração do token em minutos (1-1440)")
 
+class SearchSettings(BaseSettings):
+    """Configurações da busca semântica"""
+    model_config = SettingsConfigDict(env_prefix="SEARCH_")
+    in_memory_index: bool = Field(default=False, description="Mantém os embeddings em memória (NumPy) para a busca semântica")
+    index_refresh_seconds: float = Field(default=30.0, ge=0, description="Intervalo mínimo entre atualizações incrementais do índice em memória")
+    query_embedding_cache_size: int = Field(default=1024, ge=1, description="Máximo de embeddings de queries de texto mantidos em cache")
+    result_cache_size: int = Field(default=2048, ge=0, description="Máximo de resultados de busca semântica em cache (0 desabilita)")
+    result_cache_ttl_seconds: float = Field(default=300.0, gt=0, description="Validade dos resultados de busca em cache")
+    quantization: str = Field(default="none", pattern="^(none|int8|binary)$", description="Quantização do índice em memória: 'none' (float32), 'int8' (4x menor) ou 'binary' (32x menor); com quantização os candidatos são reordenados pelos embeddings completos do banco")
+    first_pass: str = Field(default="full", pattern="^(full|short|binary)$", description="Etapa inicial da busca: 'full' (vector 1536), 'short' (halfvec 256) ou 'binary' (binary_quantize + Hamming); as duas últimas reordenam pelo vetor completo")
+    rescore_candidates: int = Field(default=50, ge=1, le=1000, description="Candidatos mínimos da etapa 'short' reordenados pelo vetor completo")
+    index_method: str = Field(default="hnsw", pattern="^(hnsw|ivfflat)$", description="Método do índice pgvector usado nas reconstruções: 'hnsw' ou 'ivfflat'")
+    ef_search: Optional[int] = Field(default=None, ge=1, le=1000, description="hnsw.ef_search padrão das buscas (None: padrão do servidor)")
+    probes: Optional[int] = Field(default=None, ge=1, description="ivfflat.probes padrão das buscas (None: padrão do servidor)")
+    mmr_candidates: int = Field(default=50, ge=1, le=1000, description="Candidatos mínimos reordenados por diversidade (MMR) quando a busca pede diversity")
+    iterative_scan: str = Field(default="strict_order", pattern="^(off|strict_order|relaxed_order)$", description="hnsw.iterative_scan das buscas com filtros (pgvector >= 0.8): continua a varredura do índice até completar o LIMIT")
+
+class EmbeddingSettings(BaseSettings):
+    """Configurações da geração de embeddings das tintas (outbox + worker)"""
+    model_config = SettingsConfigDict(env_prefix="EMBEDDING_")
+    provider: str = Field(default="openai", pattern="^(openai|local)$", description="Provedor de embeddings: 'openai' (text-embedding-3-small) ou 'local' (hashing em CPU, 1536 dimensões, sem rede); deve ser o mesmo no agente-ia")
+    outbox: bool = Field(default=True, description="Grava as tintas com embedding_status 'pending' e gera o embedding no worker, fora da requisição (False: gera na requisição)")
+    worker: bool = Field(default=True, description="Executa o worker de embeddings no processo da API")
+    batch_size: int = Field(default=64, ge=1, le=2048, description="Tintas reivindicadas por ciclo do worker")
+    concurrency: int = Field(default=4, ge=1, le=32, description="Requisições de embeddings simultâneas por ciclo (o lote é dividido entre elas)")
+    poll_interval_seconds: float = Field(default=2.0, gt=0, description="Espera entre ciclos quando a fila está vazia")
+    lease_seconds: float = Field(default=120.0, gt=0, description="Tempo em que uma tinta reivindicada fica reservada ao worker")
+    max_attempts: int = Field(default=5, ge=1, description="Tentativas antes de marcar a tinta como 'failed'")
+    backoff_base_seconds: float = Field(default=5.0, gt=0, description="Espera antes da segunda tentativa; dobra a cada falha")
+    backoff_max_seconds: float = Field(default=600.0, gt=0, description="Espera máxima entre tentativas")
+
+class RateLimitSettings(BaseSettings):
+    """Configurações do controle de vazão das chamadas à OpenAI"""
+    model_config = SettingsConfigDict(env_prefix="RATE_LIMIT_")
+    enabled: bool = Field(default=True, description="Passa as chamadas à OpenAI por token buckets por modelo, dimensionados pelos cabeçalhos x-ratelimit-*")
+    headroom: float = Field(default=0.9, gt=0, le=1, description="Fração do limite informado pela OpenAI usada pelo processo")
+    requests_per_minute: Optional[int] = Field(default=None, ge=1, description="Limite de requisições por minuto até a primeira resposta de cada modelo (None: sem limite até lá)")
+    tokens_per_minute: Optional[int] = Field(default=None, ge=1, description="Limite de tokens por minuto até a primeira resposta de cada modelo (None: sem limite até lá)")
+    backoff_base_seconds: float = Field(default=1.0, gt=0, description="Espera após um 429 sem retry-after; dobra a cada 429 seguido")
+    backoff_max_seconds: float = Field(default=60.0, gt=0, description="Espera máxima após um 429")
+
+class EtlSettings(BaseSettings):
+    """Configurações do pipeline de carga de tintas (pipelines/)"""
+    model_config = SettingsConfigDict(env_prefix="ETL_")
+    chunk_size: int = Field(default=256, ge=1, le=2048, description="Tintas por lote do pipeline: uma requisição de embeddings e uma transação por lote")
+    max_error_messages: int = Field(default=100, ge=0, description="Mensagens de erro guardadas para o relatório final (os erros continuam contados)")
+    concurrency: int = Field(default=4, ge=1, le=32, description="Lotes com embeddings sendo gerados ao mesmo tempo no runner assíncrono, enquanto um único escritor grava no banco (1: runner sequencial)")
+
 class Settings:
     """Classe principal de configurações"""
     def __init__(self):
@@ -36,6 +86,10 @@ class Settings:
         self.app = AppSettings()
         self.server = ServerSettings()
         self.security = SecuritySettings()
+        self.search = SearchSettings()
+        self.embedding = EmbeddingSettings()
+        self.rate_limit = RateLimitSettings()
+        self.etl = EtlSettings()
     
     @property
     def database_url(self) -> str:
@@ -1,20 +1,55 @@
-from sqlalchemy import create_engine
+import logging
+import psycopg
+from pgvector.psycopg import register_vector
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 from app.infrastructure.config.settings import settings
 
+logger = logging.getLogger(__name__)
+
 # Base para models
 Base = declarative_base()
 
+
+def _engine_url(url: str):
+    """
+    Usa o driver psycopg (3) na aplicação.
+
+    O psycopg envia os embeddings como parâmetros no formato binário do pgvector
+    e prepara no servidor as consultas executadas repetidamente na mesma conexão.
+    """
+    engine_url = make_url(url)
+    if engine_url.drivername in ("postgresql", "postgresql+psycopg2"):
+        engine_url = engine_url.set(drivername="postgresql+psycopg")
+    return engine_url
+
+
 # Engine do SQLAlchemy
 engine = create_engine(
-    settings.database_url,
+    _engine_url(settings.database_url),
     pool_size=settings.database.pool_size,
     max_overflow=settings.database.max_overflow,
     pool_pre_ping=True,  # Verifica conexões antes de usar
+    connect_args={"prepare_threshold": settings.database.prepare_threshold},
     echo=False  # True para ver SQL no console (desenvolvimento)
 )
 
+
+@event.listens_for(engine, "connect")
+def _register_vector_types(dbapi_connection, connection_record):
+    """Registra os tipos do pgvector (vector, halfvec, bit) na conexão psycopg"""
+    try:
+        register_vector(dbapi_connection)
+    except psycopg.ProgrammingError:
+        # Extensão ainda não criada (ex: antes das migrations)
+        logger.warning("Extensão pgvector não encontrada; tipos vector não registrados nesta conexão")
+    finally:
+        # TypeInfo.fetch abre uma transação; devolve a conexão ociosa ao pool
+        dbapi_connection.rollback()
+
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -1,5 +1,6 @@
 from app.infrastructure.database.models.paint_model import PaintModel
 from app.infrastructure.database.models.user_model import UserModel
 from app.infrastructure.database.models.session_model import SessionModel
+from app.infrastructure.database.models.embedding_cache_model import EmbeddingCacheModel
 
-__all__ = ["PaintModel", "UserModel", "SessionModel"]
+__all__ = ["PaintModel", "UserModel", "SessionModel", "EmbeddingCacheModel"]
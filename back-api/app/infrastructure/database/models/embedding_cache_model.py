@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+from app.infrastructure.database.connection import Base
+from app.infrastructure.database.models.paint_model import EMBEDDING_DIMENSIONS
+
+class EmbeddingCacheModel(Base):
+    """Model SQLAlchemy para o cache persistente de embeddings (chave: sha256 de modelo + texto)"""
+    
+    __tablename__ = "embedding_cache"
+    
+    content_hash = Column(String(64), primary_key=True)
+    model = Column(String(100), nullable=False)
+    embedding = Column(Vector(EMBEDDING_DIMENSIONS), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<EmbeddingCacheModel(content_hash='{self.content_hash[:8]}...', model='{self.model}')>"
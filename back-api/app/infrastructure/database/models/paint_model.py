@@ -1,14 +1,31 @@
-from sqlalchemy import Column, Integer, String, ARRAY, DateTime, CheckConstraint
+from sqlalchemy import Column, Integer, String, Text, ARRAY, DateTime, CheckConstraint, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
+from sqlalchemy.schema import FetchedValue
 from sqlalchemy.sql import func
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
 from app.infrastructure.database.connection import Base
 
+# Dimensões do embedding (text-embedding-3-small)
+EMBEDDING_DIMENSIONS = 1536
+# Dimensões do embedding reduzido (primeira etapa da busca); igual à migration e9f3a4b5c6d7
+SHORT_EMBEDDING_DIMENSIONS = 256
+# Valores de environment (check_environment); cada um tem índices vetoriais parciais
+PAINT_ENVIRONMENTS = ("interno", "externo")
+# Estados do embedding (outbox): 'pending' aguarda o EmbeddingWorker; 'failed' esgotou as tentativas
+EMBEDDING_STATUSES = ("pending", "ready", "failed")
+# Nome normalizado, único (sem diferenciar maiúsculas nem espaços nas pontas): chave do upsert do ETL
+PAINT_NAME_KEY = "lower(btrim(name))"
+PAINT_NAME_INDEX = "paints_name_normalized_key"
+
 class PaintModel(Base):
     """Model SQLAlchemy para Paint"""
     
     __tablename__ = "paints"
     __table_args__ = (
         CheckConstraint("environment IN ('interno', 'externo')", name="check_environment"),
+        CheckConstraint("embedding_status IN ('pending', 'ready', 'failed')", name="check_embedding_status"),
+        Index(PAINT_NAME_INDEX, text(PAINT_NAME_KEY), unique=True),
     )
     
     id = Column(Integer, primary_key=True, index=True)
@@ -19,7 +36,17 @@ class PaintModel(Base):
     finish_type = Column(String(50), nullable=False)
     features = Column(ARRAY(String), nullable=False, default=list)
     line = Column(String(50), nullable=False, index=True)
-    embedding = Column(Vector(1536), nullable=True)
+    embedding = Column(Vector(EMBEDDING_DIMENSIONS), nullable=True)
+    # Primeiras 256 dimensões renormalizadas, em halfvec; mantido pelo trigger paints_embedding_short_trigger
+    embedding_short = deferred(Column(HALFVEC(SHORT_EMBEDDING_DIMENSIONS), nullable=True, server_default=FetchedValue(), server_onupdate=FetchedValue()))
+    embedding_status = Column(String(10), nullable=False, server_default="pending")
+    embedding_attempts = Column(Integer, nullable=False, server_default="0")
+    embedding_error = Column(Text, nullable=True)
+    embedding_next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    # Lease do worker que reivindicou a linha; expirado, outra instância pode reivindicá-la
+    embedding_locked_until = Column(DateTime(timezone=True), nullable=True)
+    # Mantido pelo trigger paints_search_tsv_trigger (busca textual/híbrida)
+    search_tsv = deferred(Column(TSVECTOR, nullable=True, server_default=FetchedValue(), server_onupdate=FetchedValue()))
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
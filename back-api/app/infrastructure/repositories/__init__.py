@@ -1,5 +1,6 @@
 from app.infrastructure.repositories.paint_repository_impl import PaintRepositoryImpl
 from app.infrastructure.repositories.user_repository_impl import UserRepositoryImpl
 from app.infrastructure.repositories.session_repository_impl import SessionRepositoryImpl
+from app.infrastructure.repositories.embedding_cache_repository_impl import EmbeddingCacheRepositoryImpl
 
-__all__ = ["PaintRepositoryImpl", "UserRepositoryImpl", "SessionRepositoryImpl"]
+__all__ = ["PaintRepositoryImpl", "UserRepositoryImpl", "SessionRepositoryImpl", "EmbeddingCacheRepositoryImpl"]
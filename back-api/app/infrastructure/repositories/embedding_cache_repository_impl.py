@@ -0,0 +1,48 @@
+from typing import Dict, List, Sequence
+import logging
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from app.domain.repositories.embedding_cache_repository import EmbeddingCacheRepository
+from app.infrastructure.database.models.embedding_cache_model import EmbeddingCacheModel
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCacheRepositoryImpl(EmbeddingCacheRepository):
+    """
+    Implementação do cache de embeddings usando SQLAlchemy.
+    
+    O cache é só uma otimização: erros no banco são registrados e tratados como
+    cache miss (ou gravação ignorada), sem interromper a geração do embedding.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_many(self, content_hashes: Sequence[str]) -> Dict[str, List[float]]:
+        """Busca embeddings por hash; hashes sem entrada ficam de fora do resultado"""
+        if not content_hashes:
+            return {}
+        try:
+            rows = self.db.query(EmbeddingCacheModel.content_hash, EmbeddingCacheModel.embedding).filter(
+                EmbeddingCacheModel.content_hash.in_(set(content_hashes))
+            ).all()
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Erro ao ler cache de embeddings: {str(e)}")
+            return {}
+        return {row.content_hash: [float(value) for value in row.embedding] for row in rows}
+    
+    def put_many(self, model: str, embeddings: Dict[str, List[float]]) -> None:
+        """Grava embeddings por hash (entradas existentes são mantidas)"""
+        if not embeddings:
+            return
+        statement = insert(EmbeddingCacheModel).values([
+            {"content_hash": content_hash, "model": model, "embedding": embedding}
+            for content_hash, embedding in embeddings.items()
+        ]).on_conflict_do_nothing(index_elements=["content_hash"])
+        try:
+            self.db.execute(statement)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Erro ao gravar cache de embeddings: {str(e)}")
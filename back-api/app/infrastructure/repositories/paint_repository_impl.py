@@ -1,16 +1,59 @@
-from typing import List, Optional
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import time
+import numpy as np
+from pgvector import HalfVector, Vector
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from app.domain.entities.paint import Paint
+from sqlalchemy import and_, func, insert, literal_column, or_, text
+from app.domain.entities.paint import Paint, normalize_paint_name
+from app.domain.entities.embedding_job import EmbeddingJob
+from app.domain.entities.search import SemanticSearchQuery, PaintSearchHit, PaintSearchFilters, SearchExplanation
 from app.domain.repositories.paint_repository import PaintRepository
-from app.infrastructure.database.models.paint_model import PaintModel
+from app.infrastructure.config.settings import settings
+from app.infrastructure.database.models.paint_model import (
+    PaintModel,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_STATUSES,
+    PAINT_ENVIRONMENTS,
+    PAINT_NAME_INDEX,
+    PAINT_NAME_KEY,
+    SHORT_EMBEDDING_DIMENSIONS
+)
+from app.infrastructure.search.diversity import mmr_select
+from app.infrastructure.search.quantization import exact_rescore, to_array
+from app.infrastructure.search.vector_index import InMemoryVectorIndex
+
+# Colunas devolvidas pelos INSERTs em lote (create_many / upsert_many)
+PAINT_RETURNING = (
+    PaintModel.id, PaintModel.name, PaintModel.color, PaintModel.surface_type,
+    PaintModel.environment, PaintModel.finish_type, PaintModel.features, PaintModel.line,
+    PaintModel.created_at, PaintModel.updated_at, PaintModel.embedding_status
+)
+PAINT_COLUMNS = "id, name, color, surface_type, environment, finish_type, features, line, created_at, updated_at, embedding_status"
+# Constante k do reciprocal rank fusion: score = soma de 1 / (k + posição) em cada lista
+RRF_K = 60
+# Candidatos buscados em cada lista (textual e vetorial) antes da fusão
+HYBRID_CANDIDATES_MULTIPLIER = 4
+HYBRID_MIN_CANDIDATES = 20
+# Padrão do pgvector para hnsw.ef_search; uma varredura hnsw devolve no máximo ef_search linhas
+HNSW_DEFAULT_EF_SEARCH = 40
+HNSW_MAX_EF_SEARCH = 1000
+# Etapas 'short'/'binary' e índice em memória quantizado:
+# candidatos = max(SEARCH_RESCORE_CANDIDATES, RESCORE_MULTIPLIER * limite)
+RESCORE_MULTIPLIER = 4
+# Diversidade (MMR): candidatos = max(SEARCH_MMR_CANDIDATES, MMR_MULTIPLIER * top_k)
+MMR_MULTIPLIER = 4
 
 
 class PaintRepositoryImpl(PaintRepository):
     """Implementação do repositório de Paint usando SQLAlchemy"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, vector_index: Optional[InMemoryVectorIndex] = None):
         self.db = db
+        self.vector_index = vector_index
     
     def create(self, paint: Paint) -> Paint:
         """Cria uma nova tinta"""
@@ -26,10 +69,118 @@ class PaintRepositoryImpl(PaintRepository):
             updated_at=paint.updated_at
         )
         self.db.add(paint_model)
-        self.db.commit()
+        self._commit_paint_names([paint.name])
         self.db.refresh(paint_model)
         return self._model_to_entity(paint_model)
     
+    def create_many(self, paints: List[Paint], embeddings: Optional[List[List[float]]] = None) -> List[Paint]:
+        """
+        Cria várias tintas em uma transação, com os embeddings ('ready') ou sem eles ('pending').
+        Retorna as tintas criadas na ordem da entrada.
+        """
+        if not paints:
+            return []
+        if embeddings is not None and len(embeddings) != len(paints):
+            raise ValueError(f"{len(embeddings)} embeddings para {len(paints)} tintas")
+        rows = self._paint_rows(paints, embeddings)
+        # INSERT com várias linhas por comando (insertmanyvalues do SQLAlchemy) e um
+        # único commit, em vez de INSERT + commit + refresh + UPDATE por tinta
+        statement = insert(PaintModel).returning(*PAINT_RETURNING, sort_by_parameter_order=True)
+        try:
+            created = [self._row_to_entity(row) for row in self.db.execute(statement, rows).fetchall()]
+        except IntegrityError as e:
+            self.db.rollback()
+            self._raise_if_duplicate_name(e, [paint.name for paint in paints])
+            raise
+        self.db.commit()
+        if self.vector_index is not None and embeddings is not None:
+            for paint, embedding in zip(created, embeddings):
+                self.vector_index.upsert(paint, embedding)
+        return created
+    
+    def _paint_rows(self, paints: List[Paint], embeddings: Optional[List[List[float]]]) -> List[Dict[str, Any]]:
+        """Linhas do INSERT em lote: com embedding ficam 'ready', sem ele 'pending' (outbox)"""
+        return [
+            {
+                "name": paint.name,
+                "color": paint.color,
+                "surface_type": paint.surface_type,
+                "environment": paint.environment,
+                "finish_type": paint.finish_type,
+                "features": paint.features,
+                "line": paint.line,
+                "created_at": paint.created_at,
+                "updated_at": paint.updated_at,
+                "embedding": self._to_vector(embeddings[index]) if embeddings is not None else None,
+                "embedding_status": "ready" if embeddings is not None else "pending",
+            }
+            for index, paint in enumerate(paints)
+        ]
+    
+    def upsert_many(
+        self,
+        paints: List[Paint],
+        embeddings: Optional[List[List[float]]] = None
+    ) -> Tuple[List[Paint], List[Paint]]:
+        """
+        Insere ou atualiza várias tintas pelo nome normalizado, em um comando e uma transação.
+        
+        Tintas existentes só são atualizadas se algum campo mudou (ou se o embedding
+        recebido substitui um 'pending'/'failed'); as iguais não são tocadas.
+        
+        Returns:
+            (criadas, atualizadas); as tintas sem mudança não aparecem em nenhuma das listas
+        """
+        if not paints:
+            return [], []
+        if embeddings is not None and len(embeddings) != len(paints):
+            raise ValueError(f"{len(embeddings)} embeddings para {len(paints)} tintas")
+        keys = [normalize_paint_name(paint.name) for paint in paints]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Nomes de tinta repetidos no mesmo lote")
+        
+        # Mesmas linhas do INSERT em lote de create_many, com ON CONFLICT
+        statement = pg_insert(PaintModel).values(self._paint_rows(paints, embeddings))
+        excluded = statement.excluded
+        data_columns = ("name", "color", "surface_type", "environment", "finish_type", "features", "line")
+        # ON CONFLICT pelo índice único paints_name_normalized_key (mesma expressão da migration)
+        statement = statement.on_conflict_do_update(
+            index_elements=[text(PAINT_NAME_KEY)],
+            set_={
+                **{column: excluded[column] for column in data_columns},
+                "embedding": excluded.embedding,
+                "embedding_status": excluded.embedding_status,
+                "embedding_attempts": 0,
+                "embedding_error": None,
+                "embedding_next_attempt_at": None,
+                "embedding_locked_until": None,
+                "updated_at": excluded.updated_at,
+            },
+            where=or_(
+                *(PaintModel.__table__.c[column].is_distinct_from(excluded[column]) for column in data_columns),
+                and_(excluded.embedding_status == "ready", PaintModel.embedding_status != "ready")
+            )
+        ).returning(
+            *PAINT_RETURNING,
+            # xmax = 0 só em linhas recém-inseridas (as atualizadas têm a transação em xmax)
+            literal_column("xmax = 0").label("inserted")
+        )
+        rows = self.db.execute(statement).fetchall()
+        self.db.commit()
+        
+        created, updated = [], []
+        by_key = dict(zip(keys, embeddings)) if embeddings is not None else {}
+        for row in rows:
+            paint = self._row_to_entity(row)
+            (created if row.inserted else updated).append(paint)
+            if self.vector_index is not None:
+                embedding = by_key.get(normalize_paint_name(paint.name))
+                if embedding is not None:
+                    self.vector_index.upsert(paint, embedding)
+                else:
+                    self.vector_index.remove(paint.id)
+        return created, updated
+    
     def get_by_id(self, paint_id: int) -> Optional[Paint]:
         """Busca uma tinta por ID"""
         paint_model = self.db.query(PaintModel).filter(PaintModel.id == paint_id).first()
@@ -70,9 +221,13 @@ class PaintRepositoryImpl(PaintRepository):
         paint_model.line = paint.line
         paint_model.updated_at = paint.updated_at
         
-        self.db.commit()
+        self._commit_paint_names([paint.name])
         self.db.refresh(paint_model)
-        return self._model_to_entity(paint_model)
+        updated_paint = self._model_to_entity(paint_model)
+        if self.vector_index is not None:
+            # Ambiente e atributos dos filtros valem já na próxima busca, sem esperar o refresh
+            self.vector_index.update_paint(updated_paint)
+        return updated_paint
     
     def delete(self, paint_id: int) -> bool:
         """Deleta uma tinta"""
@@ -82,74 +237,615 @@ class PaintRepositoryImpl(PaintRepository):
         
         self.db.delete(paint_model)
         self.db.commit()
+        if self.vector_index is not None:
+            self.vector_index.remove(paint_id)
         return True
     
     def search_semantic(
         self,
         query_embedding: List[float],
         top_k: int = 5,
-        environment: Optional[str] = None
-    ) -> List[Paint]:
+        environment: Optional[str] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        min_score: Optional[float] = None,
+        offset: int = 0,
+        filters: Optional[PaintSearchFilters] = None,
+        diversity: Optional[float] = None
+    ) -> List[PaintSearchHit]:
         """Busca semântica usando embeddings (pgvector)"""
-        if not query_embedding:
+        if query_embedding is None or len(query_embedding) == 0:
             return []
+        if diversity and offset:
+            raise ValueError("A busca com diversity não suporta paginação")
+        # Com diversidade, busca mais candidatos e reordena por MMR
+        limit = self._mmr_candidates(top_k) if diversity else top_k
         
-        # Validar embedding (deve ser lista de floats)
-        if not isinstance(query_embedding, list) or not all(isinstance(x, (int, float)) for x in query_embedding):
-            raise ValueError("query_embedding deve ser uma lista de números")
+        # Índice em memória: evita a ida ao banco quando habilitado e carregado
+        if self.vector_index is not None and self.vector_index.is_ready:
+            self.vector_index.refresh_if_stale(self.db)
+            rows = limit + offset
+            hits = self.vector_index.search(
+                query_embedding,
+                top_k=self._rescore_rows(rows) if self.vector_index.is_quantized else rows,
+                environment=environment,
+                filters=filters
+            )
+            if self.vector_index.is_quantized:
+                hits = self._rescore_exact([query_embedding], [hits], [rows])[0]
+            hits = self._filter_hits(
+                [PaintSearchHit(paint, distance, 1.0 - distance) for paint, distance in hits[offset:]],
+                min_score
+            )
+            if diversity:
+                embeddings = self.vector_index.embeddings([hit.paint.id for hit in hits])
+                return self._diversify(hits, embeddings, top_k, diversity)
+            return hits
+        
+        sql, params = self._build_semantic_query(
+            query_embedding,
+            limit,
+            environment,
+            min_score=min_score,
+            offset=offset,
+            filters=filters,
+            with_embedding=bool(diversity)
+        )
+        self._apply_index_settings(
+            ef_search, probes, self._index_rows(limit + offset), filtered=self._is_filtered(environment, filters)
+        )
+        rows = self.db.execute(text(sql), params).fetchall()
+        hits = [self._row_to_hit(row) for row in rows]
+        if diversity:
+            return self._diversify(hits, self._embedding_matrix([row.embedding for row in rows]), top_k, diversity)
+        return hits
+    
+    def explain_semantic(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        environment: Optional[str] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        min_score: Optional[float] = None,
+        filters: Optional[PaintSearchFilters] = None
+    ) -> SearchExplanation:
+        """
+        Busca semântica no banco com EXPLAIN (ANALYZE, BUFFERS) da mesma consulta.
+        
+        Sempre usa o pgvector (mesmo com o índice em memória habilitado). A consulta é
+        executada primeiro normalmente, para medir o tempo sem o cache aquecido pelo
+        EXPLAIN ANALYZE, e depois explicada na mesma transação (mesmos ajustes).
+        """
+        start = time.perf_counter()
+        sql, params = self._build_semantic_query(
+            query_embedding, top_k, environment, min_score=min_score, filters=filters
+        )
+        build_ms = (time.perf_counter() - start) * 1000
         
-        # Converter embedding para formato array do PostgreSQL
-        # Usar cast explícito para garantir segurança
-        embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+        applied = self._apply_index_settings(
+            ef_search, probes, self._index_rows(top_k), filtered=self._is_filtered(environment, filters)
+        )
+        start = time.perf_counter()
+        rows = self.db.execute(text(sql), params).fetchall()
+        sql_ms = (time.perf_counter() - start) * 1000
         
-        # Validar que embedding_str contém apenas números e caracteres seguros
-        if not all(c.isdigit() or c in '[],.-+eE ' for c in embedding_str):
-            raise ValueError("Embedding contém caracteres inválidos")
+        explain = self.db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+        plan = explain[0] if isinstance(explain, list) else explain
+        indexes, rows_scanned, candidates = self._summarize_plan(plan["Plan"])
+        return SearchExplanation(
+            hits=[self._row_to_hit(row) for row in rows],
+            plan=plan,
+            indexes=indexes,
+            rows_scanned=rows_scanned,
+            candidates=candidates,
+            shared_hit_blocks=int(plan["Plan"].get("Shared Hit Blocks", 0)),
+            shared_read_blocks=int(plan["Plan"].get("Shared Read Blocks", 0)),
+            planning_ms=float(plan.get("Planning Time", 0.0)),
+            execution_ms=float(plan.get("Execution Time", 0.0)),
+            settings={"first_pass": settings.search.first_pass, **applied},
+            timings={"query_build_ms": round(build_ms, 3), "sql_ms": round(sql_ms, 3)}
+        )
+    
+    @staticmethod
+    def _summarize_plan(node: Dict[str, Any]) -> Tuple[List[str], int, int]:
+        """
+        Percorre o plano (JSON do EXPLAIN ANALYZE) contando o trabalho das varreduras.
         
-        # Construir query SQL para busca semântica com pgvector
-        # Usar bindparam para todos os valores, exceto o embedding que precisa ser castado
-        sql = """
+        Returns:
+            Tupla (índices usados, linhas lidas pelas varreduras incluindo as descartadas
+            por filtros, linhas devolvidas pelas varreduras)
+        """
+        indexes: List[str] = []
+        rows_scanned = 0
+        candidates = 0
+        pending = [node]
+        while pending:
+            current = pending.pop()
+            pending.extend(current.get("Plans", []))
+            if current.get("Index Name") and current["Index Name"] not in indexes:
+                indexes.append(current["Index Name"])
+            if "Scan" in current.get("Node Type", ""):
+                loops = current.get("Actual Loops", 1)
+                returned = current.get("Actual Rows", 0) * loops
+                removed = (current.get("Rows Removed by Filter", 0) + current.get("Rows Removed by Index Recheck", 0)) * loops
+                candidates += returned
+                rows_scanned += returned + removed
+        return indexes, int(rows_scanned), int(candidates)
+    
+    def search_hybrid(
+        self,
+        query_text: str,
+        query_embedding: Optional[List[float]] = None,
+        top_k: int = 5,
+        environment: Optional[str] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        min_score: Optional[float] = None,
+        filters: Optional[PaintSearchFilters] = None,
+        diversity: Optional[float] = None
+    ) -> List[PaintSearchHit]:
+        """
+        Busca híbrida (full-text + pgvector) com reciprocal rank fusion em uma única consulta.
+        
+        A parte textual usa o tsvector search_tsv (índice GIN) com os termos da query
+        combinados por OR e ordenados por ts_rank_cd; a vetorial usa o índice do
+        embedding. Sem embedding, a busca é apenas textual. min_score só filtra os
+        candidatos vetoriais: quem casa com o texto continua na fusão. environment e
+        filters valem para as duas listas. Com diversity, os resultados fundidos são
+        reordenados por MMR usando o score de fusão como relevância.
+        """
+        limit = self._mmr_candidates(top_k) if diversity else top_k
+        candidates = max(limit * HYBRID_CANDIDATES_MULTIPLIER, HYBRID_MIN_CANDIDATES)
+        params = {"query_text": query_text, "hybrid_candidates": candidates, "rrf_k": RRF_K, "top_k": limit}
+        environment_filter = self._environment_filter_sql(environment, params)
+        environment_filter += self._attribute_filter_sql(filters, params)
+        
+        has_embedding = query_embedding is not None and len(query_embedding) > 0
+        
+        # plainto_tsquery junta os termos com AND; trocar por OR dá recall e o
+        # ts_rank_cd continua favorecendo quem casa mais termos (ex: "Verde Garrafa")
+        ctes = [f"""
+            text_query AS (
+                SELECT replace(plainto_tsquery('portuguese', :query_text)::text, '&', '|')::tsquery AS tsq
+            ),
+            text_hits AS (
+                SELECT id, row_number() OVER (ORDER BY rank DESC, id) AS position
+                FROM (
+                    SELECT id, ts_rank_cd(search_tsv, text_query.tsq) AS rank
+                    FROM paints, text_query
+                    WHERE search_tsv @@ text_query.tsq {environment_filter}
+                    ORDER BY rank DESC
+                    LIMIT :hybrid_candidates
+                ) AS t
+            )
+        """]
+        fused = "SELECT id, CAST(NULL AS double precision) AS distance, 1.0 / (:rrf_k + position) AS score FROM text_hits"
+        
+        if has_embedding:
+            nearest_sql = self._nearest_sql(
+                query_embedding, "id", environment_filter, ":hybrid_candidates", params, min_score=min_score
+            )
+            ctes.append(f"""
+            vector_hits AS (
+                SELECT id, distance, row_number() OVER (ORDER BY distance, id) AS position
+                FROM ({nearest_sql}) AS v
+            )
+            """)
+            fused = """
+                SELECT
+                    COALESCE(v.id, t.id) AS id,
+                    v.distance,
+                    COALESCE(1.0 / (:rrf_k + v.position), 0) + COALESCE(1.0 / (:rrf_k + t.position), 0) AS score
+                FROM vector_hits v
+                FULL OUTER JOIN text_hits t ON t.id = v.id
+            """
+        
+        sql = f"""
+            WITH {",".join(ctes)},
+            fused AS ({fused})
             SELECT 
-                id, name, color, surface_type, environment, 
-                finish_type, features, line, created_at, updated_at
-            FROM paints
-            WHERE embedding IS NOT NULL
+                p.id, p.name, p.color, p.surface_type, p.environment, 
+                p.finish_type, p.features, p.line, p.created_at, p.updated_at, p.embedding_status,
+                fused.distance, fused.score{", p.embedding" if diversity else ""}
+            FROM fused
+            JOIN paints p ON p.id = fused.id
+            ORDER BY fused.score DESC, p.id
+            LIMIT :top_k
         """
         
+        if has_embedding:
+            self._apply_index_settings(
+                ef_search, probes, self._index_rows(candidates), filtered=self._is_filtered(environment, filters)
+            )
+        rows = self.db.execute(text(sql), params).fetchall()
+        hits = [PaintSearchHit(self._row_to_entity(row), row.distance, float(row.score)) for row in rows]
+        if diversity:
+            embeddings = self._embedding_matrix([row.embedding for row in rows])
+            return self._diversify(hits, embeddings, top_k, diversity, normalize=True)
+        return hits
+    
+    def search_semantic_batch(self, queries: List[SemanticSearchQuery]) -> List[List[PaintSearchHit]]:
+        """Executa várias buscas semânticas em uma única ida ao banco"""
+        results: List[List[PaintSearchHit]] = [[] for _ in queries]
+        pending = [(index, query) for index, query in enumerate(queries) if len(query.embedding) > 0]
+        if not pending:
+            return results
+        
+        # Índice em memória: todas as consultas em uma única multiplicação de matrizes
+        if self.vector_index is not None and self.vector_index.is_ready:
+            self.vector_index.refresh_if_stale(self.db)
+            queries = [query for _, query in pending]
+            if self.vector_index.is_quantized:
+                candidates = [replace(query, top_k=self._rescore_rows(query.top_k)) for query in queries]
+                hits = self._rescore_exact(
+                    [query.embedding for query in queries],
+                    self.vector_index.search_many(candidates),
+                    [query.top_k for query in queries]
+                )
+            else:
+                hits = self.vector_index.search_many(queries)
+            for (index, query), query_hits in zip(pending, hits):
+                results[index] = self._filter_hits(
+                    [PaintSearchHit(paint, distance, 1.0 - distance) for paint, distance in query_hits],
+                    query.min_score
+                )
+            return results
+        
+        # Uma subconsulta por busca, unidas com UNION ALL e ordenadas pelo índice da busca
+        parts = []
         params = {}
+        for index, query in pending:
+            part_sql, part_params = self._build_semantic_query(
+                query.embedding,
+                query.top_k,
+                query.environment,
+                min_score=query.min_score,
+                filters=query.filters,
+                suffix=f"_{index}"
+            )
+            parts.append(f"SELECT {index} AS query_index, q{index}.* FROM ({part_sql}) AS q{index}")
+            params.update(part_params)
         
-        if environment:
-            sql += " AND environment = :environment"
-            params["environment"] = environment
+        sql = "SELECT * FROM (" + " UNION ALL ".join(parts) + ") AS hits ORDER BY query_index, distance"
         
-        # Usar f-string apenas após validação (pgvector requer sintaxe específica)
-        sql += f"""
-            ORDER BY embedding <=> '{embedding_str}'::vector
-            LIMIT :top_k
+        # Os ajustes valem para a instrução inteira: usa o maior valor pedido no lote
+        self._apply_index_settings(
+            max((query.ef_search for _, query in pending if query.ef_search), default=None),
+            max((query.probes for _, query in pending if query.probes), default=None),
+            max(self._index_rows(query.top_k) for _, query in pending),
+            filtered=any(self._is_filtered(query.environment, query.filters) for _, query in pending)
+        )
+        for row in self.db.execute(text(sql), params).fetchall():
+            results[row.query_index].append(self._row_to_hit(row))
+        return results
+    
+    def _build_semantic_query(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        environment: Optional[str] = None,
+        min_score: Optional[float] = None,
+        offset: int = 0,
+        filters: Optional[PaintSearchFilters] = None,
+        suffix: str = "",
+        with_embedding: bool = False
+    ) -> Tuple[str, Dict]:
         """
-        params["top_k"] = top_k
+        Monta a consulta de vizinhos mais próximos para um embedding.
         
-        result = self.db.execute(text(sql), params)
-        rows = result.fetchall()
+        Args:
+            query_embedding: Embedding da query
+            top_k: Número de resultados
+            environment: Filtro opcional por ambiente
+            min_score: Similaridade mínima (1 - distância de cosseno)
+            offset: Vizinhos a pular (paginação)
+            filters: Filtros de atributos (linha, acabamento, superfície, características)
+            suffix: Sufixo dos parâmetros (permite combinar várias consultas)
+            with_embedding: Inclui a coluna embedding no resultado
         
-        # Converter rows para Paint entities
-        paints = []
-        for row in rows:
-            paint_model = PaintModel(
-                id=row.id,
-                name=row.name,
-                color=row.color,
-                surface_type=row.surface_type,
-                environment=row.environment,
-                finish_type=row.finish_type,
-                features=row.features,
-                line=row.line,
-                created_at=row.created_at,
-                updated_at=row.updated_at
+        Returns:
+            Tupla (sql, params); o sql já contém ORDER BY/LIMIT internos
+        """
+        params = {}
+        environment_filter = self._environment_filter_sql(environment, params, suffix)
+        environment_filter += self._attribute_filter_sql(filters, params, suffix)
+        params[f"top_k{suffix}"] = top_k
+        
+        sql = self._nearest_sql(
+            query_embedding,
+            PAINT_COLUMNS,
+            environment_filter,
+            f":top_k{suffix}",
+            params,
+            suffix,
+            min_score=min_score,
+            offset=offset,
+            with_embedding=with_embedding
+        )
+        return sql, params
+    
+    def _nearest_sql(
+        self,
+        query_embedding: List[float],
+        columns: str,
+        where: str,
+        limit: str,
+        params: Dict,
+        suffix: str = "",
+        min_score: Optional[float] = None,
+        offset: int = 0,
+        with_embedding: bool = False
+    ) -> str:
+        """
+        SQL dos vizinhos mais próximos (colunas + distance), ordenado pela distância.
+        
+        Com SEARCH_FIRST_PASS=short, a etapa inicial usa o índice do embedding_short
+        (halfvec 256) e só os candidatos são reordenados pela distância do vetor completo;
+        com SEARCH_FIRST_PASS=binary, usa o índice da distância de Hamming do
+        binary_quantize(embedding).
+        
+        Args:
+            query_embedding: Embedding da query
+            columns: Colunas de paints a retornar
+            where: Condições adicionais (iniciadas por AND)
+            limit: Expressão do LIMIT (ex: ":top_k")
+            params: Dicionário de parâmetros, completado com os embeddings
+            suffix: Sufixo dos parâmetros (permite combinar várias consultas)
+            min_score: Similaridade mínima; vira um limite de distância na consulta
+            offset: Vizinhos a pular antes do LIMIT
+            with_embedding: Inclui a coluna embedding no resultado
+        """
+        # O embedding vai como parâmetro (formato binário do pgvector), então o texto
+        # da consulta é estável e o psycopg pode prepará-la uma vez por conexão
+        params[f"embedding{suffix}"] = self._to_vector(query_embedding)
+        distance = f"embedding <=> CAST(:embedding{suffix} AS vector)"
+        
+        distance_filter = ""
+        if min_score is not None:
+            distance_filter = f"AND {distance} <= :max_distance{suffix}"
+            params[f"max_distance{suffix}"] = 1.0 - min_score
+        offset_clause = ""
+        rows = limit
+        if offset:
+            offset_clause = f"OFFSET :offset{suffix}"
+            params[f"offset{suffix}"] = offset
+            rows = f"({limit} + :offset{suffix})"
+        
+        extra_columns = ", embedding" if with_embedding else ""
+        
+        if settings.search.first_pass == "binary":
+            # Hamming entre os sinais das dimensões (índice paints_embedding_binary_idx)
+            params[f"candidates{suffix}"] = settings.search.rescore_candidates
+            return f"""
+                SELECT {columns}, {distance} AS distance{extra_columns}
+                FROM (
+                    SELECT {columns}, embedding
+                    FROM paints
+                    WHERE embedding IS NOT NULL {where}
+                    ORDER BY CAST(binary_quantize(embedding) AS bit({EMBEDDING_DIMENSIONS}))
+                        <~> binary_quantize(CAST(:embedding{suffix} AS vector))
+                    LIMIT GREATEST(:candidates{suffix}, {RESCORE_MULTIPLIER} * {rows})
+                ) AS candidates
+                WHERE TRUE {distance_filter}
+                ORDER BY distance
+                LIMIT {limit} {offset_clause}
+            """
+        
+        if settings.search.first_pass == "short":
+            params[f"embedding_short{suffix}"] = self._to_short_vector(query_embedding)
+            params[f"candidates{suffix}"] = settings.search.rescore_candidates
+            return f"""
+                SELECT {columns}, {distance} AS distance{extra_columns}
+                FROM (
+                    SELECT {columns}, embedding
+                    FROM paints
+                    WHERE embedding_short IS NOT NULL {where}
+                    ORDER BY embedding_short <=> CAST(:embedding_short{suffix} AS halfvec)
+                    LIMIT GREATEST(:candidates{suffix}, {RESCORE_MULTIPLIER} * {rows})
+                ) AS candidates
+                WHERE TRUE {distance_filter}
+                ORDER BY distance
+                LIMIT {limit} {offset_clause}
+            """
+        
+        return f"""
+            SELECT {columns}, {distance} AS distance{extra_columns}
+            FROM paints
+            WHERE embedding IS NOT NULL {where} {distance_filter}
+            ORDER BY {distance}
+            LIMIT {limit} {offset_clause}
+        """
+    
+    @staticmethod
+    def _environment_filter_sql(environment: Optional[str], params: Dict, suffix: str = "") -> str:
+        """
+        Condição SQL (iniciada por AND) do filtro de ambiente.
+        
+        Ambientes conhecidos vão como literal: o planejador só usa o índice vetorial
+        parcial do ambiente (migração a2c3d4e5f6a7) se conseguir provar o predicado
+        ao planejar, o que não acontece com parâmetros em planos genéricos de
+        prepared statements.
+        """
+        if not environment:
+            return ""
+        if environment in PAINT_ENVIRONMENTS:
+            return f"AND environment = '{environment}'"
+        params[f"environment{suffix}"] = environment
+        return f"AND environment = :environment{suffix}"
+    
+    @staticmethod
+    def _attribute_filter_sql(filters: Optional[PaintSearchFilters], params: Dict, suffix: str = "") -> str:
+        """
+        Condições SQL (iniciadas por AND) dos filtros de atributos.
+        
+        As expressões são as mesmas dos índices da migração f0a1b2c3d4e5
+        (lower(finish_type), superfícies como array, GIN em features), para
+        que o planejador possa usá-los.
+        """
+        if filters is None or filters.is_empty():
+            return ""
+        conditions = []
+        if filters.line:
+            conditions.append(f"line = :line{suffix}")
+            params[f"line{suffix}"] = filters.line
+        if filters.finish_type:
+            conditions.append(f"lower(finish_type) = :finish_type{suffix}")
+            params[f"finish_type{suffix}"] = filters.finish_type.strip().lower()
+        if filters.surface_type:
+            conditions.append(
+                "regexp_split_to_array(lower(btrim(surface_type)), '\\s*,\\s*') "
+                f"@> ARRAY[CAST(:surface_type{suffix} AS text)]"
             )
-            paints.append(self._model_to_entity(paint_model))
+            params[f"surface_type{suffix}"] = filters.surface_type.strip().lower()
+        if filters.features_any:
+            conditions.append(f"features && CAST(:features_any{suffix} AS varchar[])")
+            params[f"features_any{suffix}"] = list(filters.features_any)
+        if filters.features_all:
+            conditions.append(f"features @> CAST(:features_all{suffix} AS varchar[])")
+            params[f"features_all{suffix}"] = list(filters.features_all)
+        return "".join(f" AND {condition}" for condition in conditions)
+    
+    @staticmethod
+    def _is_filtered(environment: Optional[str], filters: Optional[PaintSearchFilters]) -> bool:
+        return bool(environment) or (filters is not None and not filters.is_empty())
+    
+    @staticmethod
+    def _to_short_vector(query_embedding: List[float]) -> HalfVector:
+        """Primeiras SHORT_EMBEDDING_DIMENSIONS dimensões do embedding, renormalizadas, como halfvec"""
+        array = np.asarray(query_embedding, dtype=np.float32)[:SHORT_EMBEDDING_DIMENSIONS]
+        norm = float(np.linalg.norm(array))
+        if norm > 0:
+            array = array / norm
+        return HalfVector(array)
+    
+    @staticmethod
+    def _mmr_candidates(top_k: int) -> int:
+        """Candidatos buscados para o re-rank por diversidade"""
+        return max(settings.search.mmr_candidates, MMR_MULTIPLIER * top_k)
+    
+    @staticmethod
+    def _embedding_matrix(embeddings: List) -> np.ndarray:
+        """Empilha embeddings das linhas; embeddings nulos viram linhas de zeros"""
+        arrays = [to_array(embedding) if embedding is not None else None for embedding in embeddings]
+        dimensions = next((array.shape[0] for array in arrays if array is not None), 0)
+        matrix = np.zeros((len(arrays), dimensions), dtype=np.float32)
+        for row, array in enumerate(arrays):
+            if array is not None:
+                matrix[row] = array
+        return matrix
+    
+    @staticmethod
+    def _diversify(
+        hits: List[PaintSearchHit],
+        embeddings: np.ndarray,
+        top_k: int,
+        diversity: float,
+        normalize: bool = False
+    ) -> List[PaintSearchHit]:
+        """
+        Reordena os candidatos por MMR usando o score como relevância.
         
-        return paints
+        normalize divide os scores pelo maior, para scores fora da escala do cosseno
+        (ex: reciprocal rank fusion).
+        """
+        if not hits:
+            return hits
+        relevance = np.array([hit.score for hit in hits], dtype=np.float32)
+        best = float(relevance.max())
+        if normalize and best > 0:
+            relevance = relevance / best
+        return [hits[position] for position in mmr_select(relevance, embeddings, top_k, diversity)]
+    
+    def _index_rows(self, limit: int) -> int:
+        """Linhas que a varredura do índice vetorial precisa devolver para um LIMIT"""
+        if settings.search.first_pass in ("short", "binary"):
+            return self._rescore_rows(limit)
+        return limit
+    
+    @staticmethod
+    def _rescore_rows(limit: int) -> int:
+        """Candidatos da etapa aproximada reordenados pela distância exata"""
+        return max(settings.search.rescore_candidates, RESCORE_MULTIPLIER * limit)
+    
+    def _rescore_exact(
+        self,
+        query_embeddings: List[List[float]],
+        candidate_lists: List[List[Tuple[Paint, float]]],
+        limits: List[int]
+    ) -> List[List[Tuple[Paint, float]]]:
+        """
+        Reordena candidatos do índice em memória quantizado pela distância exata.
+        
+        Os embeddings completos dos candidatos de todas as consultas são lidos do
+        banco em uma única consulta pela chave primária.
+        """
+        ids = sorted({paint.id for candidates in candidate_lists for paint, _ in candidates})
+        embeddings = {}
+        if ids:
+            rows = self.db.execute(
+                text("SELECT id, embedding FROM paints WHERE id = ANY(:ids) AND embedding IS NOT NULL"),
+                {"ids": ids}
+            ).fetchall()
+            embeddings = {row.id: to_array(row.embedding) for row in rows}
+        return [
+            exact_rescore(query_embedding, candidates, embeddings, limit)
+            for query_embedding, candidates, limit in zip(query_embeddings, candidate_lists, limits)
+        ]
+    
+    def _apply_index_settings(
+        self,
+        ef_search: Optional[int],
+        probes: Optional[int],
+        index_rows: int = 0,
+        filtered: bool = False
+    ) -> Dict[str, str]:
+        """
+        Ajusta hnsw.ef_search / ivfflat.probes apenas para a transação atual.
+        
+        Sem valor explícito usa SEARCH_EF_SEARCH / SEARCH_PROBES; sem nenhum dos
+        dois mantém o padrão do servidor e não faz ida extra ao banco. Se a consulta
+        precisar de mais linhas do índice do que o ef_search, ele é aumentado.
+        
+        Com filtros, liga o hnsw.iterative_scan (SEARCH_ITERATIVE_SCAN): sem ele o
+        índice devolve só ef_search candidatos e os filtros podem descartar quase
+        todos, retornando menos resultados que o LIMIT.
+        
+        Returns:
+            Ajustes aplicados (nome -> valor)
+        """
+        ef_search = ef_search or settings.search.ef_search
+        if index_rows > (ef_search or HNSW_DEFAULT_EF_SEARCH):
+            ef_search = min(index_rows, HNSW_MAX_EF_SEARCH)
+        values = {
+            "hnsw.ef_search": ef_search,
+            "ivfflat.probes": probes or settings.search.probes,
+        }
+        values = {name: str(int(value)) for name, value in values.items() if value}
+        if filtered and settings.search.iterative_scan != "off":
+            values["hnsw.iterative_scan"] = settings.search.iterative_scan
+        if not values:
+            return values
+        
+        # set_config(..., true) equivale a SET LOCAL e aceita parâmetros
+        calls = ", ".join(f"set_config(:name_{i}, :value_{i}, true)" for i in range(len(values)))
+        params = {}
+        for i, (name, value) in enumerate(values.items()):
+            params[f"name_{i}"] = name
+            params[f"value_{i}"] = value
+        self.db.execute(text(f"SELECT {calls}"), params)
+        return values
+    
+    @staticmethod
+    def _to_vector(query_embedding: List[float]) -> Vector:
+        """Valida e converte o embedding para pgvector.Vector"""
+        try:
+            array = np.asarray(query_embedding, dtype=np.float32)
+        except (TypeError, ValueError):
+            raise ValueError("query_embedding deve ser uma lista de números")
+        if array.ndim != 1 or not np.isfinite(array).all():
+            raise ValueError("query_embedding deve ser uma lista de números")
+        return Vector(array)
     
     def update_embedding(self, paint_id: int, embedding: List[float]) -> bool:
         """Atualiza o embedding de uma tinta"""
@@ -158,9 +854,166 @@ class PaintRepositoryImpl(PaintRepository):
             return False
         
         paint_model.embedding = embedding
+        paint_model.embedding_status = "ready"
+        paint_model.embedding_attempts = 0
+        paint_model.embedding_error = None
+        paint_model.embedding_next_attempt_at = None
+        paint_model.embedding_locked_until = None
+        # Explícito no mesmo UPDATE: o refresh incremental dos índices em memória segue updated_at
+        paint_model.updated_at = func.now()
+        self.db.commit()
+        if self.vector_index is not None:
+            self.db.refresh(paint_model)
+            self.vector_index.upsert(self._model_to_entity(paint_model), embedding)
+        return True
+    
+    def mark_embedding_pending(self, paint_id: int) -> bool:
+        """Coloca a tinta na fila do worker de embeddings (embedding_status 'pending')"""
+        # Sem lease: se um worker estiver processando a versão anterior, a gravação
+        # dele é descartada (updated_at mudou) e a nova versão é reivindicada em seguida
+        result = self.db.execute(text("""
+            UPDATE paints
+            SET embedding_status = 'pending', embedding_attempts = 0, embedding_error = NULL,
+                embedding_next_attempt_at = NULL, embedding_locked_until = NULL
+            WHERE id = :id
+        """), {"id": paint_id})
+        self.db.commit()
+        return result.rowcount > 0
+    
+    def claim_pending_embeddings(self, limit: int, lease_seconds: float) -> List[EmbeddingJob]:
+        """Reivindica até limit tintas pendentes por lease_seconds (linhas já reivindicadas são puladas)"""
+        # FOR UPDATE SKIP LOCKED: várias instâncias do worker reivindicam lotes disjuntos
+        # sem esperar umas pelas outras; o lease cobre o tempo fora da transação
+        rows = self.db.execute(text(f"""
+            UPDATE paints
+            SET embedding_locked_until = now() + make_interval(secs => :lease_seconds)
+            WHERE id IN (
+                SELECT id FROM paints
+                WHERE embedding_status = 'pending'
+                  AND (embedding_next_attempt_at IS NULL OR embedding_next_attempt_at <= now())
+                  AND (embedding_locked_until IS NULL OR embedding_locked_until < now())
+                ORDER BY embedding_next_attempt_at NULLS FIRST, id
+                LIMIT :limit
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {PAINT_COLUMNS}, embedding_attempts
+        """), {"limit": limit, "lease_seconds": lease_seconds}).fetchall()
         self.db.commit()
+        jobs = [EmbeddingJob(self._row_to_entity(row), row.embedding_attempts) for row in rows]
+        jobs.sort(key=lambda job: job.paint.id)
+        return jobs
+    
+    def complete_embedding(self, paint_id: int, embedding: List[float], claimed_updated_at: datetime) -> bool:
+        """Grava o embedding gerado pelo worker; False se a tinta mudou ou foi removida desde a reivindicação"""
+        # updated_at avança para o refresh incremental do índice em memória dos outros processos
+        row = self.db.execute(text(f"""
+            UPDATE paints
+            SET embedding = CAST(:embedding AS vector), embedding_status = 'ready',
+                embedding_attempts = 0, embedding_error = NULL,
+                embedding_next_attempt_at = NULL, embedding_locked_until = NULL,
+                updated_at = now()
+            WHERE id = :id AND updated_at = :claimed_updated_at
+            RETURNING {PAINT_COLUMNS}
+        """), {
+            "id": paint_id,
+            "embedding": self._to_vector(embedding),
+            "claimed_updated_at": claimed_updated_at
+        }).fetchone()
+        self.db.commit()
+        if row is None:
+            return False
+        if self.vector_index is not None:
+            self.vector_index.upsert(self._row_to_entity(row), embedding)
         return True
     
+    def fail_embedding(
+        self,
+        paint_id: int,
+        error: str,
+        claimed_updated_at: datetime,
+        retry_at: Optional[datetime]
+    ) -> bool:
+        """Registra a falha; volta para a fila em retry_at ou, sem retry_at, fica 'failed'"""
+        result = self.db.execute(text("""
+            UPDATE paints
+            SET embedding_status = :status, embedding_attempts = embedding_attempts + 1,
+                embedding_error = :error, embedding_next_attempt_at = :retry_at,
+                embedding_locked_until = NULL
+            WHERE id = :id AND updated_at = :claimed_updated_at
+        """), {
+            "id": paint_id,
+            "status": "pending" if retry_at is not None else "failed",
+            "error": error[:1000],
+            "retry_at": retry_at,
+            "claimed_updated_at": claimed_updated_at
+        })
+        self.db.commit()
+        return result.rowcount > 0
+    
+    def retry_failed_embeddings(self) -> int:
+        """Devolve as tintas 'failed' para a fila. Retorna o número de tintas"""
+        result = self.db.execute(text("""
+            UPDATE paints
+            SET embedding_status = 'pending', embedding_attempts = 0,
+                embedding_next_attempt_at = NULL, embedding_locked_until = NULL
+            WHERE embedding_status = 'failed'
+        """))
+        self.db.commit()
+        return result.rowcount
+    
+    def embedding_status_counts(self) -> Dict[str, int]:
+        """Número de tintas por embedding_status"""
+        rows = self.db.execute(text("""
+            SELECT embedding_status, count(*) AS total FROM paints GROUP BY embedding_status
+        """)).fetchall()
+        counts = {status: 0 for status in EMBEDDING_STATUSES}
+        counts.update({row.embedding_status: row.total for row in rows})
+        return counts
+    
+    def _row_to_hit(self, row) -> PaintSearchHit:
+        """Converte uma linha da busca semântica (com distance) para PaintSearchHit"""
+        distance = float(row.distance)
+        return PaintSearchHit(self._row_to_entity(row), distance, 1.0 - distance)
+    
+    @staticmethod
+    def _filter_hits(hits: List[PaintSearchHit], min_score: Optional[float]) -> List[PaintSearchHit]:
+        if min_score is None:
+            return hits
+        return [hit for hit in hits if hit.score >= min_score]
+    
+    def _commit_paint_names(self, names: List[str]) -> None:
+        """Commit de uma escrita em paints; nome repetido vira ValueError"""
+        try:
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            self._raise_if_duplicate_name(e, names)
+            raise
+    
+    @staticmethod
+    def _raise_if_duplicate_name(error: IntegrityError, names: List[str]) -> None:
+        """ValueError se a violação for do índice único do nome (paints_name_normalized_key)"""
+        if PAINT_NAME_INDEX in str(error.orig):
+            if len(names) == 1:
+                raise ValueError(f"Já existe uma tinta com o nome '{names[0]}'")
+            raise ValueError("Já existe uma tinta com um dos nomes do lote")
+    
+    def _row_to_entity(self, row) -> Paint:
+        """Converte uma linha de consulta SQL para Paint (entidade de domínio)"""
+        return Paint(
+            id=row.id,
+            name=row.name,
+            color=row.color,
+            surface_type=row.surface_type,
+            environment=row.environment,
+            finish_type=row.finish_type,
+            features=row.features or [],
+            line=row.line,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            embedding_status=row.embedding_status
+        )
+    
     def _model_to_entity(self, model: PaintModel) -> Paint:
         """Converte PaintModel (ORM) para Paint (entidade de domínio)"""
         return Paint(
@@ -173,5 +1026,6 @@ class PaintRepositoryImpl(PaintRepository):
             features=model.features or [],
             line=model.line,
             created_at=model.created_at,
-            updated_at=model.updated_at
+            updated_at=model.updated_at,
+            embedding_status=model.embedding_status
         )
@@ -0,0 +1,22 @@
+from app.infrastructure.search.vector_index import InMemoryVectorIndex, get_vector_index
+from app.infrastructure.search.diversity import mmr_select
+from app.infrastructure.search.quantization import QUANTIZATIONS, exact_rescore, to_array
+from app.infrastructure.search.index_manager import (
+    IndexParameters,
+    VectorIndexManager,
+    get_vector_index_manager,
+    recommend_parameters,
+)
+
+__all__ = [
+    "InMemoryVectorIndex",
+    "get_vector_index",
+    "mmr_select",
+    "QUANTIZATIONS",
+    "exact_rescore",
+    "to_array",
+    "IndexParameters",
+    "VectorIndexManager",
+    "get_vector_index_manager",
+    "recommend_parameters",
+]
@@ -0,0 +1,52 @@
+from typing import List
+import numpy as np
+
+
+def mmr_select(
+    relevance: np.ndarray,
+    embeddings: np.ndarray,
+    top_k: int,
+    diversity: float
+) -> List[int]:
+    """
+    Seleciona top_k candidatos por maximal marginal relevance (MMR).
+
+    A cada passo escolhe o candidato que maximiza
+    (1 - diversity) * relevância - diversity * maior similaridade com os já escolhidos,
+    então variantes quase idênticas (ex: cores do mesmo produto) perdem posição
+    para resultados relevantes e diferentes entre si.
+
+    Args:
+        relevance: Relevância de cada candidato para a query (ex: similaridade de cosseno)
+        embeddings: Matriz (candidatos x dimensões); linhas nulas não penalizam ninguém
+        top_k: Número de candidatos a selecionar
+        diversity: Peso da diversidade entre 0 (só relevância) e 1
+
+    Returns:
+        Posições dos candidatos selecionados, na ordem de seleção
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    count = relevance.shape[0]
+    k = min(top_k, count)
+    if k <= 0:
+        return []
+    if diversity <= 0:
+        return np.argsort(-relevance, kind="stable")[:k].tolist()
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    # Maior similaridade de cada candidato com os já selecionados
+    max_similarity = np.full(count, -np.inf, dtype=np.float32)
+    available = np.ones(count, dtype=bool)
+    selected: List[int] = []
+    for _ in range(k):
+        penalty = np.where(np.isfinite(max_similarity), max_similarity, 0.0)
+        scores = (1.0 - diversity) * relevance - diversity * penalty
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, matrix @ matrix[best], out=max_similarity)
+    return selected
@@ -0,0 +1,431 @@
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import logging
+import math
+import re
+import threading
+import time
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from app.infrastructure.config.settings import settings
+from app.infrastructure.database.connection import engine
+from app.infrastructure.database.models.paint_model import EMBEDDING_DIMENSIONS, PAINT_ENVIRONMENTS
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "paints_embedding_idx"
+SHORT_INDEX_NAME = "paints_embedding_short_idx"
+BINARY_INDEX_NAME = "paints_embedding_binary_idx"
+INDEX_METHODS = ("hnsw", "ivfflat")
+
+# Mesma forma da consulta da busca semântica: ORDER BY distância + LIMIT usa o índice
+# ({environment}: filtro do ambiente, que leva ao índice parcial paints_embedding_<ambiente>_idx)
+KNN_SQL = """
+    SELECT id
+    FROM paints
+    WHERE embedding IS NOT NULL{environment}
+    ORDER BY embedding <=> CAST(:embedding AS vector)
+    LIMIT :top_k
+"""
+
+
+@dataclass
+class IndexParameters:
+    """Parâmetros de construção e de consulta de um índice vetorial"""
+    method: str
+    lists: Optional[int] = None  # ivfflat (construção)
+    probes: Optional[int] = None  # ivfflat (consulta)
+    m: Optional[int] = None  # hnsw (construção)
+    ef_construction: Optional[int] = None  # hnsw (construção)
+    ef_search: Optional[int] = None  # hnsw (consulta)
+
+    def with_clause(self) -> str:
+        """Cláusula WITH (...) do CREATE INDEX"""
+        if self.method == "ivfflat":
+            return f"lists = {int(self.lists)}"
+        return f"m = {int(self.m)}, ef_construction = {int(self.ef_construction)}"
+
+
+@dataclass
+class IndexDefinition:
+    """Índice vetorial gerenciado: coluna, operator class e condição de índice parcial"""
+    name: str
+    column: str
+    opclass: str
+    environment: Optional[str] = None  # Índice parcial WHERE environment = ...
+
+    @property
+    def where(self) -> Optional[str]:
+        return f"environment = '{self.environment}'" if self.environment else None
+
+
+def environment_index_name(index_name: str, environment: str) -> str:
+    """Nome do índice parcial de um ambiente (ex: paints_embedding_interno_idx)"""
+    return f"{index_name[:-len('_idx')]}_{environment}_idx"
+
+
+def recommend_parameters(row_count: int, method: str = "hnsw") -> IndexParameters:
+    """
+    Recomenda parâmetros do índice a partir da quantidade de linhas com embedding.
+
+    Segue a orientação do pgvector: ivfflat com lists = linhas / 1000 até 1M de
+    linhas (sqrt(linhas) acima disso) e probes = sqrt(lists); hnsw com m = 16 e
+    ef_construction = 64, aumentando ambos em tabelas muito grandes.
+
+    Raises:
+        ValueError: Se o método não for suportado
+    """
+    if method == "ivfflat":
+        if row_count <= 1_000_000:
+            lists = max(1, row_count // 1000)
+        else:
+            lists = int(math.sqrt(row_count))
+        return IndexParameters(method, lists=lists, probes=max(1, int(math.sqrt(lists))))
+    if method == "hnsw":
+        if row_count <= 1_000_000:
+            return IndexParameters(method, m=16, ef_construction=64, ef_search=40)
+        return IndexParameters(method, m=32, ef_construction=128, ef_search=100)
+    raise ValueError(f"Método de índice inválido: {method}. Use um de {INDEX_METHODS}")
+
+
+class VectorIndexManager:
+    """
+    Ciclo de vida do índice vetorial (pgvector) da tabela paints.
+
+    Inspeciona o índice atual, recomenda parâmetros pelo tamanho da tabela,
+    reconstrói o índice sem bloquear escritas (CREATE INDEX CONCURRENTLY) e
+    mede o recall da busca aproximada contra a busca exata.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._rebuild_lock = threading.Lock()
+        self.last_rebuild: Optional[Dict] = None
+
+    @property
+    def is_rebuilding(self) -> bool:
+        """Indica se há uma reconstrução em andamento neste processo"""
+        return self._rebuild_lock.locked()
+
+    def status(self) -> Dict:
+        """
+        Retorna o estado do índice vetorial.
+
+        Returns:
+            dict: Contagem de linhas, índices existentes (método, opções, tamanho,
+            validade), progresso de construção e parâmetros recomendados
+        """
+        with self.engine.connect() as conn:
+            counts = conn.execute(text(
+                "SELECT count(*) AS total, count(embedding) AS embedded FROM paints"
+            )).one()
+            indexes = self._vector_indexes(conn)
+            progress = conn.execute(text("""
+                SELECT phase, blocks_done, blocks_total, tuples_done, tuples_total
+                FROM pg_stat_progress_create_index
+                WHERE relid = 'paints'::regclass
+            """)).mappings().first()
+
+        method = indexes[0]["method"] if indexes else settings.search.index_method
+        return {
+            "total_rows": counts.total,
+            "embedded_rows": counts.embedded,
+            "indexes": indexes,
+            "recommended": asdict(recommend_parameters(counts.embedded, method)),
+            "rebuilding": self.is_rebuilding or progress is not None,
+            "progress": dict(progress) if progress is not None else None,
+            "last_rebuild": self.last_rebuild,
+        }
+
+    def rebuild(
+        self,
+        method: Optional[str] = None,
+        lists: Optional[int] = None,
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+        concurrently: bool = True
+    ) -> Dict:
+        """
+        Reconstrói os índices vetoriais com parâmetros recomendados para o tamanho atual.
+
+        Cada índice é dimensionado pelas suas próprias linhas: os parciais por ambiente
+        pelas linhas do ambiente. Os índices da primeira etapa (halfvec de 256 dimensões
+        e binário) usam a mesma regra por quantidade de linhas do índice completo; a regra
+        não considera o perfil de distâncias de cada representação.
+
+        Com concurrently=True o novo índice é criado com CREATE INDEX CONCURRENTLY
+        sob um nome temporário e só então substitui o atual, então buscas e escritas
+        continuam funcionando durante a construção.
+
+        Args:
+            method: "hnsw" ou "ivfflat" (padrão: SEARCH_INDEX_METHOD)
+            lists: Sobrescreve o lists recomendado (ivfflat)
+            m: Sobrescreve o m recomendado (hnsw)
+            ef_construction: Sobrescreve o ef_construction recomendado (hnsw)
+            concurrently: Constrói sem bloquear escritas na tabela
+
+        Returns:
+            dict: Parâmetros do índice global, linhas e parâmetros de cada índice e duração
+
+        Raises:
+            ValueError: Se o método for inválido
+            RuntimeError: Se já houver uma reconstrução em andamento
+        """
+        if not self._rebuild_lock.acquire(blocking=False):
+            raise RuntimeError("Já existe uma reconstrução do índice vetorial em andamento")
+        try:
+            counts = self._embedded_counts()
+            method = method or settings.search.index_method
+            built = {}
+            start = time.perf_counter()
+            for definition in self._index_definitions():
+                rows = counts[definition.environment]
+                parameters = recommend_parameters(rows, method)
+                if lists is not None:
+                    parameters.lists = lists
+                if m is not None:
+                    parameters.m = m
+                if ef_construction is not None:
+                    parameters.ef_construction = ef_construction
+                built[definition.name] = {"rows": rows, **asdict(parameters)}
+                logger.info(f"Reconstruindo índice {definition.name}: {built[definition.name]} (concurrently={concurrently})")
+                if concurrently:
+                    self._rebuild_concurrently(definition, parameters)
+                else:
+                    with self.engine.begin() as conn:
+                        conn.execute(text(f"DROP INDEX IF EXISTS {definition.name}"))
+                        conn.execute(text(self._create_index_sql(definition, parameters)))
+            elapsed = time.perf_counter() - start
+
+            self.last_rebuild = {
+                "parameters": {key: value for key, value in built[INDEX_NAME].items() if key != "rows"},
+                "indexes": built,
+                "concurrently": concurrently,
+                "duration_seconds": round(elapsed, 3),
+                "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            }
+            logger.info(f"Índice vetorial reconstruído em {elapsed:.2f}s")
+            return self.last_rebuild
+        finally:
+            self._rebuild_lock.release()
+
+    def evaluate(
+        self,
+        top_k: int = 10,
+        sample_size: int = 50,
+        values: Optional[List[int]] = None,
+        environment: Optional[str] = None
+    ) -> Dict:
+        """
+        Mede recall@k e latência da busca aproximada contra a busca exata.
+
+        Usa embeddings de tintas do próprio catálogo como consultas. A busca exata
+        desliga index scans na transação (varredura sequencial + ordenação); a
+        aproximada é executada com cada valor de hnsw.ef_search ou ivfflat.probes.
+
+        Sem environment avalia o índice global (paints_embedding_idx); com ele, o
+        índice parcial do ambiente, usado pelas buscas filtradas por ambiente. Os
+        índices da primeira etapa (halfvec e binário, SEARCH_FIRST_PASS) não são
+        avaliados aqui: ver benchmarks/search_first_pass.py.
+
+        Args:
+            top_k: Número de vizinhos comparados
+            sample_size: Número de consultas amostradas
+            values: Valores de ef_search/probes a avaliar (padrão: derivados do índice)
+            environment: Avalia o índice parcial deste ambiente
+
+        Returns:
+            dict: Índice avaliado, método, latência da busca exata e recall/latência por valor
+
+        Raises:
+            ValueError: Se o ambiente for inválido
+        """
+        if environment is not None and environment not in PAINT_ENVIRONMENTS:
+            raise ValueError(f"Ambiente inválido: {environment}. Use um de {PAINT_ENVIRONMENTS}")
+        index_name = environment_index_name(INDEX_NAME, environment) if environment else INDEX_NAME
+        with self.engine.connect() as conn:
+            indexes = self._vector_indexes(conn)
+            samples = conn.execute(text("""
+                SELECT embedding FROM paints
+                WHERE embedding IS NOT NULL AND (CAST(:environment AS text) IS NULL OR environment = :environment)
+                ORDER BY random()
+                LIMIT :sample_size
+            """), {"sample_size": sample_size, "environment": environment}).scalars().all()
+            conn.rollback()
+
+            index = next((index for index in indexes if index["name"] == index_name), None)
+            method = index["method"] if index else None
+            setting = "ivfflat.probes" if method == "ivfflat" else "hnsw.ef_search"
+            if values is None:
+                values = self._default_values(method, index["options"] if index else {}, top_k)
+
+            exact_ids = []
+            exact_latencies = []
+            for embedding in samples:
+                ids, elapsed = self._timed_knn(conn, embedding, top_k, {"enable_indexscan": "off"}, environment)
+                exact_ids.append(set(ids))
+                exact_latencies.append(elapsed)
+
+            results = []
+            for value in values:
+                recalls = []
+                latencies = []
+                for embedding, expected in zip(samples, exact_ids):
+                    ids, elapsed = self._timed_knn(conn, embedding, top_k, {setting: str(value)}, environment)
+                    recalls.append(len(expected.intersection(ids)) / len(expected) if expected else 1.0)
+                    latencies.append(elapsed)
+                results.append({
+                    "setting": setting,
+                    "value": value,
+                    "recall": round(float(np.mean(recalls)), 4) if recalls else None,
+                    **self._latency_summary(latencies),
+                })
+
+        return {
+            "index": index_name,
+            "method": method,
+            "top_k": top_k,
+            "sample_size": len(samples),
+            "exact": self._latency_summary(exact_latencies),
+            "results": results,
+        }
+
+    def _embedded_counts(self) -> Dict[Optional[str], int]:
+        """Linhas com embedding no total (chave None) e por ambiente"""
+        columns = ", ".join(
+            f"count(embedding) FILTER (WHERE environment = '{environment}') AS {environment}"
+            for environment in PAINT_ENVIRONMENTS
+        )
+        with self.engine.connect() as conn:
+            row = conn.execute(text(f"SELECT count(embedding) AS total, {columns} FROM paints")).mappings().one()
+        return {None: row["total"], **{environment: row[environment] for environment in PAINT_ENVIRONMENTS}}
+
+    def _index_definitions(self) -> List[IndexDefinition]:
+        """Índices vetoriais gerenciados (globais e parciais por ambiente)"""
+        definitions = [
+            IndexDefinition(INDEX_NAME, "embedding", "vector_cosine_ops"),
+            IndexDefinition(SHORT_INDEX_NAME, "embedding_short", "halfvec_cosine_ops"),
+            IndexDefinition(
+                BINARY_INDEX_NAME,
+                f"(CAST(binary_quantize(embedding) AS bit({EMBEDDING_DIMENSIONS})))",
+                "bit_hamming_ops"
+            ),
+        ]
+        for environment in PAINT_ENVIRONMENTS:
+            definitions.append(IndexDefinition(
+                environment_index_name(INDEX_NAME, environment), "embedding", "vector_cosine_ops", environment
+            ))
+            definitions.append(IndexDefinition(
+                environment_index_name(SHORT_INDEX_NAME, environment), "embedding_short", "halfvec_cosine_ops", environment
+            ))
+        return definitions
+
+    def _create_index_sql(
+        self,
+        definition: IndexDefinition,
+        parameters: IndexParameters,
+        name: Optional[str] = None,
+        concurrently: bool = False
+    ) -> str:
+        sql = (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}{name or definition.name} "
+            f"ON paints USING {parameters.method} ({definition.column} {definition.opclass}) "
+            f"WITH ({parameters.with_clause()})"
+        )
+        if definition.where:
+            sql += f" WHERE {definition.where}"
+        return sql
+
+    def _rebuild_concurrently(self, definition: IndexDefinition, parameters: IndexParameters) -> None:
+        temporary = f"{definition.name}_rebuild"
+        # CONCURRENTLY não pode rodar dentro de transação
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            # Uma construção concorrente interrompida deixa um índice inválido para trás
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {temporary}"))
+            conn.execute(text(self._create_index_sql(definition, parameters, name=temporary, concurrently=True)))
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {definition.name}"))
+            conn.execute(text(f"ALTER INDEX {temporary} RENAME TO {definition.name}"))
+
+    def _vector_indexes(self, conn: Connection) -> List[Dict]:
+        rows = conn.execute(text("""
+            SELECT
+                c.relname AS name,
+                pg_get_indexdef(c.oid) AS definition,
+                pg_relation_size(c.oid) AS size_bytes,
+                i.indisvalid AS valid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_am am ON am.oid = c.relam
+            WHERE i.indrelid = 'paints'::regclass
+              AND am.amname IN ('hnsw', 'ivfflat')
+            ORDER BY c.relname
+        """)).mappings().all()
+
+        indexes = []
+        for row in rows:
+            method = re.search(r"USING (\w+)", row["definition"])
+            options = re.search(r"WITH \(([^)]*)\)", row["definition"])
+            indexes.append({
+                "name": row["name"],
+                "method": method.group(1) if method else None,
+                "options": self._parse_options(options.group(1)) if options else {},
+                "size_bytes": row["size_bytes"],
+                "valid": row["valid"],
+                "definition": row["definition"],
+            })
+        return indexes
+
+    @staticmethod
+    def _parse_options(options: str) -> Dict[str, str]:
+        parsed = {}
+        for option in options.split(","):
+            key, _, value = option.partition("=")
+            parsed[key.strip()] = value.strip().strip("'")
+        return parsed
+
+    @staticmethod
+    def _default_values(method: Optional[str], options: Dict[str, str], top_k: int) -> List[int]:
+        if method == "ivfflat":
+            lists = int(options.get("lists", 100))
+            probes = max(1, int(math.sqrt(lists)))
+            return sorted({1, probes, min(lists, probes * 2), lists})
+        return sorted({max(top_k, 10), 40, 100, 200})
+
+    @staticmethod
+    def _timed_knn(
+        conn: Connection,
+        embedding,
+        top_k: int,
+        config: Dict[str, str],
+        environment: Optional[str] = None
+    ) -> Tuple[List[int], float]:
+        # set_config(..., true) vale só para a transação; o rollback descarta o ajuste
+        for name, value in config.items():
+            conn.execute(text("SELECT set_config(:name, :value, true)"), {"name": name, "value": value})
+        start = time.perf_counter()
+        sql = KNN_SQL.format(environment=" AND environment = :environment" if environment else "")
+        params = {"embedding": embedding, "top_k": top_k}
+        if environment:
+            params["environment"] = environment
+        ids = conn.execute(text(sql), params).scalars().all()
+        elapsed = time.perf_counter() - start
+        conn.rollback()
+        return ids, elapsed
+
+    @staticmethod
+    def _latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+        if not latencies:
+            return {"avg_latency_ms": None, "p95_latency_ms": None}
+        values = np.array(latencies) * 1000
+        return {
+            "avg_latency_ms": round(float(values.mean()), 3),
+            "p95_latency_ms": round(float(np.percentile(values, 95)), 3),
+        }
+
+
+@lru_cache(maxsize=None)
+def get_vector_index_manager() -> VectorIndexManager:
+    """Retorna a instância única do gerenciador do índice vetorial"""
+    return VectorIndexManager(engine)
@@ -0,0 +1,141 @@
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+from pgvector import HalfVector, Vector
+from app.domain.entities.paint import Paint
+
+QUANTIZATIONS = ("none", "int8", "binary")
+# Componentes do embedding normalizado ficam em [-1, 1]: int8 = round(valor * 127)
+INT8_SCALE = 127
+# Linhas convertidas por vez no cálculo dos scores aproximados (limita a memória temporária)
+BLOCK_ROWS = 16384
+# Bits ligados em cada byte, para a distância de Hamming
+POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint16)
+
+
+def to_array(embedding: Any) -> np.ndarray:
+    """
+    Converte um embedding em vetor float32.
+
+    Linhas de consultas text() trazem pgvector.Vector / HalfVector (registrados no
+    psycopg), que não aceitam len() nem np.asarray; listas e arrays passam direto.
+    """
+    if isinstance(embedding, (Vector, HalfVector)):
+        embedding = embedding.to_numpy()
+    return np.asarray(embedding, dtype=np.float32)
+
+
+def code_shape(dimensions: int, quantization: str) -> Tuple[int, np.dtype]:
+    """Colunas e dtype do código de um embedding (float32, int8 ou bits compactados em uint8)"""
+    if quantization == "int8":
+        return dimensions, np.dtype(np.int8)
+    if quantization == "binary":
+        return (dimensions + 7) // 8, np.dtype(np.uint8)
+    return dimensions, np.dtype(np.float32)
+
+
+def encode(vectors: np.ndarray, quantization: str) -> np.ndarray:
+    """
+    Quantiza embeddings normalizados (uma linha por embedding).
+
+    int8 guarda cada componente em um byte (4x menor que float32); binary guarda só o
+    sinal de cada componente, 8 por byte (32x menor).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if quantization == "int8":
+        return np.clip(np.round(vectors * INT8_SCALE), -INT8_SCALE, INT8_SCALE).astype(np.int8)
+    if quantization == "binary":
+        return np.packbits(vectors > 0, axis=1)
+    return vectors
+
+
+def decode(codes: np.ndarray, dimensions: int, quantization: str) -> np.ndarray:
+    """Aproximação float32 normalizada dos embeddings a partir dos códigos"""
+    if quantization == "int8":
+        vectors = codes.astype(np.float32)
+    elif quantization == "binary":
+        vectors = np.unpackbits(codes, axis=1, count=dimensions).astype(np.float32) * 2.0 - 1.0
+    else:
+        return np.asarray(codes, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def approximate_scores(codes: np.ndarray, queries: np.ndarray, dimensions: int, quantization: str) -> np.ndarray:
+    """
+    Similaridade aproximada (escala do cosseno) entre os códigos e as queries normalizadas.
+
+    int8 usa o produto interno inteiro entre os códigos e a query quantizada; binary
+    usa a distância de Hamming entre os sinais, convertida para
+    cos(pi * hamming / dimensões). Os códigos são processados em blocos, sem
+    materializar cópias da matriz inteira.
+
+    Returns:
+        Matriz (linhas x queries)
+    """
+    if quantization not in ("int8", "binary"):
+        return codes @ queries.T
+
+    scores = np.empty((codes.shape[0], queries.shape[0]), dtype=np.float32)
+    if quantization == "int8":
+        query_codes = encode(queries, quantization)
+        for start in range(0, codes.shape[0], BLOCK_ROWS):
+            block = codes[start:start + BLOCK_ROWS]
+            # Acumula em int32: o produto de dois int8 estoura o int8
+            dots = np.einsum("ij,kj->ik", block, query_codes, dtype=np.int32)
+            scores[start:start + block.shape[0]] = dots / float(INT8_SCALE * INT8_SCALE)
+        return scores
+
+    query_bits = encode(queries, quantization)
+    codes, query_bits = _popcount_view(codes), _popcount_view(query_bits)
+    for start in range(0, codes.shape[0], BLOCK_ROWS):
+        block = codes[start:start + BLOCK_ROWS]
+        for column, bits in enumerate(query_bits):
+            hamming = _popcount(np.bitwise_xor(block, bits)).sum(axis=1, dtype=np.int32)
+            scores[start:start + block.shape[0], column] = np.cos(np.pi * hamming / dimensions)
+    return scores
+
+
+def _popcount_view(bits: np.ndarray) -> np.ndarray:
+    """Agrupa os bytes em palavras de 64 bits (menos operações no XOR/popcount) quando possível"""
+    if hasattr(np, "bitwise_count") and bits.shape[1] % 8 == 0 and bits.flags.c_contiguous:
+        return bits.view(np.uint64)
+    return bits
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    # np.bitwise_count existe a partir do NumPy 2.0; antes, tabela por byte
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    return POPCOUNT[words]
+
+
+def exact_rescore(
+    query_embedding: Sequence[float],
+    candidates: List[Tuple[Paint, float]],
+    embeddings: Dict[int, np.ndarray],
+    top_k: int
+) -> List[Tuple[Paint, float]]:
+    """
+    Reordena candidatos pela distância de cosseno exata (embeddings float completos).
+
+    Args:
+        query_embedding: Embedding da query
+        candidates: (Paint, distância aproximada) vindos da busca quantizada
+        embeddings: Embedding completo de cada candidato, por id (ausentes são descartados)
+        top_k: Número de resultados
+
+    Returns:
+        Até top_k (Paint, distância de cosseno exata), do mais próximo ao mais distante
+    """
+    candidates = [(paint, distance) for paint, distance in candidates if paint.id in embeddings]
+    if not candidates:
+        return []
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query_norm = float(np.linalg.norm(query))
+    if query_norm == 0.0:
+        return []
+    matrix = np.stack([to_array(embeddings[paint.id]) for paint, _ in candidates])
+    norms = np.linalg.norm(matrix, axis=1)
+    similarities = np.divide(matrix @ query, norms * query_norm, out=np.zeros_like(norms), where=norms > 0)
+    order = np.argsort(-similarities, kind="stable")[:top_k]
+    return [(candidates[index][0], float(1.0 - similarities[index])) for index in order]
@@ -0,0 +1,369 @@
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+import logging
+import threading
+import time
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.domain.entities.paint import Paint
+from app.domain.entities.search import SemanticSearchQuery, PaintSearchFilters
+from app.infrastructure.config.settings import settings
+from app.infrastructure.database.models.paint_model import PaintModel
+from app.infrastructure.search.quantization import approximate_scores, code_shape, decode, encode
+
+logger = logging.getLogger(__name__)
+
+# Transações iniciadas antes de uma atualização podem fazer commit depois dela
+# com um updated_at menor que o watermark; a margem evita perder essas linhas.
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+
+class InMemoryVectorIndex:
+    """
+    Índice vetorial em memória para busca semântica por similaridade de cosseno.
+
+    Mantém uma matriz float32 com os embeddings normalizados (uma linha por tinta)
+    e máscaras de linhas por ambiente. A busca top-k é um produto matriz-vetor
+    seguido de argpartition, sem ida ao banco.
+
+    Com quantization "int8" ou "binary" a matriz guarda só os códigos quantizados
+    (4x ou 32x menos memória) e as distâncias retornadas são aproximadas: quem
+    busca deve pedir mais candidatos e reordená-los com os embeddings completos
+    (ver quantization.exact_rescore).
+    """
+
+    def __init__(self, refresh_seconds: float = 30.0, quantization: str = "none"):
+        self.refresh_seconds = refresh_seconds
+        self.quantization = quantization
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._dimensions = 0
+        self._ids = np.empty(0, dtype=np.int64)
+        self._environments = np.empty(0, dtype=object)
+        self._size = 0
+        self._positions: Dict[int, int] = {}
+        self._paints: Dict[int, Paint] = {}
+        # Tintas com embedding no banco que o índice recusou (norma zero ou dimensão errada)
+        self._skipped: Set[int] = set()
+        self._env_masks: Optional[Dict[str, np.ndarray]] = None
+        self._watermark: Optional[datetime] = None
+        self._last_refresh = 0.0
+        self._ready = False
+
+    @property
+    def is_ready(self) -> bool:
+        """Indica se o índice já foi carregado"""
+        return self._ready
+
+    @property
+    def is_quantized(self) -> bool:
+        """Indica se as distâncias da busca são aproximadas (códigos quantizados)"""
+        return self.quantization != "none"
+
+    @property
+    def memory_bytes(self) -> int:
+        """Memória ocupada pelos vetores (códigos) das tintas indexadas"""
+        return int(self._matrix[:self._size].nbytes)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def load(self, db: Session) -> None:
+        """Carrega (ou recarrega) todos os embeddings do banco"""
+        with self._refresh_lock:
+            models = self._query_embedded(db).all()
+            with self._lock:
+                self._matrix = np.empty((0, 0), dtype=np.float32)
+                self._dimensions = 0
+                self._ids = np.empty(0, dtype=np.int64)
+                self._environments = np.empty(0, dtype=object)
+                self._size = 0
+                self._positions = {}
+                self._paints = {}
+                self._skipped = set()
+                self._env_masks = None
+                self._watermark = None
+                for model in models:
+                    self._apply(model)
+                self._ready = True
+                self._last_refresh = time.monotonic()
+            logger.info(f"Índice vetorial em memória carregado: paints={self._size}")
+
+    def refresh(self, db: Session) -> int:
+        """
+        Atualiza o índice de forma incremental a partir do watermark de updated_at.
+
+        Se a contagem de linhas com embedding no banco divergir das tintas vistas
+        pelo índice (indexadas + recusadas por embedding inválido), por exemplo por
+        exclusões feitas por outro processo, faz uma recarga completa.
+
+        Returns:
+            Número de linhas aplicadas
+        """
+        if not self._ready:
+            self.load(db)
+            return self._size
+
+        if not self._refresh_lock.acquire(blocking=False):
+            # Outra requisição já está atualizando o índice
+            return 0
+        try:
+            query = self._query_embedded(db)
+            if self._watermark is not None:
+                query = query.filter(PaintModel.updated_at >= self._watermark - WATERMARK_OVERLAP)
+            models = query.all()
+
+            with self._lock:
+                for model in models:
+                    self._apply(model)
+                self._last_refresh = time.monotonic()
+                size = self._size + len(self._skipped)
+
+            total = db.query(func.count(PaintModel.id)).filter(PaintModel.embedding.isnot(None)).scalar()
+        finally:
+            self._refresh_lock.release()
+
+        if total != size:
+            logger.info(f"Índice vetorial divergente do banco (banco={total}, índice={size}), recarregando")
+            self.load(db)
+        return len(models)
+
+    def refresh_if_stale(self, db: Session) -> None:
+        """Atualiza o índice se o intervalo de atualização já tiver passado"""
+        if time.monotonic() - self._last_refresh >= self.refresh_seconds:
+            self.refresh(db)
+
+    def upsert(self, paint: Paint, embedding: Sequence[float]) -> None:
+        """Insere ou substitui o embedding de uma tinta no índice"""
+        with self._lock:
+            self._put(paint, embedding)
+
+    def update_paint(self, paint: Paint) -> bool:
+        """Substitui os atributos (ambiente, filtros) de uma tinta indexada, mantendo o embedding"""
+        with self._lock:
+            position = self._positions.get(paint.id)
+            if position is None:
+                return False
+            self._environments[position] = paint.environment
+            self._paints[paint.id] = paint
+            self._env_masks = None
+            return True
+
+    def remove(self, paint_id: int) -> bool:
+        """Remove uma tinta do índice"""
+        with self._lock:
+            self._skipped.discard(paint_id)
+            position = self._positions.pop(paint_id, None)
+            if position is None:
+                return False
+            self._paints.pop(paint_id, None)
+
+            # Move a última linha para a posição removida para manter a matriz contígua
+            last = self._size - 1
+            if position != last:
+                moved_id = int(self._ids[last])
+                self._matrix[position] = self._matrix[last]
+                self._ids[position] = moved_id
+                self._environments[position] = self._environments[last]
+                self._positions[moved_id] = position
+            self._size = last
+            self._env_masks = None
+            return True
+
+    def embeddings(self, paint_ids: Sequence[int]) -> np.ndarray:
+        """
+        Embeddings normalizados das tintas (linhas nulas para as que não estão no índice).
+
+        Com quantização, são aproximações reconstruídas a partir dos códigos.
+        """
+        with self._lock:
+            dimensions = self._dimensions if self._size else 0
+            matrix = np.zeros((len(paint_ids), dimensions), dtype=np.float32)
+            for row, paint_id in enumerate(paint_ids):
+                position = self._positions.get(paint_id)
+                if position is not None:
+                    matrix[row] = decode(self._matrix[position:position + 1], dimensions, self.quantization)[0]
+            return matrix
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int = 5,
+        environment: Optional[str] = None,
+        filters: Optional[PaintSearchFilters] = None
+    ) -> List[Tuple[Paint, float]]:
+        """
+        Busca as tintas mais próximas do embedding da query.
+
+        Returns:
+            Lista de (Paint, distância de cosseno), da mais próxima para a mais distante
+
+        Raises:
+            ValueError: Se a dimensão do embedding for diferente da do índice
+        """
+        return self.search_many([SemanticSearchQuery(query_embedding, top_k, environment, filters=filters)])[0]
+
+    def search_many(self, queries: List[SemanticSearchQuery]) -> List[List[Tuple[Paint, float]]]:
+        """
+        Executa várias buscas com uma única multiplicação de matrizes.
+
+        Returns:
+            Uma lista de (Paint, distância de cosseno) por consulta, na ordem de entrada
+        """
+        results: List[List[Tuple[Paint, float]]] = [[] for _ in queries]
+        if not queries:
+            return results
+
+        vectors = []
+        for query in queries:
+            vector = np.asarray(query.embedding, dtype=np.float32)
+            if vector.ndim != 1:
+                raise ValueError("query_embedding deve ser um vetor")
+            vectors.append(vector)
+
+        with self._lock:
+            if self._size == 0:
+                return results
+            dimensions = self._dimensions
+            for vector in vectors:
+                if vector.shape[0] != dimensions:
+                    raise ValueError(
+                        f"Dimensão do embedding ({vector.shape[0]}) diferente da do índice ({dimensions})"
+                    )
+
+            matrix = np.stack(vectors)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+            # (n_paints x d) @ (d x n_queries): uma coluna de similaridades por consulta
+            all_scores = approximate_scores(self._matrix[:self._size], matrix, dimensions, self.quantization)
+
+            for column, query in enumerate(queries):
+                if norms[column, 0] == 0 or query.top_k <= 0:
+                    continue
+                scores = all_scores[:, column]
+                rows = None
+                if query.environment:
+                    mask = self._environment_masks().get(query.environment)
+                    if mask is None:
+                        continue
+                    rows = np.flatnonzero(mask)
+                if query.filters is not None and not query.filters.is_empty():
+                    candidates = rows if rows is not None else np.arange(self._size)
+                    rows = candidates[self._filter_mask(query.filters, candidates)]
+                if rows is not None:
+                    if rows.shape[0] == 0:
+                        continue
+                    scores = scores[rows]
+
+                k = min(query.top_k, scores.shape[0])
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top], kind="stable")]
+                positions = rows[top] if rows is not None else top
+
+                results[column] = [
+                    (self._paints[int(self._ids[position])], float(1.0 - scores[index]))
+                    for position, index in zip(positions, top)
+                ]
+        return results
+
+    def _filter_mask(self, filters: PaintSearchFilters, positions: np.ndarray) -> np.ndarray:
+        """Máscara das posições cujas tintas atendem aos filtros de atributos"""
+        return np.fromiter(
+            (filters.matches(self._paints[int(self._ids[position])]) for position in positions),
+            dtype=bool,
+            count=positions.shape[0]
+        )
+
+    def _query_embedded(self, db: Session):
+        return db.query(PaintModel).filter(PaintModel.embedding.isnot(None))
+
+    def _apply(self, model: PaintModel) -> None:
+        paint = Paint(
+            id=model.id,
+            name=model.name,
+            color=model.color,
+            surface_type=model.surface_type,
+            environment=model.environment,
+            finish_type=model.finish_type,
+            features=model.features or [],
+            line=model.line,
+            created_at=model.created_at,
+            updated_at=model.updated_at,
+            embedding_status=model.embedding_status
+        )
+        self._put(paint, model.embedding)
+        if model.updated_at is not None and (self._watermark is None or model.updated_at > self._watermark):
+            self._watermark = model.updated_at
+
+    def _put(self, paint: Paint, embedding: Sequence[float]) -> None:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if vector.ndim != 1 or norm == 0.0:
+            logger.warning(f"Embedding inválido ignorado no índice: paint_id={paint.id}")
+            self._skip(paint.id)
+            return
+        vector = vector / norm
+
+        if self._size == 0 and self._dimensions != vector.shape[0]:
+            columns, dtype = code_shape(vector.shape[0], self.quantization)
+            self._matrix = np.empty((0, columns), dtype=dtype)
+            self._dimensions = vector.shape[0]
+        elif vector.shape[0] != self._dimensions:
+            logger.warning(f"Embedding com dimensão inesperada ignorado no índice: paint_id={paint.id}")
+            self._skip(paint.id)
+            return
+        self._skipped.discard(paint.id)
+
+        position = self._positions.get(paint.id)
+        if position is None:
+            position = self._size
+            self._ensure_capacity(position + 1)
+            self._positions[paint.id] = position
+            self._ids[position] = paint.id
+            self._size += 1
+
+        self._matrix[position] = encode(vector[np.newaxis, :], self.quantization)[0]
+        self._environments[position] = paint.environment
+        self._paints[paint.id] = paint
+        self._env_masks = None
+
+    def _skip(self, paint_id: int) -> None:
+        # A versão anterior (válida) não representa mais a tinta: sai do índice
+        self.remove(paint_id)
+        self._skipped.add(paint_id)
+
+    def _ensure_capacity(self, required: int) -> None:
+        capacity = self._matrix.shape[0]
+        if required <= capacity:
+            return
+        new_capacity = max(required, capacity * 2, 64)
+        matrix = np.empty((new_capacity, self._matrix.shape[1]), dtype=self._matrix.dtype)
+        matrix[:self._size] = self._matrix[:self._size]
+        ids = np.empty(new_capacity, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        environments = np.empty(new_capacity, dtype=object)
+        environments[:self._size] = self._environments[:self._size]
+        self._matrix, self._ids, self._environments = matrix, ids, environments
+
+    def _environment_masks(self) -> Dict[str, np.ndarray]:
+        if self._env_masks is None:
+            environments = self._environments[:self._size]
+            self._env_masks = {
+                environment: environments == environment
+                for environment in set(environments.tolist())
+            }
+        return self._env_masks
+
+
+@lru_cache(maxsize=None)
+def get_vector_index() -> Optional[InMemoryVectorIndex]:
+    """Retorna a instância única do índice em memória, ou None se desabilitado"""
+    if not settings.search.in_memory_index:
+        return None
+    return InMemoryVectorIndex(
+        refresh_seconds=settings.search.index_refresh_seconds,
+        quantization=settings.search.quantization
+    )
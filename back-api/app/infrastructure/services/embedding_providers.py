@@ -0,0 +1,176 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Dict, List, Optional
+import hashlib
+import logging
+import math
+import os
+import re
+import unicodedata
+import numpy as np
+from openai import AsyncOpenAI, OpenAI
+from app.infrastructure.services.rate_limit_governor import RateLimitGovernor, get_rate_limit_governor
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_PROVIDERS = ("openai", "local")
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+# Dimensões do provedor local: iguais às do text-embedding-3-small (coluna vector(1536))
+LOCAL_EMBEDDING_DIMENSIONS = 1536
+LOCAL_EMBEDDING_MODEL = f"local-hashing-{LOCAL_EMBEDDING_DIMENSIONS}"
+# Pesos das features do provedor local: palavras, pares de palavras vizinhas e trigramas de caracteres
+LOCAL_WORD_WEIGHT = 1.0
+LOCAL_BIGRAM_WEIGHT = 0.5
+LOCAL_TRIGRAM_WEIGHT = 0.25
+
+
+class EmbeddingProvider(ABC):
+    """Interface para provedores de embeddings (OpenAI, local)"""
+
+    model: str
+    # Máximo de textos por chamada a embed/aembed
+    max_batch_size: int
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Um embedding por texto, na ordem da entrada"""
+        pass
+
+    @abstractmethod
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Versão assíncrona de embed"""
+        pass
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Embeddings da OpenAI (text-embedding-3-small), com as chamadas passando pelo controle de vazão"""
+
+    max_batch_size = 2048
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = OPENAI_EMBEDDING_MODEL,
+        governor: Optional[RateLimitGovernor] = None
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.governor = governor
+        self._client: Optional[OpenAI] = None
+        self._async_client: Optional[AsyncOpenAI] = None
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if self._client is None:
+            http_client = self.governor.http_client() if self.governor else None
+            self._client = OpenAI(api_key=self.api_key, http_client=http_client)
+        response = self._client.embeddings.create(model=self.model, input=texts)
+        return self._ordered(response, len(texts))
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        if self._async_client is None:
+            http_client = self.governor.async_http_client() if self.governor else None
+            self._async_client = AsyncOpenAI(api_key=self.api_key, http_client=http_client)
+        response = await self._async_client.embeddings.create(model=self.model, input=texts)
+        return self._ordered(response, len(texts))
+
+    @staticmethod
+    def _ordered(response, expected: int) -> List[List[float]]:
+        # A API devolve o índice de cada texto; não depende da ordem da resposta
+        data = sorted(response.data, key=lambda item: item.index)
+        if len(data) != expected:
+            raise ValueError(f"Resposta com {len(data)} embeddings para {expected} textos")
+        return [item.embedding for item in data]
+
+
+class LocalHashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Embeddings locais por hashing de features (CPU, sem rede nem limite de taxa).
+
+    Palavras, pares de palavras vizinhas e trigramas de caracteres (sem acentos, em
+    minúsculas) são projetados em LOCAL_EMBEDDING_DIMENSIONS posições pelo blake2b,
+    com sinal e peso sublinear (1 + log tf), e o vetor é normalizado. Capta
+    sobreposição de termos, não sinônimos: serve para ETL e testes de carga
+    offline e como piso de latência, não substitui o modelo da OpenAI.
+
+    O agente-ia implementa o mesmo algoritmo (LocalEmbeddingClient); os dois
+    precisam gerar vetores idênticos para o mesmo texto.
+    """
+
+    model = LOCAL_EMBEDDING_MODEL
+    max_batch_size = 2048
+
+    def __init__(self, dimensions: int = LOCAL_EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+        self._slots: Dict[str, tuple] = {}
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_one(text) for text in texts]
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        # Microssegundos por texto: mais barato que despachar para uma thread
+        return self.embed(texts)
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float64)
+        for feature, weight in local_features(text).items():
+            index, sign = self._slot(feature)
+            vector[index] += sign * weight
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            raise ValueError("Texto sem termos para gerar embedding local")
+        return (vector / norm).astype(np.float32).tolist()
+
+    def _slot(self, feature: str) -> tuple:
+        slot = self._slots.get(feature)
+        if slot is None:
+            value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            slot = (value % self.dimensions, 1.0 if value >> 63 else -1.0)
+            if len(self._slots) < 1_000_000:
+                self._slots[feature] = slot
+        return slot
+
+
+def local_features(text: str) -> Dict[str, float]:
+    """Features ponderadas do provedor local (palavras, pares de palavras e trigramas de caracteres)"""
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(char for char in normalized if not unicodedata.combining(char))
+    words = re.findall(r"[a-z0-9]+", normalized)
+
+    counts: Counter = Counter()
+    for word in words:
+        counts[f"w:{word}"] += 1
+        padded = f"<{word}>"
+        for start in range(len(padded) - 2):
+            counts[f"c:{padded[start:start + 3]}"] += 1
+    for first, second in zip(words, words[1:]):
+        counts[f"b:{first} {second}"] += 1
+
+    weights = {"w": LOCAL_WORD_WEIGHT, "b": LOCAL_BIGRAM_WEIGHT, "c": LOCAL_TRIGRAM_WEIGHT}
+    return {
+        feature: weights[feature[0]] * (1.0 + math.log(count))
+        for feature, count in counts.items()
+    }
+
+
+def create_embedding_provider(provider: str, api_key: Optional[str] = None) -> Optional[EmbeddingProvider]:
+    """
+    Cria o provedor de embeddings configurado.
+
+    Args:
+        provider: 'openai' ou 'local'
+        api_key: Chave da OpenAI (padrão: OPENAI_API_KEY)
+
+    Returns:
+        O provedor, ou None se 'openai' estiver sem API key
+
+    Raises:
+        ValueError: Se o provedor for desconhecido
+    """
+    if provider == "local":
+        return LocalHashingEmbeddingProvider()
+    if provider == "openai":
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            return None
+        return OpenAIEmbeddingProvider(api_key=api_key, governor=get_rate_limit_governor())
+    raise ValueError(f"Provedor de embeddings desconhecido: {provider} (use um de {EMBEDDING_PROVIDERS})")
@@ -1,22 +1,45 @@
-from typing import List
-import os
+from typing import List, Optional, Sequence
+import asyncio
+import hashlib
 import logging
-from openai import OpenAI
+import random
+import time
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from app.infrastructure.config.settings import settings
+from app.infrastructure.services.embedding_providers import EmbeddingProvider, create_embedding_provider
 
 logger = logging.getLogger(__name__)
 
+# Máximo de textos por requisição (limite do endpoint de embeddings da OpenAI)
+MAX_BATCH_SIZE = 2048
+# Tentativas por lote antes de desistir (espera até 1s, 2s, 4s..., com jitter, entre elas)
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 1.0
+# Só erros transitórios (limite, rede, timeout, 5xx) são repetidos; chave inválida,
+# entrada inválida, modelo errado ou ValueError local sobem na primeira tentativa
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    """Chave do cache persistente de embeddings: sha256 do modelo e do texto (sem espaços nas pontas)"""
+    return hashlib.sha256(f"{model}\n{text.strip()}".encode("utf-8")).hexdigest()
+
 
 class EmbeddingService:
-    """Serviço para geração de embeddings usando OpenAI"""
+    """Serviço para geração de embeddings (provedor em EMBEDDING_PROVIDER: OpenAI ou local)"""
     
-    def __init__(self, api_key: str = None):
-        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
-        self.model = "text-embedding-3-small"
-        self.client = None
-        
-        if self.api_key:
-            self.client = OpenAI(api_key=self.api_key)
-        else:
+    def __init__(
+        self,
+        api_key: str = None,
+        batch_size: int = MAX_BATCH_SIZE,
+        provider: Optional[EmbeddingProvider] = None
+    ):
+        self.provider = provider or create_embedding_provider(settings.embedding.provider, api_key)
+        self.model = self.provider.model if self.provider else None
+        max_batch_size = self.provider.max_batch_size if self.provider else MAX_BATCH_SIZE
+        self.batch_size = max(1, min(batch_size, max_batch_size))
+        
+        if not self.provider:
             logger.warning("EmbeddingService criado sem API key")
     
     def generate_embedding(self, text: str) -> List[float]:
@@ -33,7 +56,7 @@ class EmbeddingService:
             ValueError: Se não houver cliente configurado ou texto vazio
             Exception: Se houver erro na chamada à API
         """
-        if not self.client:
+        if not self.provider:
             error_msg = "EmbeddingService não configurado: OPENAI_API_KEY não encontrada"
             logger.error(error_msg)
             raise ValueError(error_msg)
@@ -44,17 +67,90 @@ class EmbeddingService:
             raise ValueError(error_msg)
         
         try:
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=text.strip()
-            )
-            embedding = response.data[0].embedding
+            embedding = self.provider.embed([text.strip()])[0]
             logger.info(f"Embedding gerado com sucesso: text_length={len(text)}, embedding_size={len(embedding)}")
             return embedding
         except Exception as e:
             logger.error(f"Erro ao gerar embedding: {str(e)}", exc_info=True)
             raise
     
+    def generate_embeddings(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Gera embeddings para vários textos, em lotes de até batch_size por requisição.
+        
+        Args:
+            texts: Textos para gerar embeddings
+            
+        Returns:
+            Um embedding por texto, na mesma ordem da entrada
+            
+        Raises:
+            ValueError: Se não houver cliente configurado ou algum texto for vazio
+            Exception: Se um lote falhar em todas as tentativas
+        """
+        if not self.provider:
+            error_msg = "EmbeddingService não configurado: OPENAI_API_KEY não encontrada"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        inputs = [(text or "").strip() for text in texts]
+        empty = [index for index, text in enumerate(inputs) if not text]
+        if empty:
+            error_msg = f"Texto vazio não pode gerar embedding (posições {empty[:10]})"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        embeddings: List[List[float]] = []
+        for start in range(0, len(inputs), self.batch_size):
+            embeddings.extend(self._embed_batch(inputs[start:start + self.batch_size]))
+        logger.info(f"Embeddings gerados com sucesso: texts={len(inputs)}, requests={-(-len(inputs) // self.batch_size)}")
+        return embeddings
+    
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Uma requisição de embeddings, repetida com espera exponencial em caso de erro transitório"""
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                return self.provider.embed(batch)
+            except RETRYABLE_ERRORS as e:
+                if attempt == MAX_ATTEMPTS:
+                    logger.error(f"Erro ao gerar lote de embeddings: size={len(batch)}, error={str(e)}", exc_info=True)
+                    raise
+                # Jitter: lotes que falharam juntos não tentam de novo no mesmo instante
+                delay = RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+                logger.warning(f"Falha no lote de embeddings (tentativa {attempt}/{MAX_ATTEMPTS}), nova tentativa em {delay:.1f}s: {str(e)}")
+                time.sleep(delay)
+            except Exception as e:
+                logger.error(f"Erro ao gerar lote de embeddings: size={len(batch)}, error={str(e)}", exc_info=True)
+                raise
+    
+    @staticmethod
+    def build_paint_text(
+        name: str,
+        color: str,
+        surface_type: str,
+        environment: str,
+        finish_type: str,
+        features: List[str],
+        line: str
+    ) -> str:
+        """Texto usado no embedding de uma tinta (todas as informações combinadas)"""
+        # Combinar todas as informações em um texto
+        text_parts = [
+            name or "",
+            color or "",
+            surface_type or "",
+            environment or "",
+            finish_type or "",
+            line or "",
+        ]
+        
+        # Adicionar features
+        if features:
+            text_parts.extend([f for f in features if f])
+        
+        # Combinar tudo
+        return " ".join(filter(None, text_parts))
+    
     def generate_embedding_for_paint(
         self,
         name: str,
@@ -83,21 +179,95 @@ class EmbeddingService:
         Raises:
             ValueError: Se não conseguir gerar embedding
         """
-        # Combinar todas as informações em um texto
-        text_parts = [
-            name or "",
-            color or "",
-            surface_type or "",
-            environment or "",
-            finish_type or "",
-            line or "",
-        ]
+        text = self.build_paint_text(name, color, surface_type, environment, finish_type, features, line)
+        return self.generate_embedding(text)
+
+
+class AsyncEmbeddingService:
+    """
+    Serviço assíncrono de embeddings (AsyncOpenAI, ou o provedor local).
+    
+    Usado pelas rotas async: enquanto a OpenAI responde, o event loop atende
+    outras requisições, sem ocupar uma thread do threadpool.
+    """
+    
+    def __init__(self, api_key: str = None, provider: Optional[EmbeddingProvider] = None):
+        self.provider = provider or create_embedding_provider(settings.embedding.provider, api_key)
+        self.model = self.provider.model if self.provider else None
         
-        # Adicionar features
-        if features:
-            text_parts.extend([f for f in features if f])
+        if not self.provider:
+            logger.warning("AsyncEmbeddingService criado sem API key")
+    
+    async def generate_embedding(self, text: str) -> List[float]:
+        """
+        Gera embedding para um texto.
         
-        # Combinar tudo
-        text = " ".join(filter(None, text_parts))
+        Args:
+            text: Texto para gerar embedding
+            
+        Returns:
+            Lista de floats (embedding)
+            
+        Raises:
+            ValueError: Se não houver cliente configurado ou texto vazio
+            Exception: Se houver erro na chamada à API
+        """
+        if not self.provider:
+            error_msg = "AsyncEmbeddingService não configurado: OPENAI_API_KEY não encontrada"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
         
-        return self.generate_embedding(text)
+        if not text or not text.strip():
+            error_msg = "Texto vazio não pode gerar embedding"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        try:
+            embedding = (await self.provider.aembed([text.strip()]))[0]
+            logger.info(f"Embedding gerado com sucesso: text_length={len(text)}, embedding_size={len(embedding)}")
+            return embedding
+        except Exception as e:
+            logger.error(f"Erro ao gerar embedding: {str(e)}", exc_info=True)
+            raise
+    
+    async def generate_embeddings(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Gera embeddings para vários textos (uma requisição por max_batch_size textos,
+        com as mesmas novas tentativas de EmbeddingService.generate_embeddings).
+        
+        Returns:
+            Um embedding por texto, na mesma ordem da entrada
+            
+        Raises:
+            ValueError: Se não houver cliente configurado ou algum texto for vazio
+            Exception: Se um lote falhar em todas as tentativas
+        """
+        if not self.provider:
+            error_msg = "AsyncEmbeddingService não configurado: OPENAI_API_KEY não encontrada"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        inputs = [(text or "").strip() for text in texts]
+        if not all(inputs):
+            raise ValueError("Texto vazio não pode gerar embedding")
+        
+        embeddings: List[List[float]] = []
+        for start in range(0, len(inputs), self.provider.max_batch_size):
+            embeddings.extend(await self._embed_batch(inputs[start:start + self.provider.max_batch_size]))
+        return embeddings
+    
+    async def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Versão assíncrona de EmbeddingService._embed_batch (espera sem bloquear o event loop)"""
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                return await self.provider.aembed(batch)
+            except RETRYABLE_ERRORS as e:
+                if attempt == MAX_ATTEMPTS:
+                    logger.error(f"Erro ao gerar lote de embeddings: size={len(batch)}, error={str(e)}", exc_info=True)
+                    raise
+                delay = RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+                logger.warning(f"Falha no lote de embeddings (tentativa {attempt}/{MAX_ATTEMPTS}), nova tentativa em {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                logger.error(f"Erro ao gerar lote de embeddings: size={len(batch)}, error={str(e)}", exc_info=True)
+                raise
@@ -0,0 +1,306 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import random
+import time
+from sqlalchemy.orm import Session
+from app.domain.entities.embedding_job import EmbeddingJob
+from app.infrastructure.cache.search_result_cache import SearchResultCache, get_search_result_cache
+from app.infrastructure.config.settings import settings
+from app.infrastructure.database.connection import SessionLocal
+from app.infrastructure.repositories.paint_repository_impl import PaintRepositoryImpl
+from app.infrastructure.repositories.embedding_cache_repository_impl import EmbeddingCacheRepositoryImpl
+from app.infrastructure.search.vector_index import InMemoryVectorIndex, get_vector_index
+from app.infrastructure.services.embedding_service import AsyncEmbeddingService, EmbeddingService, embedding_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingWorker:
+    """
+    Worker do outbox de embeddings.
+
+    A cada ciclo reivindica um lote de tintas 'pending' (FOR UPDATE SKIP LOCKED + lease,
+    então várias instâncias podem rodar ao mesmo tempo), divide o lote entre até
+    `concurrency` requisições simultâneas ao provedor e grava os embeddings. Um lote
+    que falha volta para a fila com espera exponencial (com jitter); após
+    max_attempts a tinta fica 'failed'. Textos presentes no embedding_cache não vão
+    ao provedor. Cada lote gravado invalida o cache de resultados da busca.
+
+    As operações no banco usam sessões próprias, em threads, sem bloquear o event loop.
+    """
+
+    def __init__(
+        self,
+        embedding_service: AsyncEmbeddingService,
+        session_factory: Callable[[], Session] = SessionLocal,
+        vector_index: Optional[InMemoryVectorIndex] = None,
+        result_cache: Optional[SearchResultCache] = None,
+        batch_size: int = 64,
+        concurrency: int = 4,
+        poll_interval_seconds: float = 2.0,
+        lease_seconds: float = 120.0,
+        max_attempts: int = 5,
+        backoff_base_seconds: float = 5.0,
+        backoff_max_seconds: float = 600.0
+    ):
+        self.embedding_service = embedding_service
+        self.session_factory = session_factory
+        self.vector_index = vector_index
+        self.result_cache = result_cache
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stats: Dict[str, Any] = {
+            "batches": 0,
+            "processed": 0,
+            "retried": 0,
+            "failed": 0,
+            "stale": 0,
+            "cache_hits": 0,
+            "provider_requests": 0,
+            "provider_errors": 0,
+            "last_error": None,
+            "last_batch_at": None,
+            "last_batch_seconds": None,
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Inicia o loop do worker no event loop atual"""
+        if self.is_running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Interrompe o loop (linhas reivindicadas voltam à fila quando o lease expira)"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def notify(self) -> None:
+        """Acorda o worker (ex: após gravar uma tinta pendente), sem esperar o próximo ciclo"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        """Loop do worker até ser cancelado (start() o executa em uma task; worker.py, no processo dedicado)"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        logger.info(
+            f"Worker de embeddings iniciado: batch_size={self.batch_size}, concurrency={self.concurrency}"
+        )
+        while True:
+            self._wakeup.clear()
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Erro no ciclo do worker de embeddings")
+                self._stats["last_error"] = str(e)
+                processed = 0
+            # Lote incompleto: a fila esvaziou; espera uma nova escrita ou o intervalo
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def run_once(self) -> int:
+        """
+        Executa um ciclo: reivindica, gera e grava um lote.
+
+        Returns:
+            Número de tintas reivindicadas
+        """
+        jobs = await asyncio.to_thread(self._claim)
+        if not jobs:
+            return 0
+        start = time.perf_counter()
+        size = -(-len(jobs) // self.concurrency)
+        chunks = [jobs[index:index + size] for index in range(0, len(jobs), size)]
+        await asyncio.gather(*(self._process(chunk) for chunk in chunks))
+
+        self._stats["batches"] += 1
+        self._stats["last_batch_at"] = datetime.now(timezone.utc).isoformat()
+        self._stats["last_batch_seconds"] = round(time.perf_counter() - start, 3)
+        return len(jobs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores do worker desde o início do processo"""
+        return {
+            "running": self.is_running,
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+            **self._stats,
+        }
+
+    async def _process(self, jobs: List[EmbeddingJob]) -> None:
+        texts = [
+            EmbeddingService.build_paint_text(
+                name=job.paint.name,
+                color=job.paint.color,
+                surface_type=job.paint.surface_type,
+                environment=job.paint.environment,
+                finish_type=job.paint.finish_type,
+                features=job.paint.features,
+                line=job.paint.line
+            )
+            for job in jobs
+        ]
+        keys = [embedding_cache_key(self.embedding_service.model, text) for text in texts]
+        embeddings = await asyncio.to_thread(self._cached, keys)
+        self._stats["cache_hits"] += sum(1 for key in keys if key in embeddings)
+
+        generated: Dict[str, List[float]] = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in embeddings:
+                missing.setdefault(key, text)
+        if missing:
+            try:
+                self._stats["provider_requests"] += 1
+                vectors = await self.embedding_service.generate_embeddings(list(missing.values()))
+                generated = dict(zip(missing, vectors))
+            except Exception as e:
+                logger.warning(f"Falha ao gerar embeddings do outbox: paints={len(jobs)}, error={str(e)}")
+                self._stats["provider_errors"] += 1
+                self._stats["last_error"] = str(e)
+                retried, failed = await asyncio.to_thread(self._fail, jobs, str(e))
+                self._stats["retried"] += retried
+                self._stats["failed"] += failed
+                return
+            embeddings.update(generated)
+
+        processed, stale = await asyncio.to_thread(
+            self._complete, jobs, [embeddings[key] for key in keys], generated
+        )
+        self._stats["processed"] += processed
+        self._stats["stale"] += stale
+        # Tintas que ganharam embedding passam a aparecer na busca semântica
+        if processed and self.result_cache is not None:
+            self.result_cache.invalidate()
+
+    def _retry_at(self, attempts: int) -> Optional[datetime]:
+        """Próxima tentativa após `attempts` falhas: base * 2^(falhas - 1), limitada e com jitter; None esgota"""
+        if attempts >= self.max_attempts:
+            return None
+        delay = min(self.backoff_base_seconds * 2 ** (attempts - 1), self.backoff_max_seconds)
+        # Jitter: instâncias que falharam juntas (ex: limite do provedor) não voltam juntas
+        delay *= random.uniform(0.5, 1.0)
+        return datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+    def _claim(self) -> List[EmbeddingJob]:
+        db = self.session_factory()
+        try:
+            return PaintRepositoryImpl(db).claim_pending_embeddings(self.batch_size, self.lease_seconds)
+        finally:
+            db.close()
+
+    def _cached(self, keys: List[str]) -> Dict[str, List[float]]:
+        db = self.session_factory()
+        try:
+            return EmbeddingCacheRepositoryImpl(db).get_many(keys)
+        finally:
+            db.close()
+
+    def _complete(
+        self,
+        jobs: List[EmbeddingJob],
+        embeddings: List[List[float]],
+        generated: Dict[str, List[float]]
+    ) -> Tuple[int, int]:
+        db = self.session_factory()
+        try:
+            EmbeddingCacheRepositoryImpl(db).put_many(self.embedding_service.model, generated)
+            repository = PaintRepositoryImpl(db, vector_index=self.vector_index)
+            processed = 0
+            for job, embedding in zip(jobs, embeddings):
+                # False: a tinta mudou (ou foi removida) depois de reivindicada; a nova versão já está na fila
+                if repository.complete_embedding(job.paint.id, embedding, job.paint.updated_at):
+                    processed += 1
+            return processed, len(jobs) - processed
+        finally:
+            db.close()
+
+    def _fail(self, jobs: List[EmbeddingJob], error: str) -> Tuple[int, int]:
+        db = self.session_factory()
+        try:
+            repository = PaintRepositoryImpl(db)
+            retried = failed = 0
+            for job in jobs:
+                retry_at = self._retry_at(job.attempts + 1)
+                if repository.fail_embedding(job.paint.id, error, job.paint.updated_at, retry_at):
+                    if retry_at is None:
+                        failed += 1
+                    else:
+                        retried += 1
+            return retried, failed
+        finally:
+            db.close()
+
+
+def create_embedding_worker(
+    vector_index: Optional[InMemoryVectorIndex] = None,
+    result_cache: Optional[SearchResultCache] = None
+) -> EmbeddingWorker:
+    """
+    Cria um worker do outbox com as configurações EMBEDDING_*.
+
+    Raises:
+        RuntimeError: Se o provedor for 'openai' sem OPENAI_API_KEY (as tintas ficariam 'pending' para sempre)
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if settings.embedding.provider == "openai" and not api_key:
+        raise RuntimeError(
+            "EMBEDDING_OUTBOX=true exige o worker de embeddings, mas OPENAI_API_KEY não está configurada: "
+            "configure a chave, use EMBEDDING_PROVIDER=local ou EMBEDDING_OUTBOX=false"
+        )
+    return EmbeddingWorker(
+        AsyncEmbeddingService(api_key=api_key),
+        vector_index=vector_index,
+        result_cache=result_cache,
+        batch_size=settings.embedding.batch_size,
+        concurrency=settings.embedding.concurrency,
+        poll_interval_seconds=settings.embedding.poll_interval_seconds,
+        lease_seconds=settings.embedding.lease_seconds,
+        max_attempts=settings.embedding.max_attempts,
+        backoff_base_seconds=settings.embedding.backoff_base_seconds,
+        backoff_max_seconds=settings.embedding.backoff_max_seconds
+    )
+
+
+@lru_cache(maxsize=None)
+def get_embedding_worker() -> Optional[EmbeddingWorker]:
+    """
+    Retorna a instância única do worker no processo da API, ou None sem outbox ou com
+    EMBEDDING_WORKER=false (nesse caso o worker roda em processo dedicado: python worker.py).
+
+    Raises:
+        RuntimeError: Se o outbox estiver ativo e o worker não puder rodar (ver create_embedding_worker)
+    """
+    if not settings.embedding.outbox:
+        return None
+    if not settings.embedding.worker:
+        logger.warning("EMBEDDING_WORKER=false: as tintas 'pending' dependem de um worker dedicado (python worker.py)")
+        return None
+    return create_embedding_worker(vector_index=get_vector_index(), result_cache=get_search_result_cache())
@@ -0,0 +1,292 @@
+"""
+Controle de vazão das chamadas à OpenAI (RateLimitGovernor).
+
+Módulo duplicado: existe uma cópia em agente-ia/app/infrastructure/llm/rate_limit_governor.py,
+já que back-api e agente-ia não compartilham pacote. As cópias diferem só no logger;
+toda correção deve ser feita nas duas, e tests/test_rate_limit_governor.py (o mesmo
+nos dois serviços) cobre cada uma.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+import time
+import httpx
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+from app.infrastructure.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Caracteres por token na estimativa do custo de uma requisição (antes da resposta)
+CHARS_PER_TOKEN = 4
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class _Bucket:
+    """
+    Token bucket com reserva antecipada: o nível pode ficar negativo e cada
+    requisição espera o tempo de reabastecer a sua parte (fila FIFO implícita).
+    """
+
+    def __init__(self, per_minute: Optional[float] = None):
+        self.capacity: Optional[float] = None
+        self.rate = 0.0
+        self.level = 0.0
+        self.updated = time.monotonic()
+        if per_minute:
+            self.resize(per_minute)
+
+    def resize(self, per_minute: float) -> None:
+        if self.capacity == per_minute:
+            return
+        if self.capacity is None:
+            self.level = per_minute
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+
+    def refill(self, now: float) -> None:
+        if self.capacity is not None:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, cost: float, now: float) -> float:
+        """Reserva `cost` e retorna quantos segundos esperar até ele estar disponível"""
+        if self.capacity is None:
+            return 0.0
+        self.refill(now)
+        # Custo acima da capacidade nunca caberia: limita a um balde cheio
+        self.level -= min(cost, self.capacity)
+        return -self.level / self.rate if self.level < 0 else 0.0
+
+    def sync(self, remaining: float, now: float) -> None:
+        """Alinha o nível ao restante informado pelo provedor (outros processos usam a mesma chave)"""
+        self.refill(now)
+        self.level = min(self.level, remaining)
+
+
+class _ModelLimits:
+    def __init__(self, requests_per_minute: Optional[float], tokens_per_minute: Optional[float]):
+        self.requests = _Bucket(requests_per_minute)
+        self.tokens = _Bucket(tokens_per_minute)
+        self.blocked_until = 0.0
+        self.consecutive_throttles = 0
+
+
+class RateLimitGovernor:
+    """
+    Controle de vazão das chamadas à OpenAI, compartilhado por todos os clientes do processo.
+
+    Mantém, por modelo, um token bucket de requisições e outro de tokens,
+    dimensionados pelos cabeçalhos x-ratelimit-limit-* das respostas (com uma
+    folga de `headroom`) e realinhados pelos x-ratelimit-remaining-*. Cada
+    requisição reserva sua parte antes de sair e espera na fila enquanto o
+    balde reabastece, então a vazão fica no limite em vez de oscilar em torno
+    dele. Um 429 bloqueia o modelo pelo retry-after (ou espera exponencial) e
+    libera a fila com jitter, sem rajada de novas tentativas.
+
+    Entra nos clientes como event hooks do httpx (http_client dos SDKs), então
+    as novas tentativas do próprio SDK também passam por aqui. Os limites são
+    por processo; entre processos o realinhamento pelos cabeçalhos compensa.
+    """
+
+    def __init__(
+        self,
+        headroom: float = 0.9,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 60.0
+    ):
+        self.headroom = headroom
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._limits: Dict[str, _ModelLimits] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {"requests": 0, "throttled": 0, "waited_seconds": 0.0}
+
+    def reserve(self, model: str, tokens: int) -> float:
+        """
+        Reserva uma requisição de `tokens` tokens para o modelo.
+
+        Returns:
+            Segundos que a requisição deve esperar antes de sair
+        """
+        now = time.monotonic()
+        with self._lock:
+            limits = self._model(model)
+            delay = max(
+                limits.requests.reserve(1, now),
+                limits.tokens.reserve(tokens, now)
+            )
+            if limits.blocked_until > now + delay:
+                # Após um 429 a fila sai espalhada ao longo de uma nova janela de espera
+                window = limits.blocked_until - now
+                delay = window + random.uniform(0, window)
+            self._stats["requests"] += 1
+            self._stats["waited_seconds"] += delay
+        return delay
+
+    def acquire(self, model: str, tokens: int) -> None:
+        """
+        Versão síncrona (bloqueia a thread na espera), para os clientes síncronos.
+
+        Raises:
+            RuntimeError: Se chamada dentro de um event loop (o sleep travaria todas as tarefas dele)
+        """
+        if _in_event_loop():
+            raise RuntimeError("Cliente OpenAI síncrono usado dentro do event loop; use o cliente assíncrono (async_http_client)")
+        delay = self.reserve(model, tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, model: str, tokens: int) -> None:
+        delay = self.reserve(model, tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def observe(self, model: str, status_code: int, headers: httpx.Headers) -> None:
+        """Atualiza os limites do modelo com os cabeçalhos de uma resposta"""
+        now = time.monotonic()
+        with self._lock:
+            limits = self._model(model)
+            for bucket, kind in ((limits.requests, "requests"), (limits.tokens, "tokens")):
+                limit = _number(headers.get(f"x-ratelimit-limit-{kind}"))
+                if limit:
+                    bucket.resize(limit * self.headroom)
+                remaining = _number(headers.get(f"x-ratelimit-remaining-{kind}"))
+                if remaining is not None and limit:
+                    bucket.sync(remaining - limit * (1 - self.headroom), now)
+
+            if status_code != 429:
+                limits.consecutive_throttles = 0
+                return
+            limits.consecutive_throttles += 1
+            self._stats["throttled"] += 1
+            wait = _retry_after(headers)
+            if wait is None:
+                wait = min(
+                    self.backoff_base_seconds * 2 ** (limits.consecutive_throttles - 1),
+                    self.backoff_max_seconds
+                )
+            limits.blocked_until = max(limits.blocked_until, now + wait)
+        logger.warning(f"Limite da OpenAI atingido: model={model}, espera={wait:.2f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores e limites aprendidos por modelo"""
+        with self._lock:
+            return {
+                **self._stats,
+                "waited_seconds": round(self._stats["waited_seconds"], 3),
+                "models": {
+                    model: {
+                        "requests_per_minute": limits.requests.capacity,
+                        "tokens_per_minute": limits.tokens.capacity,
+                    }
+                    for model, limits in self._limits.items()
+                },
+            }
+
+    def http_client(self) -> httpx.Client:
+        """Cliente httpx (padrões do SDK da OpenAI) com as chamadas passando pelo controle"""
+        def on_request(request: httpx.Request) -> None:
+            self.acquire(*_request_cost(request))
+
+        def on_response(response: httpx.Response) -> None:
+            self.observe(_request_cost(response.request)[0], response.status_code, response.headers)
+
+        return DefaultHttpxClient(event_hooks={"request": [on_request], "response": [on_response]})
+
+    def async_http_client(self) -> httpx.AsyncClient:
+        """Versão assíncrona de http_client"""
+        async def on_request(request: httpx.Request) -> None:
+            await self.acquire_async(*_request_cost(request))
+
+        async def on_response(response: httpx.Response) -> None:
+            self.observe(_request_cost(response.request)[0], response.status_code, response.headers)
+
+        return DefaultAsyncHttpxClient(event_hooks={"request": [on_request], "response": [on_response]})
+
+    def _model(self, model: str) -> _ModelLimits:
+        limits = self._limits.get(model)
+        if limits is None:
+            limits = _ModelLimits(self.requests_per_minute, self.tokens_per_minute)
+            self._limits[model] = limits
+        return limits
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _request_cost(request: httpx.Request) -> Tuple[str, int]:
+    """Modelo e tokens estimados (corpo / CHARS_PER_TOKEN + max_tokens) de uma requisição"""
+    try:
+        content = request.content
+    except httpx.RequestNotRead:
+        return request.url.path, 0
+    try:
+        body = json.loads(content) if content else {}
+    except ValueError:
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+    completion = body.get("max_completion_tokens") or body.get("max_tokens") or 0
+    return body.get("model") or request.url.path, len(content) // CHARS_PER_TOKEN + int(completion)
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _retry_after(headers: httpx.Headers) -> Optional[float]:
+    """Espera pedida pelo provedor: retry-after-ms, retry-after ou o reset do limite esgotado (ex: '6m0s', '20ms')"""
+    milliseconds = _number(headers.get("retry-after-ms"))
+    if milliseconds is not None:
+        return milliseconds / 1000
+    seconds = _number(headers.get("retry-after"))
+    if seconds is not None:
+        return seconds
+    resets = [
+        _duration(headers.get(f"x-ratelimit-reset-{kind}"))
+        for kind in ("requests", "tokens")
+        if _number(headers.get(f"x-ratelimit-remaining-{kind}")) == 0
+    ]
+    resets = [reset for reset in resets if reset]
+    return max(resets) if resets else None
+
+
+def _duration(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+@lru_cache(maxsize=None)
+def get_rate_limit_governor() -> Optional[RateLimitGovernor]:
+    """Retorna a instância única do controle de vazão, ou None se desabilitado"""
+    if not settings.rate_limit.enabled:
+        return None
+    return RateLimitGovernor(
+        headroom=settings.rate_limit.headroom,
+        requests_per_minute=settings.rate_limit.requests_per_minute,
+        tokens_per_minute=settings.rate_limit.tokens_per_minute,
+        backoff_base_seconds=settings.rate_limit.backoff_base_seconds,
+        backoff_max_seconds=settings.rate_limit.backoff_max_seconds
+    )
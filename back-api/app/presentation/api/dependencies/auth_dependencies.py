@@ -1,4 +1,6 @@
 from typing import Optional, List, Callable
+from functools import lru_cache
+import os
 from fastapi import Request, Depends, HTTPException, status, Cookie
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
@@ -6,13 +8,16 @@ from app.infrastructure.database.connection import get_db
 from app.infrastructure.repositories.user_repository_impl import UserRepositoryImpl
 from app.infrastructure.repositories.session_repository_impl import SessionRepositoryImpl
 from app.infrastructure.repositories.paint_repository_impl import PaintRepositoryImpl
+from app.infrastructure.repositories.embedding_cache_repository_impl import EmbeddingCacheRepositoryImpl
 from app.domain.repositories.user_repository import UserRepository
 from app.domain.repositories.session_repository import SessionRepository
 from app.domain.repositories.paint_repository import PaintRepository
+from app.domain.repositories.embedding_cache_repository import EmbeddingCacheRepository
 from app.application.use_cases.auth_use_cases import get_user_by_token
 from app.presentation.api.schemas.auth_schema import UserResponseSchema
 from app.infrastructure.config.settings import settings
-from app.infrastructure.services.embedding_service import EmbeddingService
+from app.infrastructure.services.embedding_service import AsyncEmbeddingService, EmbeddingService
+from app.infrastructure.search.vector_index import get_vector_index
 
 security = HTTPBearer(auto_error=False)
 
@@ -26,17 +31,31 @@ def get_session_repository(db: Session = Depends(get_db)) -> SessionRepository:
 
 def get_paint_repository(db: Session = Depends(get_db)) -> PaintRepository:
     """Dependency injection para obter repositório de Paint"""
-    return PaintRepositoryImpl(db)
+    return PaintRepositoryImpl(db, vector_index=get_vector_index())
+
+def get_embedding_cache_repository(db: Session = Depends(get_db)) -> EmbeddingCacheRepository:
+    """Dependency injection para obter o cache persistente de embeddings"""
+    return EmbeddingCacheRepositoryImpl(db)
 
 def get_embedding_service() -> EmbeddingService:
     """Dependency injection para obter serviço de embeddings"""
     api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if settings.embedding.provider == "openai" and not api_key:
         raise ValueError(
             "OPENAI_API_KEY não configurada. Configure a variável de ambiente OPENAI_API_KEY."
         )
     return EmbeddingService(api_key=api_key)
 
+@lru_cache(maxsize=None)
+def get_async_embedding_service() -> AsyncEmbeddingService:
+    """Dependency injection para o serviço assíncrono de embeddings (único no processo, reaproveita as conexões)"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if settings.embedding.provider == "openai" and not api_key:
+        raise ValueError(
+            "OPENAI_API_KEY não configurada. Configure a variável de ambiente OPENAI_API_KEY."
+        )
+    return AsyncEmbeddingService(api_key=api_key)
+
 def get_current_user_optional(
     request: Request,
     access_token: Optional[str] = Cookie(None, alias="access_token"),
@@ -0,0 +1,12 @@
+from functools import lru_cache
+from app.infrastructure.cache.lru_cache import LRUCache
+# Cache de resultados da busca: a mesma instância é invalidada pelo worker de embeddings
+from app.infrastructure.cache.search_result_cache import get_search_result_cache
+from app.infrastructure.config.settings import settings
+
+
+@lru_cache(maxsize=None)
+def get_query_embedding_cache() -> LRUCache:
+    """Dependency injection para o cache (único no processo) de embeddings de queries de texto"""
+    return LRUCache(maxsize=settings.search.query_embedding_cache_size)
+
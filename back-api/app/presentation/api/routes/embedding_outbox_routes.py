@@ -0,0 +1,42 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from app.domain.repositories.paint_repository import PaintRepository
+from app.application.use_cases.paint_use_cases import get_embedding_outbox_status, retry_failed_embeddings
+from app.infrastructure.services.embedding_worker import EmbeddingWorker, get_embedding_worker
+from app.presentation.api.schemas.auth_schema import UserResponseSchema
+from app.presentation.api.schemas.embedding_outbox_schema import EmbeddingOutboxStatusSchema, EmbeddingOutboxRetrySchema
+from app.presentation.api.dependencies.auth_dependencies import get_paint_repository, require_roles
+
+# Registrado antes de paint_routes para não colidir com /paints/{paint_id}
+router = APIRouter(prefix="/paints/embedding-outbox", tags=["Paints"])
+
+
+@router.get("", response_model=EmbeddingOutboxStatusSchema)
+def get_embedding_outbox(
+    repository: PaintRepository = Depends(get_paint_repository),
+    embedding_worker: Optional[EmbeddingWorker] = Depends(get_embedding_worker),
+    current_user: UserResponseSchema = Depends(require_roles(["admin", "super_admin"]))
+):
+    """Métricas do outbox de embeddings: tintas por status e contadores do worker (apenas admin/super_admin)"""
+    try:
+        statuses = get_embedding_outbox_status(repository=repository)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar outbox de embeddings: {str(e)}")
+    return EmbeddingOutboxStatusSchema(
+        statuses=statuses,
+        worker=embedding_worker.stats() if embedding_worker is not None else None
+    )
+
+
+@router.post("/retry", response_model=EmbeddingOutboxRetrySchema)
+async def retry_embedding_outbox(
+    repository: PaintRepository = Depends(get_paint_repository),
+    embedding_worker: Optional[EmbeddingWorker] = Depends(get_embedding_worker),
+    current_user: UserResponseSchema = Depends(require_roles(["admin", "super_admin"]))
+):
+    """Devolve para a fila as tintas cujo embedding falhou em todas as tentativas (apenas admin/super_admin)"""
+    requeued = await run_in_threadpool(retry_failed_embeddings, repository=repository)
+    if requeued and embedding_worker is not None:
+        embedding_worker.notify()
+    return EmbeddingOutboxRetrySchema(requeued=requeued)
@@ -1,43 +1,117 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional, Union
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from app.domain.repositories.paint_repository import PaintRepository
+from app.domain.repositories.embedding_cache_repository import EmbeddingCacheRepository
 from app.application.use_cases.paint_use_cases import (
-    create_paint as create_paint_uc,
+    create_paint_async as create_paint_uc,
+    create_paint_deferred as create_paint_deferred_uc,
     get_paint_by_id as get_paint_by_id_uc,
     get_all_paints as get_all_paints_uc,
-    update_paint as update_paint_uc,
+    update_paint_async as update_paint_uc,
+    update_paint_deferred as update_paint_deferred_uc,
     delete_paint as delete_paint_uc,
-    search_semantic_paints
+    search_semantic_paints_page,
+    search_semantic_paints_batch,
+    search_paints_by_text,
+    search_paints_hybrid,
+    explain_semantic_paints
 )
+from app.domain.entities.search import SemanticSearchQuery, PaintSearchHit, PaintSearchFilters
 from app.presentation.api.schemas.paint_schema import (
     PaintCreateSchema,
     PaintUpdateSchema,
     PaintResponseSchema,
-    PaintSearchSchema
+    PaintSearchResultSchema,
+    PaintSearchSchema,
+    PaintSearchFiltersSchema,
+    PaintBatchSearchSchema,
+    PaintTextSearchSchema,
+    PaintHybridSearchSchema,
+    SearchCacheStatsSchema,
+    SearchExplainSchema
 )
-from app.presentation.api.dependencies.auth_dependencies import get_paint_repository, get_embedding_service
+from app.presentation.api.schemas.auth_schema import UserResponseSchema
+from app.presentation.api.dependencies.auth_dependencies import (
+    get_paint_repository,
+    get_embedding_cache_repository,
+    get_embedding_service,
+    get_async_embedding_service,
+    get_current_user_optional,
+    require_roles
+)
+from app.presentation.api.dependencies.search_dependencies import get_query_embedding_cache, get_search_result_cache
+from app.infrastructure.cache.lru_cache import LRUCache
+from app.infrastructure.cache.search_result_cache import SearchResultCache
+from app.infrastructure.config.settings import settings
+from app.infrastructure.services.embedding_worker import EmbeddingWorker, get_embedding_worker
 
 router = APIRouter(prefix="/paints", tags=["Paints"])
 
+# Header com o cursor da próxima página das buscas paginadas
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Roles que podem pedir o diagnóstico (explain) da busca
+EXPLAIN_ROLES = ["admin", "super_admin"]
+
+
+def _hit_to_schema(hit: PaintSearchHit) -> PaintSearchResultSchema:
+    """Converte um resultado de busca para o schema de resposta (tinta + distância/score)"""
+    return PaintSearchResultSchema(
+        **PaintResponseSchema.model_validate(hit.paint).model_dump(),
+        distance=hit.distance,
+        score=hit.score
+    )
+
+
+def _to_filters(search_data: PaintSearchFiltersSchema) -> PaintSearchFilters:
+    """Converte os filtros de atributos do schema para a entidade de domínio"""
+    return PaintSearchFilters(
+        line=search_data.line,
+        finish_type=search_data.finish_type,
+        surface_type=search_data.surface_type,
+        features_any=search_data.features_any,
+        features_all=search_data.features_all
+    )
+
 @router.post("", response_model=PaintResponseSchema, status_code=201)
-def create_paint(
+async def create_paint(
     paint_data: PaintCreateSchema,
     repository: PaintRepository = Depends(get_paint_repository),
-    embedding_service = Depends(get_embedding_service)
+    result_cache: Optional[SearchResultCache] = Depends(get_search_result_cache),
+    embedding_cache: EmbeddingCacheRepository = Depends(get_embedding_cache_repository),
+    embedding_worker: Optional[EmbeddingWorker] = Depends(get_embedding_worker)
 ):
-    """Cria uma nova tinta e gera embedding automaticamente"""
+    """
+    Cria uma nova tinta e gera embedding automaticamente
+    
+    Com EMBEDDING_OUTBOX (padrão) a tinta é gravada com embedding_status 'pending'
+    e o embedding é gerado pelo worker; sem outbox, é gerado na requisição.
+    """
+    fields = dict(
+        name=paint_data.name,
+        color=paint_data.color,
+        surface_type=paint_data.surface_type,
+        environment=paint_data.environment,
+        finish_type=paint_data.finish_type,
+        features=paint_data.features,
+        line=paint_data.line
+    )
     try:
-        paint = create_paint_uc(
-            repository=repository,
-            name=paint_data.name,
-            color=paint_data.color,
-            surface_type=paint_data.surface_type,
-            environment=paint_data.environment,
-            finish_type=paint_data.finish_type,
-            features=paint_data.features,
-            line=paint_data.line,
-            embedding_service=embedding_service
-        )
+        if settings.embedding.outbox:
+            paint = await run_in_threadpool(
+                create_paint_deferred_uc, repository=repository, result_cache=result_cache, **fields
+            )
+            if embedding_worker is not None:
+                embedding_worker.notify()
+        else:
+            paint = await create_paint_uc(
+                repository=repository,
+                embedding_service=get_async_embedding_service(),
+                result_cache=result_cache,
+                embedding_cache=embedding_cache,
+                **fields
+            )
         return PaintResponseSchema.model_validate(paint)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -75,31 +149,48 @@ def get_all_paints(
 
 
 @router.put("/{paint_id}", response_model=PaintResponseSchema)
-def update_paint(
+async def update_paint(
     paint_id: int,
     paint_data: PaintUpdateSchema,
     repository: PaintRepository = Depends(get_paint_repository),
-    embedding_service = Depends(get_embedding_service)
+    result_cache: Optional[SearchResultCache] = Depends(get_search_result_cache),
+    embedding_cache: EmbeddingCacheRepository = Depends(get_embedding_cache_repository),
+    embedding_worker: Optional[EmbeddingWorker] = Depends(get_embedding_worker)
 ):
-    """Atualiza uma tinta existente e regenera embedding automaticamente"""
+    """Atualiza uma tinta existente e regenera embedding automaticamente (no worker, com EMBEDDING_OUTBOX)"""
     # Busca a tinta existente para pegar os valores atuais
-    existing_paint = get_paint_by_id_uc(repository=repository, paint_id=paint_id)
+    existing_paint = await run_in_threadpool(get_paint_by_id_uc, repository=repository, paint_id=paint_id)
     if not existing_paint:
         raise HTTPException(status_code=404, detail=f"Tinta com ID {paint_id} não encontrada")
     
     # Usa valores do schema ou mantém os existentes
-    updated_paint = update_paint_uc(
-        repository=repository,
-        paint_id=paint_id,
+    fields = dict(
         name=paint_data.name or existing_paint.name,
         color=paint_data.color or existing_paint.color,
         surface_type=paint_data.surface_type or existing_paint.surface_type,
         environment=paint_data.environment or existing_paint.environment,
         finish_type=paint_data.finish_type or existing_paint.finish_type,
         features=paint_data.features if paint_data.features is not None else existing_paint.features,
-        line=paint_data.line or existing_paint.line,
-        embedding_service=embedding_service
+        line=paint_data.line or existing_paint.line
     )
+    try:
+        if settings.embedding.outbox:
+            updated_paint = await run_in_threadpool(
+                update_paint_deferred_uc, repository=repository, paint_id=paint_id, result_cache=result_cache, **fields
+            )
+            if updated_paint and embedding_worker is not None:
+                embedding_worker.notify()
+        else:
+            updated_paint = await update_paint_uc(
+                repository=repository,
+                paint_id=paint_id,
+                embedding_service=get_async_embedding_service(),
+                result_cache=result_cache,
+                embedding_cache=embedding_cache,
+                **fields
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     if not updated_paint:
         raise HTTPException(status_code=404, detail=f"Tinta com ID {paint_id} não encontrada")
@@ -110,28 +201,210 @@ def update_paint(
 @router.delete("/{paint_id}", status_code=204)
 def delete_paint(
     paint_id: int,
-    repository: PaintRepository = Depends(get_paint_repository)
+    repository: PaintRepository = Depends(get_paint_repository),
+    result_cache: Optional[SearchResultCache] = Depends(get_search_result_cache)
 ):
     """Deleta uma tinta"""
-    deleted = delete_paint_uc(repository=repository, paint_id=paint_id)
+    deleted = delete_paint_uc(repository=repository, paint_id=paint_id, result_cache=result_cache)
     if not deleted:
         raise HTTPException(status_code=404, detail=f"Tinta com ID {paint_id} não encontrada")
     return None
 
 
-@router.post("/search", response_model=List[PaintResponseSchema])
+@router.post("/search", response_model=Union[List[PaintSearchResultSchema], SearchExplainSchema])
 def search_paints_semantic(
     search_data: PaintSearchSchema,
+    response: Response,
+    explain: bool = Query(False, description="Retorna o diagnóstico da busca (EXPLAIN ANALYZE, índices e tempos); apenas admin/super_admin"),
+    repository: PaintRepository = Depends(get_paint_repository),
+    result_cache: Optional[SearchResultCache] = Depends(get_search_result_cache),
+    current_user: Optional[UserResponseSchema] = Depends(get_current_user_optional)
+):
+    """
+    Busca semântica de tintas usando embeddings (RAG)
+    
+    Cada resultado traz distance/score; se houver mais vizinhos, o cursor da
+    próxima página vem no header X-Next-Cursor. Com explain=true (admin), retorna
+    os resultados junto com o plano de execução e os tempos de cada etapa
+    """
+    if explain:
+        if current_user is None:
+            raise HTTPException(status_code=401, detail="Token não fornecido")
+        if not set(current_user.roles).intersection(EXPLAIN_ROLES):
+            raise HTTPException(status_code=403, detail=f"Acesso negado. Roles necessárias: {EXPLAIN_ROLES}")
+        return _explain_search(search_data, repository)
+    try:
+        hits, next_cursor = search_semantic_paints_page(
+            repository=repository,
+            query_embedding=search_data.query_embedding(),
+            top_k=search_data.top_k,
+            environment=search_data.environment,
+            ef_search=search_data.ef_search,
+            probes=search_data.probes,
+            min_score=search_data.min_score,
+            cursor=search_data.cursor,
+            result_cache=result_cache,
+            filters=_to_filters(search_data),
+            diversity=search_data.diversity
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return [_hit_to_schema(hit) for hit in hits]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro na busca semântica: {str(e)}")
+
+
+def _explain_search(search_data: PaintSearchSchema, repository: PaintRepository) -> SearchExplainSchema:
+    """Busca semântica com diagnóstico: plano de execução, índices usados e tempos de cada etapa"""
+    if search_data.cursor:
+        raise HTTPException(status_code=400, detail="explain não suporta cursor")
+    if search_data.diversity is not None:
+        # O plano explicado é o da consulta SQL; a reordenação por MMR não entra nele
+        raise HTTPException(status_code=400, detail="explain não suporta diversity")
+    try:
+        start = time.perf_counter()
+        query_embedding = search_data.query_embedding()
+        parsed = time.perf_counter()
+        explanation = explain_semantic_paints(
+            repository=repository,
+            query_embedding=query_embedding,
+            top_k=search_data.top_k,
+            environment=search_data.environment,
+            ef_search=search_data.ef_search,
+            probes=search_data.probes,
+            min_score=search_data.min_score,
+            filters=_to_filters(search_data)
+        )
+        searched = time.perf_counter()
+        results = [_hit_to_schema(hit) for hit in explanation.hits]
+        finished = time.perf_counter()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro na busca semântica: {str(e)}")
+    
+    timings = {
+        "embedding_parse_ms": round((parsed - start) * 1000, 3),
+        **explanation.timings,
+        "serialization_ms": round((finished - searched) * 1000, 3),
+        "total_ms": round((finished - start) * 1000, 3),
+    }
+    return SearchExplainSchema(
+        results=results,
+        indexes=explanation.indexes,
+        rows_scanned=explanation.rows_scanned,
+        candidates=explanation.candidates,
+        shared_hit_blocks=explanation.shared_hit_blocks,
+        shared_read_blocks=explanation.shared_read_blocks,
+        planning_ms=explanation.planning_ms,
+        execution_ms=explanation.execution_ms,
+        settings=explanation.settings,
+        timings=timings,
+        plan=explanation.plan
+    )
+
+
+@router.post("/search/batch", response_model=List[List[PaintSearchResultSchema]])
+def search_paints_semantic_batch(
+    search_data: PaintBatchSearchSchema,
     repository: PaintRepository = Depends(get_paint_repository)
 ):
-    """Busca semântica de tintas usando embeddings (RAG)"""
+    """Várias buscas semânticas em uma única ida ao banco; resultados na ordem das buscas"""
     try:
-        paints = search_semantic_paints(
+        results = search_semantic_paints_batch(
             repository=repository,
-            query_embedding=search_data.embedding,
+            queries=[
+                SemanticSearchQuery(
+                    embedding=query.query_embedding(),
+                    top_k=query.top_k,
+                    environment=query.environment,
+                    ef_search=query.ef_search,
+                    probes=query.probes,
+                    min_score=query.min_score,
+                    filters=_to_filters(query)
+                )
+                for query in search_data.queries
+            ]
+        )
+        return [
+            [_hit_to_schema(hit) for hit in hits]
+            for hits in results
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro na busca semântica: {str(e)}")
+
+
+@router.post("/search/text", response_model=List[PaintSearchResultSchema])
+def search_paints_text(
+    search_data: PaintTextSearchSchema,
+    response: Response,
+    repository: PaintRepository = Depends(get_paint_repository),
+    embedding_service = Depends(get_embedding_service),
+    embedding_cache: LRUCache = Depends(get_query_embedding_cache),
+    result_cache: Optional[SearchResultCache] = Depends(get_search_result_cache)
+):
+    """Busca semântica a partir do texto; o embedding da query é gerado (e cacheado) pelo back-api"""
+    try:
+        hits, next_cursor = search_paints_by_text(
+            repository=repository,
+            embedding_service=embedding_service,
+            query=search_data.query,
             top_k=search_data.top_k,
-            environment=search_data.environment
+            environment=search_data.environment,
+            embedding_cache=embedding_cache,
+            result_cache=result_cache,
+            min_score=search_data.min_score,
+            cursor=search_data.cursor,
+            filters=_to_filters(search_data),
+            diversity=search_data.diversity
         )
-        return [PaintResponseSchema.model_validate(paint) for paint in paints]
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return [_hit_to_schema(hit) for hit in hits]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro na busca semântica: {str(e)}")
+
+
+@router.post("/search/hybrid", response_model=List[PaintSearchResultSchema])
+def search_paints_hybrid_route(
+    search_data: PaintHybridSearchSchema,
+    repository: PaintRepository = Depends(get_paint_repository)
+):
+    """Busca híbrida: full-text (termos exatos) + embedding, combinados com reciprocal rank fusion"""
+    try:
+        hits = search_paints_hybrid(
+            repository=repository,
+            query=search_data.query,
+            query_embedding=search_data.query_embedding(),
+            top_k=search_data.top_k,
+            environment=search_data.environment,
+            ef_search=search_data.ef_search,
+            probes=search_data.probes,
+            min_score=search_data.min_score,
+            filters=_to_filters(search_data),
+            diversity=search_data.diversity
+        )
+        return [_hit_to_schema(hit) for hit in hits]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro na busca híbrida: {str(e)}")
+
+
+@router.get("/search/cache", response_model=SearchCacheStatsSchema)
+def get_search_cache_stats(
+    embedding_cache: LRUCache = Depends(get_query_embedding_cache),
+    result_cache: Optional[SearchResultCache] = Depends(get_search_result_cache),
+    current_user: UserResponseSchema = Depends(require_roles(["admin", "super_admin"]))
+):
+    """Hits/misses dos caches da busca, para dimensionamento (apenas admin/super_admin)"""
+    return {
+        "results": result_cache.stats() if result_cache is not None else None,
+        "query_embeddings": embedding_cache.stats()
+    }
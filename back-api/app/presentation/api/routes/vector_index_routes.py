@@ -0,0 +1,77 @@
+import logging
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from app.infrastructure.search.index_manager import VectorIndexManager, get_vector_index_manager
+from app.presentation.api.schemas.auth_schema import UserResponseSchema
+from app.presentation.api.schemas.vector_index_schema import (
+    VectorIndexStatusSchema,
+    VectorIndexRebuildSchema,
+    VectorIndexEvaluateSchema,
+    VectorIndexEvaluationSchema,
+)
+from app.presentation.api.dependencies.auth_dependencies import require_roles
+
+logger = logging.getLogger(__name__)
+
+# Registrado antes de paint_routes para não colidir com /paints/{paint_id}
+router = APIRouter(prefix="/paints/vector-index", tags=["Paints"])
+
+
+def _rebuild_in_background(manager: VectorIndexManager, rebuild_data: VectorIndexRebuildSchema) -> None:
+    try:
+        manager.rebuild(
+            method=rebuild_data.method,
+            lists=rebuild_data.lists,
+            m=rebuild_data.m,
+            ef_construction=rebuild_data.ef_construction,
+            concurrently=rebuild_data.concurrently
+        )
+    except Exception:
+        logger.exception("Falha na reconstrução do índice vetorial")
+
+
+@router.get("", response_model=VectorIndexStatusSchema)
+def get_vector_index_status(
+    manager: VectorIndexManager = Depends(get_vector_index_manager),
+    current_user: UserResponseSchema = Depends(require_roles(["admin", "super_admin"]))
+):
+    """Estado do índice vetorial: método, parâmetros, tamanho, progresso e recomendação (apenas admin/super_admin)"""
+    try:
+        return manager.status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar índice vetorial: {str(e)}")
+
+
+@router.post("/rebuild", status_code=status.HTTP_202_ACCEPTED)
+def rebuild_vector_index(
+    rebuild_data: VectorIndexRebuildSchema,
+    background_tasks: BackgroundTasks,
+    manager: VectorIndexManager = Depends(get_vector_index_manager),
+    current_user: UserResponseSchema = Depends(require_roles(["admin", "super_admin"]))
+):
+    """
+    Reconstrói o índice vetorial em segundo plano (apenas admin/super_admin)
+    
+    Acompanhe o progresso em GET /paints/vector-index
+    """
+    if manager.is_rebuilding:
+        raise HTTPException(status_code=409, detail="Já existe uma reconstrução do índice vetorial em andamento")
+    background_tasks.add_task(_rebuild_in_background, manager, rebuild_data)
+    return {"message": "Reconstrução do índice vetorial iniciada"}
+
+
+@router.post("/evaluate", response_model=VectorIndexEvaluationSchema)
+def evaluate_vector_index(
+    evaluate_data: VectorIndexEvaluateSchema,
+    manager: VectorIndexManager = Depends(get_vector_index_manager),
+    current_user: UserResponseSchema = Depends(require_roles(["admin", "super_admin"]))
+):
+    """Mede recall@k e latência do índice aproximado contra a busca exata (apenas admin/super_admin)"""
+    try:
+        return manager.evaluate(
+            top_k=evaluate_data.top_k,
+            sample_size=evaluate_data.sample_size,
+            values=evaluate_data.values,
+            environment=evaluate_data.environment
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao avaliar índice vetorial: {str(e)}")
@@ -0,0 +1,13 @@
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+
+
+class EmbeddingOutboxStatusSchema(BaseModel):
+    """Estado do outbox de embeddings"""
+    statuses: Dict[str, int] = Field(..., description="Número de tintas por embedding_status (pending, ready, failed)")
+    worker: Optional[Dict[str, Any]] = Field(None, description="Contadores do worker deste processo (None se desabilitado)")
+
+
+class EmbeddingOutboxRetrySchema(BaseModel):
+    """Resultado do reenfileiramento das tintas com embedding 'failed'"""
+    requeued: int
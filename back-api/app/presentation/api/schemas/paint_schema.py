@@ -1,6 +1,12 @@
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict, PrivateAttr
+from typing import Any, Dict, List, Literal, Optional, Union
 from datetime import datetime
+import base64
+import binascii
+import numpy as np
+
+# dtype declarado -> dtype NumPy little-endian
+PACKED_DTYPES = {"float32": np.dtype("<f4"), "float16": np.dtype("<f2")}
 
 class PaintCreateSchema(BaseModel):
     """Schema para criação de tinta"""
@@ -64,12 +70,140 @@ class PaintResponseSchema(BaseModel):
     line: str
     created_at: datetime
     updated_at: datetime
+    embedding_status: str = Field("ready", description="'pending' (embedding sendo gerado pelo worker), 'ready' ou 'failed'")
+
+class PaintSearchResultSchema(PaintResponseSchema):
+    """Tinta encontrada na busca, com a relevância para a query"""
+    distance: Optional[float] = Field(None, description="Distância de cosseno ao embedding da query (menor = mais similar)")
+    score: Optional[float] = Field(None, description="Similaridade (1 - distância); na busca híbrida, score de fusão")
+
+class PackedEmbeddingSchema(BaseModel):
+    """Embedding compactado: base64 dos valores float little-endian"""
+    dtype: Literal["float32", "float16"] = Field("float32", description="Tipo dos valores: 'float32' ou 'float16'")
+    dim: int = Field(..., ge=1, le=4096, description="Dimensão do embedding")
+    data: str = Field(..., description="Base64 dos valores little-endian")
+    
+    _array: np.ndarray = PrivateAttr()
+    
+    @model_validator(mode="after")
+    def decode_data(self) -> "PackedEmbeddingSchema":
+        dtype = PACKED_DTYPES[self.dtype]
+        try:
+            raw = base64.b64decode(self.data, validate=True)
+        except (binascii.Error, ValueError):
+            raise ValueError("data deve estar em base64")
+        if len(raw) != self.dim * dtype.itemsize:
+            raise ValueError(f"data tem {len(raw)} bytes, esperado {self.dim * dtype.itemsize} para dim={self.dim} ({self.dtype})")
+        array = np.frombuffer(raw, dtype=dtype).astype(np.float32)
+        if not np.isfinite(array).all():
+            raise ValueError("Embedding contém valores inválidos (NaN/inf)")
+        self._array = array
+        return self
+    
+    def to_array(self) -> np.ndarray:
+        """Retorna o embedding decodificado (float32)"""
+        return self._array
 
-class PaintSearchSchema(BaseModel):
+
+class PaintSearchFiltersSchema(BaseModel):
+    """Filtros de atributos comuns às buscas (aplicados dentro da consulta vetorial)"""
+    line: Optional[str] = Field(None, max_length=50, description="Filtrar por linha (ex: 'Premium')")
+    finish_type: Optional[str] = Field(None, max_length=50, description="Filtrar por acabamento, sem diferenciar maiúsculas (ex: 'fosco')")
+    surface_type: Optional[str] = Field(None, max_length=100, description="Filtrar por uma superfície indicada (ex: 'madeira')")
+    features_any: List[str] = Field(default_factory=list, max_length=20, description="Tintas com ao menos uma destas features")
+    features_all: List[str] = Field(default_factory=list, max_length=20, description="Tintas com todas estas features")
+
+
+class PaintSearchSchema(PaintSearchFiltersSchema):
     """Schema para busca semântica de tintas"""
-    embedding: List[float] = Field(..., description="Embedding da query (vetor de floats)")
+    embedding: Optional[List[float]] = Field(None, description="Embedding da query (vetor de floats)")
+    packed_embedding: Optional[PackedEmbeddingSchema] = Field(None, description="Embedding da query compactado (alternativa a 'embedding')")
     top_k: int = Field(5, ge=1, le=50, description="Número de resultados desejados")
     environment: Optional[str] = Field(None, description="Filtrar por ambiente: 'interno' ou 'externo'")
+    ef_search: Optional[int] = Field(None, ge=1, le=1000, description="hnsw.ef_search desta busca (maior: mais recall, mais latência)")
+    probes: Optional[int] = Field(None, ge=1, le=10000, description="ivfflat.probes desta busca (maior: mais recall, mais latência)")
+    min_score: Optional[float] = Field(None, ge=-1, le=1, description="Similaridade mínima (1 - distância de cosseno); resultados abaixo são descartados")
+    cursor: Optional[str] = Field(None, max_length=512, description="Cursor da próxima página (header X-Next-Cursor da resposta anterior)")
+    diversity: Optional[float] = Field(None, ge=0, le=1, description="Peso da diversidade entre os resultados (MMR): 0 só relevância, 1 máxima diversidade; sem paginação")
+    
+    @field_validator('environment')
+    @classmethod
+    def validate_environment(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None and v not in ["interno", "externo"]:
+            raise ValueError("Environment deve ser 'interno' ou 'externo'")
+        return v
+    
+    @model_validator(mode="after")
+    def validate_embedding(self) -> "PaintSearchSchema":
+        if (self.embedding is None) == (self.packed_embedding is None):
+            raise ValueError("Informe exatamente um entre 'embedding' e 'packed_embedding'")
+        return self
+    
+    def query_embedding(self) -> Union[List[float], np.ndarray]:
+        """Embedding da query, independente do formato recebido"""
+        if self.packed_embedding is not None:
+            return self.packed_embedding.to_array()
+        return self.embedding
+    
+    model_config = {"json_schema_extra": {
+        "examples": [
+            {
+                "embedding": [0.1, 0.2, 0.3, 0.4, 0.5],
+                "top_k": 5,
+                "environment": "interno",
+                "features_any": ["lavável"]
+            },
+            {
+                "packed_embedding": {"dtype": "float32", "dim": 2, "data": "zczMPc3MTD4="},
+                "top_k": 5
+            }
+        ]
+    }}
+
+
+class PaintHybridSearchSchema(PaintSearchSchema):
+    """Schema para busca híbrida (texto + embedding opcional)"""
+    query: str = Field(..., min_length=1, max_length=500, description="Texto da busca (termos exatos como 'Verde Garrafa')")
+    
+    @model_validator(mode="after")
+    def validate_embedding(self) -> "PaintHybridSearchSchema":
+        if self.embedding is not None and self.packed_embedding is not None:
+            raise ValueError("Informe no máximo um entre 'embedding' e 'packed_embedding'")
+        if self.cursor is not None:
+            raise ValueError("A busca híbrida não suporta cursor")
+        return self
+    
+    def query_embedding(self) -> Optional[Union[List[float], np.ndarray]]:
+        """Embedding da query (None para busca apenas textual)"""
+        if self.embedding is None and self.packed_embedding is None:
+            return None
+        return super().query_embedding()
+    
+    model_config = {"json_schema_extra": {
+        "examples": [
+            {
+                "query": "Verde Garrafa",
+                "top_k": 5,
+                "environment": "externo",
+                "diversity": 0.3
+            },
+            {
+                "query": "tinta lavável para quarto",
+                "packed_embedding": {"dtype": "float32", "dim": 2, "data": "zczMPc3MTD4="},
+                "top_k": 5
+            }
+        ]
+    }}
+
+
+class PaintTextSearchSchema(PaintSearchFiltersSchema):
+    """Schema para busca semântica a partir do texto (embedding gerado pelo back-api)"""
+    query: str = Field(..., min_length=1, max_length=500, description="Texto da busca")
+    top_k: int = Field(5, ge=1, le=50, description="Número de resultados desejados")
+    environment: Optional[str] = Field(None, description="Filtrar por ambiente: 'interno' ou 'externo'")
+    min_score: Optional[float] = Field(None, ge=-1, le=1, description="Similaridade mínima (1 - distância de cosseno); resultados abaixo são descartados")
+    cursor: Optional[str] = Field(None, max_length=512, description="Cursor da próxima página (header X-Next-Cursor da resposta anterior)")
+    diversity: Optional[float] = Field(None, ge=0, le=1, description="Peso da diversidade entre os resultados (MMR): 0 só relevância, 1 máxima diversidade; sem paginação")
     
     @field_validator('environment')
     @classmethod
@@ -80,8 +214,63 @@ class PaintSearchSchema(BaseModel):
     
     model_config = {"json_schema_extra": {
         "example": {
-            "embedding": [0.1, 0.2, 0.3, 0.4, 0.5],
+            "query": "tinta lavável para quarto",
             "top_k": 5,
-            "environment": "interno"
+            "environment": "interno",
+            "finish_type": "fosco"
         }
     }}
+
+
+class PaintBatchSearchSchema(BaseModel):
+    """Schema para várias buscas semânticas em uma única requisição"""
+    queries: List[PaintSearchSchema] = Field(..., min_length=1, max_length=32, description="Buscas a executar (cada uma com seu top_k e environment)")
+    
+    @model_validator(mode="after")
+    def validate_cursor(self) -> "PaintBatchSearchSchema":
+        if any(query.cursor is not None for query in self.queries):
+            raise ValueError("A busca em lote não suporta cursor")
+        if any(query.diversity for query in self.queries):
+            raise ValueError("A busca em lote não suporta diversity")
+        return self
+    
+    model_config = {"json_schema_extra": {
+        "example": {
+            "queries": [
+                {"embedding": [0.1, 0.2, 0.3, 0.4, 0.5], "top_k": 5, "environment": "interno"},
+                {"embedding": [0.5, 0.4, 0.3, 0.2, 0.1], "top_k": 3}
+            ]
+        }
+    }}
+
+
+class SearchExplainSchema(BaseModel):
+    """Diagnóstico da busca semântica (explain=true)"""
+    results: List[PaintSearchResultSchema]
+    indexes: List[str] = Field(..., description="Índices usados pelo plano de execução")
+    rows_scanned: int = Field(..., description="Linhas lidas pelas varreduras, incluindo as descartadas por filtros")
+    candidates: int = Field(..., description="Linhas devolvidas pelas varreduras para ordenação/limite")
+    shared_hit_blocks: int = Field(..., description="Blocos lidos do cache do PostgreSQL")
+    shared_read_blocks: int = Field(..., description="Blocos lidos do disco/cache do sistema operacional")
+    planning_ms: float
+    execution_ms: float = Field(..., description="Tempo de execução medido pelo EXPLAIN ANALYZE")
+    settings: Dict[str, str] = Field(..., description="Etapa inicial e ajustes do índice aplicados na transação")
+    timings: Dict[str, float] = Field(..., description="Tempos medidos na API (ms): leitura do embedding, montagem da consulta, SQL, serialização e total")
+    plan: Any = Field(..., description="Saída de EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)")
+
+
+class CacheStatsSchema(BaseModel):
+    """Contadores de uso de um cache"""
+    size: int
+    maxsize: int
+    ttl_seconds: Optional[float]
+    hits: int
+    misses: int
+    hit_rate: float
+    catalog_version: Optional[int] = None
+
+
+class SearchCacheStatsSchema(BaseModel):
+    """Contadores dos caches da busca (resultados e embeddings de queries de texto)"""
+    results: Optional[CacheStatsSchema] = Field(None, description="Cache de resultados da busca semântica (None se desabilitado)")
+    query_embeddings: CacheStatsSchema
@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class VectorIndexParametersSchema(BaseModel):
+    """Parâmetros de construção e consulta de um índice vetorial"""
+    method: str
+    lists: Optional[int] = None
+    probes: Optional[int] = None
+    m: Optional[int] = None
+    ef_construction: Optional[int] = None
+    ef_search: Optional[int] = None
+
+
+class VectorIndexInfoSchema(BaseModel):
+    """Índice vetorial existente na tabela paints"""
+    name: str
+    method: Optional[str]
+    options: Dict[str, str]
+    size_bytes: int
+    valid: bool
+    definition: str
+
+
+class VectorIndexStatusSchema(BaseModel):
+    """Estado do índice vetorial"""
+    total_rows: int
+    embedded_rows: int
+    indexes: List[VectorIndexInfoSchema]
+    recommended: VectorIndexParametersSchema
+    rebuilding: bool
+    progress: Optional[Dict[str, Any]] = None
+    last_rebuild: Optional[Dict[str, Any]] = None
+
+
+class VectorIndexRebuildSchema(BaseModel):
+    """Schema para reconstrução do índice vetorial (parâmetros omitidos são recomendados pelo tamanho da tabela)"""
+    method: Optional[Literal["hnsw", "ivfflat"]] = Field(None, description="Método do índice (padrão: SEARCH_INDEX_METHOD)")
+    lists: Optional[int] = Field(None, ge=1, le=32768, description="Número de listas (ivfflat)")
+    m: Optional[int] = Field(None, ge=2, le=100, description="Conexões por nó (hnsw)")
+    ef_construction: Optional[int] = Field(None, ge=4, le=1000, description="Tamanho da lista de candidatos na construção (hnsw)")
+    concurrently: bool = Field(True, description="Constrói sem bloquear escritas (CREATE INDEX CONCURRENTLY)")
+
+
+class VectorIndexEvaluateSchema(BaseModel):
+    """Schema para avaliação de recall/latência do índice vetorial"""
+    top_k: int = Field(10, ge=1, le=100, description="Número de vizinhos comparados")
+    sample_size: int = Field(50, ge=1, le=1000, description="Número de consultas amostradas do catálogo")
+    values: Optional[List[int]] = Field(None, min_length=1, max_length=20, description="Valores de ef_search (hnsw) ou probes (ivfflat) a avaliar")
+    environment: Optional[Literal["interno", "externo"]] = Field(None, description="Avalia o índice parcial do ambiente (buscas filtradas por ambiente) em vez do global")
+
+
+class VectorIndexEvaluationResultSchema(BaseModel):
+    """Recall e latência para um valor de ef_search/probes"""
+    setting: str
+    value: int
+    recall: Optional[float]
+    avg_latency_ms: Optional[float]
+    p95_latency_ms: Optional[float]
+
+
+class VectorIndexEvaluationSchema(BaseModel):
+    """Relatório de recall x latência do índice vetorial"""
+    index: str
+    method: Optional[str]
+    top_k: int
+    sample_size: int
+    exact: Dict[str, Optional[float]]
+    results: List[VectorIndexEvaluationResultSchema]
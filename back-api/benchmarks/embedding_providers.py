@@ -0,0 +1,84 @@
+"""
+Benchmark: vazão e latência da geração de embeddings por provedor.
+
+Gera embeddings de textos de tintas sintéticos com o provedor local (hashing em
+CPU, sem rede) e, se OPENAI_API_KEY estiver configurada, com a OpenAI, em lotes
+do tamanho pedido. O provedor local serve de piso de latência para o pipeline
+(ETL, worker do outbox) sem custo nem limite de taxa. Não precisa de banco de dados.
+
+Uso:
+    python -m benchmarks.embedding_providers [--texts 2000] [--batch-size 256] [--skip-openai]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from dotenv import load_dotenv
+load_dotenv()
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+from app.infrastructure.services.embedding_providers import create_embedding_provider
+from app.infrastructure.services.embedding_service import EmbeddingService
+
+NAMES = ["Suvinil Toque de Seda", "Coralar Mais", "Metalatex Eco", "Suvinil Clássica", "Esmalte Sintético"]
+COLORS = ["Branco Neve", "Cinza Urbano", "Azul Sereno", "Verde Garrafa", "Vermelho Cardinal"]
+SURFACES = ["parede", "madeira", "metal", "reboco"]
+FINISHES = ["fosco", "acetinado", "semi-brilho", "brilhante"]
+FEATURES = ["lavável", "anti-mofo", "sem odor", "alta cobertura", "resistente ao sol"]
+
+
+def synthetic_texts(count: int):
+    rng = random.Random(0)
+    return [
+        EmbeddingService.build_paint_text(
+            name=f"{rng.choice(NAMES)} {index}",
+            color=rng.choice(COLORS),
+            surface_type=rng.choice(SURFACES),
+            environment=rng.choice(["interno", "externo"]),
+            finish_type=rng.choice(FINISHES),
+            features=rng.sample(FEATURES, 2),
+            line=rng.choice(["Premium", "Standard"])
+        )
+        for index in range(count)
+    ]
+
+
+def run(texts_count: int, batch_size: int, skip_openai: bool) -> None:
+    texts = synthetic_texts(texts_count)
+    providers = ["local"] if skip_openai else ["local", "openai"]
+
+    print("=" * 60)
+    print("BENCHMARK - PROVEDORES DE EMBEDDINGS")
+    print("=" * 60)
+    print(f"  - Textos: {len(texts)}")
+    print(f"  - Lote: {batch_size}")
+
+    for name in providers:
+        provider = create_embedding_provider(name)
+        if provider is None:
+            print(f"\n[{name}] ignorado: OPENAI_API_KEY não configurada")
+            continue
+        latencies = []
+        start = time.perf_counter()
+        for offset in range(0, len(texts), batch_size):
+            batch_start = time.perf_counter()
+            provider.embed(texts[offset:offset + batch_size])
+            latencies.append((time.perf_counter() - batch_start) * 1000)
+        elapsed = time.perf_counter() - start
+
+        print(f"\n[{name}] {provider.model}")
+        print(f"   Vazão: {len(texts) / elapsed:.0f} textos/s")
+        print(f"   Latência por lote: média {np.mean(latencies):.1f} ms (p95: {np.percentile(latencies, 95):.1f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--skip-openai", action="store_true")
+    args = parser.parse_args()
+    run(args.texts, args.batch_size, args.skip_openai)
@@ -0,0 +1,112 @@
+"""
+Benchmark: busca semântica filtrada por ambiente com e sem os índices parciais.
+
+Compara, no banco configurado em DB_URL, buscas com environment usando os
+índices vetoriais parciais por ambiente (migração a2c3d4e5f6a7) e usando só o
+índice global seguido do filtro, com e sem hnsw.iterative_scan. O recall@k é
+medido contra a busca exata (varredura sequencial) usando embeddings de tintas
+do próprio catálogo como consultas.
+
+Os índices parciais são removidos dentro de uma transação desfeita ao final;
+o DROP INDEX bloqueia a tabela paints enquanto ela durar, então não rode em produção.
+
+Uso:
+    python -m benchmarks.filtered_search [--queries 100] [--top-k 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+load_dotenv()
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+from sqlalchemy import text
+from app.infrastructure.config.settings import settings
+from app.infrastructure.database.connection import SessionLocal
+from app.infrastructure.database.models.paint_model import PAINT_ENVIRONMENTS
+from app.infrastructure.repositories.paint_repository_impl import PaintRepositoryImpl
+from app.infrastructure.search.index_manager import INDEX_NAME, SHORT_INDEX_NAME, environment_index_name
+from app.infrastructure.search.quantization import to_array
+
+
+def timed_searches(db, samples, top_k: int):
+    repository = PaintRepositoryImpl(db)
+    ids = []
+    latencies = []
+    for embedding, environment in samples:
+        start = time.perf_counter()
+        hits = repository.search_semantic(embedding, top_k=top_k, environment=environment)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids.append([hit.paint.id for hit in hits])
+    return ids, latencies
+
+
+def report(name: str, ids, latencies, expected, top_k: int) -> None:
+    recalls = [len(exact.intersection(found)) / len(exact) if exact else 1.0 for found, exact in zip(ids, expected)]
+    filled = np.mean([len(found) / top_k for found in ids])
+    print(f"\n[{name}]")
+    print(f"   Recall@{top_k}: {np.mean(recalls):.4f} (resultados/top_k: {filled:.2f})")
+    print(f"   Latência média: {np.mean(latencies):.2f} ms (p95: {np.percentile(latencies, 95):.2f} ms)")
+
+
+def run(queries: int, top_k: int) -> None:
+    db = SessionLocal()
+    original_iterative_scan = settings.search.iterative_scan
+    try:
+        rows = db.execute(text("""
+            SELECT embedding, environment FROM paints
+            WHERE embedding IS NOT NULL
+            ORDER BY random()
+            LIMIT :queries
+        """), {"queries": queries}).all()
+        db.rollback()
+        if not rows:
+            print("❌ Nenhuma tinta com embedding no banco")
+            return
+        # Cada consulta filtra por um ambiente sorteado (nem sempre o da tinta de origem)
+        rng = np.random.default_rng(42)
+        samples = [(to_array(row.embedding).tolist(), str(rng.choice(PAINT_ENVIRONMENTS))) for row in rows]
+
+        print("=" * 60)
+        print("BENCHMARK - BUSCA FILTRADA POR AMBIENTE")
+        print("=" * 60)
+        print(f"  - Consultas: {len(samples)}")
+        print(f"  - top_k: {top_k}")
+        print(f"  - SEARCH_FIRST_PASS: {settings.search.first_pass}")
+
+        # Sem index scan o PostgreSQL filtra e ordena todas as linhas: resultado exato
+        db.execute(text("SET LOCAL enable_indexscan = off"))
+        expected = [set(ids) for ids in timed_searches(db, samples, top_k)[0]]
+        db.rollback()
+
+        ids, latencies = timed_searches(db, samples, top_k)
+        db.rollback()
+        report("índices parciais", ids, latencies, expected, top_k)
+
+        partial_indexes = [
+            environment_index_name(name, environment)
+            for name in (INDEX_NAME, SHORT_INDEX_NAME)
+            for environment in PAINT_ENVIRONMENTS
+        ]
+        modes = ["off"] if original_iterative_scan == "off" else ["off", original_iterative_scan]
+        for iterative_scan in modes:
+            settings.search.iterative_scan = iterative_scan
+            db.execute(text(f"DROP INDEX IF EXISTS {', '.join(partial_indexes)}"))
+            ids, latencies = timed_searches(db, samples, top_k)
+            db.rollback()
+            report(f"índice global + filtro (iterative_scan={iterative_scan})", ids, latencies, expected, top_k)
+    finally:
+        settings.search.iterative_scan = original_iterative_scan
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+    run(args.queries, args.top_k)
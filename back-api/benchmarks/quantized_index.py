@@ -0,0 +1,123 @@
+"""
+Benchmark: índice vetorial em memória quantizado (int8 / binary) com reordenação exata.
+
+Compara SEARCH_QUANTIZATION=none, int8 e binary no InMemoryVectorIndex: memória
+dos vetores, latência da etapa de varredura, latência com a reordenação exata dos
+candidatos e recall@k contra a busca exata em float32.
+
+Por padrão usa os embeddings do catálogo (DB_URL); com --synthetic N gera N
+embeddings agrupados em torno de centros aleatórios, para simular catálogos com
+centenas de milhares de SKUs sem banco. A reordenação aqui lê os embeddings
+completos de um dicionário em memória; na aplicação eles vêm do banco em uma
+consulta por chave primária.
+
+Uso:
+    python -m benchmarks.quantized_index [--queries 100] [--top-k 10] [--synthetic 200000]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+load_dotenv()
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+from app.domain.entities.paint import Paint
+from app.infrastructure.config.settings import settings
+from app.infrastructure.search.quantization import QUANTIZATIONS, exact_rescore, to_array
+from app.infrastructure.search.vector_index import InMemoryVectorIndex
+
+
+def load_catalog():
+    from sqlalchemy import text
+    from app.infrastructure.database.connection import SessionLocal
+    db = SessionLocal()
+    try:
+        rows = db.execute(text("SELECT id, embedding FROM paints WHERE embedding IS NOT NULL")).all()
+    finally:
+        db.close()
+    return [row.id for row in rows], np.stack([to_array(row.embedding) for row in rows]) if rows else None
+
+
+def synthetic_catalog(size: int, dimensions: int = 1536, clusters: int = 500, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimensions)).astype(np.float32)
+    embeddings = centers[rng.integers(0, clusters, size)] + rng.normal(scale=0.7, size=(size, dimensions)).astype(np.float32)
+    return list(range(1, size + 1)), embeddings
+
+
+def build_index(ids, embeddings, quantization: str) -> InMemoryVectorIndex:
+    index = InMemoryVectorIndex(quantization=quantization)
+    now = datetime.now()
+    for paint_id, embedding in zip(ids, embeddings):
+        paint = Paint(
+            id=paint_id, name=f"Tinta {paint_id}", color="-", surface_type="-",
+            environment="interno", finish_type="-", features=[], line="-",
+            created_at=now, updated_at=now
+        )
+        index.upsert(paint, embedding)
+    return index
+
+
+def run(queries: int, top_k: int, synthetic: int) -> None:
+    if synthetic:
+        ids, embeddings = synthetic_catalog(synthetic)
+    else:
+        ids, embeddings = load_catalog()
+    if embeddings is None:
+        print("❌ Nenhuma tinta com embedding no banco")
+        return
+
+    rng = np.random.default_rng(7)
+    # Consultas próximas de itens do catálogo (como buscas reais por produtos existentes)
+    samples = embeddings[rng.choice(len(ids), size=min(queries, len(ids)), replace=False)]
+    samples = samples + rng.normal(scale=0.1, size=samples.shape).astype(np.float32)
+    by_id = dict(zip(ids, embeddings))
+    rescore_rows = max(settings.search.rescore_candidates, 4 * top_k)
+
+    print("=" * 60)
+    print("BENCHMARK - ÍNDICE EM MEMÓRIA QUANTIZADO")
+    print("=" * 60)
+    print(f"  - Tintas: {len(ids)} ({'sintético' if synthetic else 'catálogo'})")
+    print(f"  - Consultas: {len(samples)}")
+    print(f"  - top_k: {top_k} (candidatos reordenados: {rescore_rows})")
+
+    expected = None
+    for quantization in QUANTIZATIONS:
+        index = build_index(ids, embeddings, quantization)
+        scan_latencies = []
+        total_latencies = []
+        results = []
+        for query in samples:
+            start = time.perf_counter()
+            candidates = index.search(query, top_k=rescore_rows if index.is_quantized else top_k)
+            scanned = time.perf_counter()
+            if index.is_quantized:
+                candidates = exact_rescore(query, candidates, by_id, top_k)
+            finished = time.perf_counter()
+            scan_latencies.append((scanned - start) * 1000)
+            total_latencies.append((finished - start) * 1000)
+            results.append({paint.id for paint, _ in candidates})
+
+        if expected is None:
+            # quantization=none é a busca exata em float32
+            expected = results
+        recall = np.mean([len(exact & found) / len(exact) if exact else 1.0 for exact, found in zip(expected, results)])
+        print(f"\n[{quantization}]")
+        print(f"   Memória dos vetores: {index.memory_bytes / 1024 / 1024:.1f} MB")
+        print(f"   Recall@{top_k}: {recall:.4f}")
+        print(f"   Varredura: {np.mean(scan_latencies):.2f} ms (p95: {np.percentile(scan_latencies, 95):.2f} ms)")
+        print(f"   Com reordenação: {np.mean(total_latencies):.2f} ms (p95: {np.percentile(total_latencies, 95):.2f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--synthetic", type=int, default=0, help="Número de embeddings sintéticos (0: usa o banco)")
+    args = parser.parse_args()
+    run(args.queries, args.top_k, args.synthetic)
@@ -0,0 +1,110 @@
+"""
+Benchmark: etapa inicial da busca semântica com vetor completo x embedding reduzido.
+
+Compara, no banco configurado em DB_URL, a busca pelo índice do embedding
+completo (vector 1536, SEARCH_FIRST_PASS=full) com as buscas em duas etapas
+(halfvec 256, SEARCH_FIRST_PASS=short, ou binary_quantize com distância de
+Hamming, SEARCH_FIRST_PASS=binary, ambas com reordenação pelo vetor completo).
+O recall@k é medido contra a busca exata (varredura sequencial) usando
+embeddings de tintas do próprio catálogo como consultas.
+
+Uso:
+    python -m benchmarks.search_first_pass [--queries 100] [--top-k 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+load_dotenv()
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+from sqlalchemy import text
+from app.infrastructure.config.settings import settings
+from app.infrastructure.database.connection import SessionLocal
+from app.infrastructure.repositories.paint_repository_impl import PaintRepositoryImpl
+from app.infrastructure.search.quantization import to_array
+
+
+def storage_report(db) -> None:
+    row = db.execute(text("""
+        SELECT
+            avg(pg_column_size(embedding)) AS full_bytes,
+            avg(pg_column_size(embedding_short)) AS short_bytes,
+            pg_relation_size(to_regclass('paints_embedding_idx')) AS full_index_bytes,
+            pg_relation_size(to_regclass('paints_embedding_short_idx')) AS short_index_bytes,
+            pg_relation_size(to_regclass('paints_embedding_binary_idx')) AS binary_index_bytes
+        FROM paints
+        WHERE embedding IS NOT NULL
+    """)).one()
+    print("\n[Armazenamento]")
+    print(f"   Embedding por linha: {row.full_bytes or 0:.0f} bytes -> {row.short_bytes or 0:.0f} bytes")
+    print(f"   Índice: {(row.full_index_bytes or 0) / 1024:.0f} KB -> {(row.short_index_bytes or 0) / 1024:.0f} KB")
+    print(f"   Índice binary: {(row.binary_index_bytes or 0) / 1024:.0f} KB")
+
+
+def timed_search(db, embedding, top_k: int, exact: bool = False):
+    repository = PaintRepositoryImpl(db)
+    if exact:
+        # Sem index scan o PostgreSQL ordena todas as linhas: resultado exato
+        db.execute(text("SET LOCAL enable_indexscan = off"))
+    start = time.perf_counter()
+    hits = repository.search_semantic(embedding, top_k=top_k)
+    elapsed = time.perf_counter() - start
+    db.rollback()
+    return [hit.paint.id for hit in hits], elapsed
+
+
+def run(queries: int, top_k: int) -> None:
+    db = SessionLocal()
+    try:
+        samples = db.execute(text("""
+            SELECT embedding FROM paints
+            WHERE embedding IS NOT NULL
+            ORDER BY random()
+            LIMIT :queries
+        """), {"queries": queries}).scalars().all()
+        # Linhas de text() trazem pgvector.Vector; a busca espera uma lista de floats
+        samples = [to_array(sample).tolist() for sample in samples]
+        db.rollback()
+        if not samples:
+            print("❌ Nenhuma tinta com embedding no banco")
+            return
+
+        print("=" * 60)
+        print("BENCHMARK - ETAPA INICIAL DA BUSCA SEMÂNTICA")
+        print("=" * 60)
+        print(f"  - Consultas: {len(samples)}")
+        print(f"  - top_k: {top_k}")
+        storage_report(db)
+
+        original_first_pass = settings.search.first_pass
+        settings.search.first_pass = "full"
+        expected = [set(timed_search(db, embedding, top_k, exact=True)[0]) for embedding in samples]
+
+        for first_pass in ("full", "short", "binary"):
+            settings.search.first_pass = first_pass
+            recalls = []
+            latencies = []
+            for embedding, exact_ids in zip(samples, expected):
+                ids, elapsed = timed_search(db, embedding, top_k)
+                recalls.append(len(exact_ids.intersection(ids)) / len(exact_ids) if exact_ids else 1.0)
+                latencies.append(elapsed * 1000)
+
+            print(f"\n[{first_pass}]")
+            print(f"   Recall@{top_k}: {np.mean(recalls):.4f}")
+            print(f"   Latência média: {np.mean(latencies):.2f} ms (p95: {np.percentile(latencies, 95):.2f} ms)")
+        settings.search.first_pass = original_first_pass
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+    run(args.queries, args.top_k)
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark: custo de CPU por consulta para enviar o embedding da busca semântica.
+
+Compara a montagem antiga (validação elemento a elemento, literal de texto com
+~20 KB e SQL diferente a cada consulta) com o parâmetro binário do pgvector usado
+hoje por PaintRepositoryImpl. Não precisa de banco de dados.
+
+Uso:
+    python -m benchmarks.search_param_encoding [--dimensions 1536] [--queries 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+from dotenv import load_dotenv
+load_dotenv()
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from pgvector import Vector
+from app.infrastructure.repositories.paint_repository_impl import PaintRepositoryImpl
+
+
+def legacy_build_query(query_embedding):
+    """Montagem da consulta antes do parâmetro binário (mantida aqui só para comparação)"""
+    if not isinstance(query_embedding, list) or not all(isinstance(x, (int, float)) for x in query_embedding):
+        raise ValueError("query_embedding deve ser uma lista de números")
+    embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+    if not all(c.isdigit() or c in '[],.-+eE ' for c in embedding_str):
+        raise ValueError("Embedding contém caracteres inválidos")
+    sql = f"""
+        SELECT id FROM paints
+        WHERE embedding IS NOT NULL
+        ORDER BY embedding <=> '{embedding_str}'::vector
+        LIMIT :top_k
+    """
+    return sql.encode("utf8")
+
+
+def binary_build_query(query_embedding):
+    """Validação + serialização feita hoje: Vector e dump binário do psycopg"""
+    vector = PaintRepositoryImpl._to_vector(query_embedding)
+    return vector.to_binary()
+
+
+def run(dimensions: int, queries: int) -> None:
+    embeddings = [[random.uniform(-0.1, 0.1) for _ in range(dimensions)] for _ in range(16)]
+    legacy_size = len(legacy_build_query(embeddings[0]))
+    binary_size = len(binary_build_query(embeddings[0]))
+
+    print("=" * 60)
+    print("BENCHMARK - PARÂMETRO DO EMBEDDING NA BUSCA SEMÂNTICA")
+    print("=" * 60)
+    print(f"  - Dimensões: {dimensions}")
+    print(f"  - Consultas por medição: {queries}")
+
+    results = {}
+    for name, func in (("literal de texto (antigo)", legacy_build_query), ("binário pgvector (atual)", binary_build_query)):
+        counter = {"i": 0}
+
+        def call():
+            counter["i"] += 1
+            func(embeddings[counter["i"] % len(embeddings)])
+
+        best = min(timeit.repeat(call, number=queries, repeat=5))
+        results[name] = best / queries * 1e6
+        print(f"\n[{name}]")
+        print(f"   CPU por consulta: {results[name]:.1f} µs")
+
+    print(f"\n  - Tamanho do SQL/parâmetro: {legacy_size} bytes -> {binary_size} bytes")
+    legacy, binary = results.values()
+    print(f"  - Ganho: {legacy / binary:.1f}x menos CPU por consulta")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.dimensions, args.queries)
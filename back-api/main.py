@@ -1,13 +1,38 @@
 from dotenv import load_dotenv
 load_dotenv()
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.presentation.api.routes import health_routes, paint_routes, account_routes, user_routes
+from app.presentation.api.routes import health_routes, paint_routes, account_routes, user_routes, vector_index_routes, embedding_outbox_routes
+from app.infrastructure.database.connection import SessionLocal
+from app.infrastructure.search.vector_index import get_vector_index
+from app.infrastructure.services.embedding_worker import get_embedding_worker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Carrega o índice vetorial em memória (se habilitado) antes de aceitar requisições
+    vector_index = get_vector_index()
+    if vector_index is not None:
+        db = SessionLocal()
+        try:
+            vector_index.load(db)
+        finally:
+            db.close()
+    # Worker do outbox de embeddings (tintas com embedding_status 'pending')
+    embedding_worker = get_embedding_worker()
+    if embedding_worker is not None:
+        embedding_worker.start()
+    yield
+    if embedding_worker is not None:
+        await embedding_worker.stop()
+
 
 app = FastAPI(
     title="API Tintas",
     description="Esta API é responsável por gerenciar as tintas da empresa",
     version="1.0.0",
+    lifespan=lifespan,
     tags_metadata=[
         {
             "name": "General",
@@ -35,9 +60,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Cursor da próxima página das buscas
 )
 
 app.include_router(health_routes.router, prefix="/api/v1")
+app.include_router(vector_index_routes.router, prefix="/api/v1")
+app.include_router(embedding_outbox_routes.router, prefix="/api/v1")
 app.include_router(paint_routes.router, prefix="/api/v1")
 app.include_router(account_routes.router, prefix="/api/v1")
 app.include_router(user_routes.router, prefix="/api/v1") 
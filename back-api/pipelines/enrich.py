@@ -1,7 +1,7 @@
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator
 
 
-def enrich_paints_with_ai(paints: List[Dict]) -> List[Dict]:
+def enrich_paints_with_ai(paints: Iterable[Dict]) -> Iterator[Dict]:
     print("[ENRICH] Enriquecimento será implementado via conexão com agente-ia (futuro)")
     print("[ENRICH] Retornando dados sem modificação...")
-    return paints
+    yield from paints
@@ -1,74 +1,181 @@
-from typing import List, Dict, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
 import sys
 import os
+import time
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from app.infrastructure.database.connection import get_db
+from app.infrastructure.config.settings import settings
+from app.infrastructure.database.connection import SessionLocal, get_db
 from app.infrastructure.repositories.paint_repository_impl import PaintRepositoryImpl
-from app.infrastructure.services.embedding_service import EmbeddingService
-from app.application.use_cases.paint_use_cases import create_paint
+from app.infrastructure.repositories.embedding_cache_repository_impl import EmbeddingCacheRepositoryImpl
+from app.infrastructure.services.embedding_service import AsyncEmbeddingService, EmbeddingService
+from app.application.use_cases.paint_use_cases import embed_paints_async, unique_paints, upsert_embedded_paints, upsert_paints
+from pipelines.stream import chunked
 
 
-def load_paints_to_database(paints: List[Dict]) -> Tuple[int, int, List[str], int]:
+def load_paints_to_database(
+    paints: Iterable[Dict],
+    batch_size: Optional[int] = None
+) -> Tuple[int, int, int, List[str], int, int]:
+    """
+    Carrega as tintas com upsert pelo nome normalizado, consumindo o iterável lote a lote.
+    
+    Cada lote (ETL_CHUNK_SIZE tintas) faz uma requisição de embeddings e um
+    INSERT ... ON CONFLICT em uma transação; se falhar, só ele é perdido. Só o
+    lote atual fica em memória: não há leitura da tabela nem conjunto global de
+    nomes, e um nome repetido em lotes diferentes é apenas um upsert sem mudança;
+    repetido no mesmo lote, vale a primeira ocorrência e as demais contam como repetidas.
+    
+    Returns:
+        (criadas, atualizadas, erros, mensagens de erro, sem mudança, repetidas no lote)
+    """
+    batch_size = batch_size or settings.etl.chunk_size
     db = next(get_db())
     repository = PaintRepositoryImpl(db)
     embedding_service = EmbeddingService()
+    # Textos já embeddados (em execuções anteriores ou pela API) não vão à OpenAI
+    embedding_cache = EmbeddingCacheRepositoryImpl(db)
     
     created_count = 0
+    updated_count = 0
     error_count = 0
     errors_list = []
-    skipped_count = 0
+    unchanged_count = 0
+    duplicate_count = 0
+    processed_count = 0
+    
+    start = time.perf_counter()
+    try:
+        for batch in chunked(paints, batch_size):
+            try:
+                unique_batch = unique_paints(batch)
+                created, updated = upsert_paints(
+                    repository=repository,
+                    paints=unique_batch,
+                    embedding_service=embedding_service,
+                    embedding_cache=embedding_cache
+                )
+                created_count += len(created)
+                updated_count += len(updated)
+                unchanged_count += len(unique_batch) - len(created) - len(updated)
+                duplicate_count += len(batch) - len(unique_batch)
+                processed_count += len(batch)
+                rate = processed_count / (time.perf_counter() - start)
+                print(f"   [{processed_count}] {batch[-1]['name']} - {batch[-1]['color']} ({rate:.1f} tintas/s)")
+                
+            except Exception as e:
+                db.rollback()
+                error_count += len(batch)
+                for paint_data in batch[:max(0, settings.etl.max_error_messages - len(errors_list))]:
+                    errors_list.append(f"'{paint_data['name']}': {str(e)}")
+    finally:
+        db.close()
     
-    existing_paints = repository.get_all(skip=0, limit=10000)
-    existing_names = {p.name.lower().strip() for p in existing_paints}
+    elapsed = time.perf_counter() - start
+    if processed_count:
+        print(f"   {processed_count} tintas em {elapsed:.1f}s ({processed_count / elapsed:.1f} tintas/s)")
+    
+    return created_count, updated_count, error_count, errors_list, unchanged_count, duplicate_count
+
+
+async def load_paints_to_database_async(
+    paints: Iterable[Dict],
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None
+) -> Tuple[int, int, int, List[str], int, int]:
+    """
+    Versão assíncrona de load_paints_to_database: sobrepõe embeddings e gravação.
     
-    seen_in_batch = set()
-    unique_paints = []
-    for paint_data in paints:
-        paint_name_lower = paint_data["name"].lower().strip()
-        if paint_name_lower not in seen_in_batch:
-            seen_in_batch.add(paint_name_lower)
-            unique_paints.append(paint_data)
+    Um produtor lê o iterável em lotes e os coloca em uma fila; `concurrency`
+    tarefas geram os embeddings dos lotes ao mesmo tempo e passam o resultado
+    por uma segunda fila a um único escritor, que grava cada lote (upsert, uma
+    transação) em uma thread. As filas têm tamanho `concurrency`: se o escritor
+    ou o provedor atrasar, o produtor espera (back-pressure) e no máximo
+    ~3 x concurrency lotes ficam em memória. O tempo total fica próximo ao da
+    etapa mais lenta, não à soma das latências.
     
-    print(f"   [{len(unique_paints)}] tintas únicas para processar (removidas {len(paints) - len(unique_paints)} duplicatas do batch)")
+    Returns:
+        (criadas, atualizadas, erros, mensagens de erro, sem mudança, repetidas no lote)
+    """
+    batch_size = batch_size or settings.etl.chunk_size
+    concurrency = concurrency or settings.etl.concurrency
+    embedding_service = AsyncEmbeddingService()
+    embed_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    write_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    stats = {"created": 0, "updated": 0, "errors": 0, "unchanged": 0, "duplicates": 0, "processed": 0}
+    errors_list: List[str] = []
+    start = time.perf_counter()
     
-    for paint_data in unique_paints:
+    def record_error(batch: List[Dict], error: Exception) -> None:
+        stats["errors"] += len(batch)
+        for paint_data in batch[:max(0, settings.etl.max_error_messages - len(errors_list))]:
+            errors_list.append(f"'{paint_data['name']}': {str(error)}")
+    
+    async def produce() -> None:
+        for batch in chunked(paints, batch_size):
+            await embed_queue.put(batch)
+        for _ in range(concurrency):
+            await embed_queue.put(None)
+        await asyncio.gather(*embedders)
+        await write_queue.put(None)
+    
+    async def embed() -> None:
+        # Sessão própria por tarefa: o cache é consultado em threads, em paralelo ao escritor
+        db = SessionLocal()
         try:
-            paint_name_lower = paint_data["name"].lower().strip()
-            
-            if paint_name_lower in existing_names:
-                skipped_count += 1
-                continue
-            
-            paint = create_paint(
-                repository=repository,
-                name=paint_data["name"],
-                color=paint_data["color"],
-                surface_type=paint_data["surface_type"],
-                environment=paint_data["environment"],
-                finish_type=paint_data["finish_type"],
-                features=paint_data["features"],
-                line=paint_data["line"],
-                embedding_service=embedding_service
-            )
-            
-            existing_names.add(paint.name.lower().strip())
-            created_count += 1
-            
-            if created_count % 10 == 0 or created_count == len(unique_paints):
-                print(f"   [{created_count}/{len(unique_paints)}] {paint_data['name']} - {paint_data['color']}")
-            
-        except ValueError as e:
-            error_count += 1
-            error_msg = f"'{paint_data['name']}': {str(e)}"
-            errors_list.append(error_msg)
-            
-        except Exception as e:
-            error_count += 1
-            error_msg = f"'{paint_data['name']}': {str(e)}"
-            errors_list.append(error_msg)
+            embedding_cache = EmbeddingCacheRepositoryImpl(db)
+            while (batch := await embed_queue.get()) is not None:
+                try:
+                    unique_batch, embeddings = await embed_paints_async(embedding_service, batch, embedding_cache)
+                except Exception as e:
+                    await asyncio.to_thread(db.rollback)
+                    record_error(batch, e)
+                    continue
+                await write_queue.put((batch, unique_batch, embeddings))
+        finally:
+            await asyncio.to_thread(db.close)
+    
+    async def write() -> None:
+        db = SessionLocal()
+        try:
+            repository = PaintRepositoryImpl(db)
+            while (item := await write_queue.get()) is not None:
+                batch, unique_batch, embeddings = item
+                try:
+                    created, updated = await asyncio.to_thread(
+                        upsert_embedded_paints, repository, unique_batch, embeddings
+                    )
+                except Exception as e:
+                    await asyncio.to_thread(db.rollback)
+                    record_error(batch, e)
+                    continue
+                stats["created"] += len(created)
+                stats["updated"] += len(updated)
+                stats["unchanged"] += len(unique_batch) - len(created) - len(updated)
+                stats["duplicates"] += len(batch) - len(unique_batch)
+                stats["processed"] += len(batch)
+                rate = stats["processed"] / (time.perf_counter() - start)
+                print(f"   [{stats['processed']}] {batch[-1]['name']} - {batch[-1]['color']} ({rate:.1f} tintas/s)")
+        finally:
+            await asyncio.to_thread(db.close)
+    
+    writer = asyncio.create_task(write())
+    embedders = [asyncio.create_task(embed()) for _ in range(concurrency)]
+    producer = asyncio.create_task(produce())
+    tasks = [producer, *embedders, writer]
+    try:
+        # Uma falha inesperada em qualquer etapa interrompe as outras (nenhuma fica presa em uma fila cheia)
+        await asyncio.gather(producer, writer)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
     
-    db.close()
+    elapsed = time.perf_counter() - start
+    if stats["processed"]:
+        print(f"   {stats['processed']} tintas em {elapsed:.1f}s ({stats['processed'] / elapsed:.1f} tintas/s)")
     
-    return created_count, error_count, errors_list, skipped_count
+    return stats["created"], stats["updated"], stats["errors"], errors_list, stats["unchanged"], stats["duplicates"]
@@ -1,11 +1,43 @@
-from typing import Dict
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
 from .extract import extract_suvinil_paints
 from .transform import transform_paints_data, validate_paint_data
 from .enrich import enrich_paints_with_ai
-from .load import load_paints_to_database
+from .load import load_paints_to_database, load_paints_to_database_async
+from .stream import counted
+from app.infrastructure.config.settings import settings
 
 
-def run_etl_pipeline() -> Dict:
+def run_etl_pipeline(chunk_size: Optional[int] = None) -> Dict:
+    """
+    Executa o ETL em streaming: transform, enrich, validação e load são geradores
+    encadeados, consumidos pelo load em lotes de chunk_size (padrão ETL_CHUNK_SIZE)
+    com um commit por lote. O pico de memória é o de um lote, qualquer que seja
+    o tamanho do catálogo (produtos x cores).
+    """
+    chunk_size = chunk_size or settings.etl.chunk_size
+    raw_data, counts, valid_paints = _start(chunk_size)
+    created, updated, errors, error_list, skipped, duplicates = load_paints_to_database(valid_paints, batch_size=chunk_size)
+    return _report(raw_data, counts, created, updated, errors, error_list, skipped, duplicates)
+
+
+async def run_etl_pipeline_async(chunk_size: Optional[int] = None, concurrency: Optional[int] = None) -> Dict:
+    """
+    Versão assíncrona de run_etl_pipeline: até concurrency (padrão ETL_CONCURRENCY)
+    lotes geram embeddings ao mesmo tempo enquanto um escritor grava os prontos,
+    com filas limitadas entre as etapas (back-pressure).
+    """
+    chunk_size = chunk_size or settings.etl.chunk_size
+    concurrency = concurrency or settings.etl.concurrency
+    raw_data, counts, valid_paints = _start(chunk_size, concurrency)
+    created, updated, errors, error_list, skipped, duplicates = await load_paints_to_database_async(
+        valid_paints, batch_size=chunk_size, concurrency=concurrency
+    )
+    return _report(raw_data, counts, created, updated, errors, error_list, skipped, duplicates)
+
+
+def _start(chunk_size: int, concurrency: int = 1):
+    """Extrai os dados e monta as etapas encadeadas (ainda não consumidas)"""
     print("=" * 60)
     print("ETL PIPELINE - TINTAS SUVINIL")
     print("=" * 60)
@@ -15,28 +47,38 @@ def run_etl_pipeline() -> Dict:
     print(f"   [{len(raw_data['products'])}] produtos base")
     print(f"   [{len(raw_data['colors'])}] cores disponíveis")
     
-    print("\n[TRANSFORM] Criando variações...")
-    transformed_paints = transform_paints_data(raw_data)
-    print(f"   [{len(transformed_paints)}] variações criadas")
-    
-    print("\n[ENRICH] Enriquecendo com IA...")
-    enriched_paints = enrich_paints_with_ai(transformed_paints)
-    print(f"   [{len(enriched_paints)}] variações após enriquecimento")
-    
-    valid_paints = [p for p in enriched_paints if validate_paint_data(p)]
-    print(f"   [{len(valid_paints)}] tintas válidas")
-    
-    print("\n[LOAD] Carregando no banco...")
-    created, errors, error_list, skipped = load_paints_to_database(valid_paints)
+    # Nada é processado até o load pedir o próximo lote; as contagens avançam junto
+    counts: Counter = Counter()
+    transformed_paints = counted(transform_paints_data(raw_data), counts, "transformed")
+    enriched_paints = counted(enrich_paints_with_ai(transformed_paints), counts, "enriched")
+    valid_paints: Iterator[Dict] = counted(filter(validate_paint_data, enriched_paints), counts, "valid")
     
+    parallel = f", {concurrency} em paralelo" if concurrency > 1 else ""
+    print(f"\n[TRANSFORM -> ENRICH -> LOAD] Processando em lotes de {chunk_size}{parallel}...")
+    return raw_data, counts, valid_paints
+
+
+def _report(
+    raw_data: Dict,
+    counts: Counter,
+    created: int,
+    updated: int,
+    errors: int,
+    error_list: List[str],
+    skipped: int,
+    duplicates: int
+) -> Dict:
     print("\n" + "=" * 60)
     print("ETL CONCLUÍDO")
     print("=" * 60)
     print("Estatísticas:")
     print(f"  - Extraídos: {len(raw_data['products'])} produtos base")
-    print(f"  - Transformados: {len(transformed_paints)} variações")
+    print(f"  - Transformados: {counts['transformed']} variações")
+    print(f"  - Válidas: {counts['valid']} (descartadas: {counts['enriched'] - counts['valid']})")
     print(f"  - Criadas: {created}")
-    print(f"  - Já existentes: {skipped}")
+    print(f"  - Atualizadas: {updated}")
+    print(f"  - Já existentes (sem mudança): {skipped}")
+    print(f"  - Nomes repetidos no mesmo lote (ignorados): {duplicates}")
     print(f"  - Erros: {errors}")
     
     if errors > 0 and error_list:
@@ -46,8 +88,11 @@ def run_etl_pipeline() -> Dict:
     
     return {
         "extracted": len(raw_data['products']),
-        "transformed": len(transformed_paints),
+        "transformed": counts["transformed"],
+        "valid": counts["valid"],
         "created": created,
+        "updated": updated,
         "skipped": skipped,
+        "duplicates": duplicates,
         "errors": errors
     }
@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import os
 
@@ -6,11 +7,16 @@ load_dotenv()
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from pipelines.pipeline import run_etl_pipeline
+from app.infrastructure.config.settings import settings
+from pipelines.pipeline import run_etl_pipeline, run_etl_pipeline_async
 
 if __name__ == "__main__":
     try:
-        results = run_etl_pipeline()
+        # ETL_CONCURRENCY > 1: embeddings de vários lotes em paralelo com a gravação
+        if settings.etl.concurrency > 1:
+            results = asyncio.run(run_etl_pipeline_async())
+        else:
+            results = run_etl_pipeline()
         
         if results["errors"] > 0:
             sys.exit(1)
@@ -0,0 +1,26 @@
+from collections import Counter
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Agrupa um iterável em listas de até size itens, sem materializar o restante"""
+    if size < 1:
+        raise ValueError("size deve ser maior que zero")
+    chunk: List[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def counted(items: Iterable[T], counts: Counter, key: str) -> Iterator[T]:
+    """Repassa os itens contando em counts[key] quantos passaram pela etapa"""
+    for item in items:
+        counts[key] += 1
+        yield item
+
@@ -1,12 +1,11 @@
-from typing import List, Dict
+from typing import Dict, Iterator
 
 
-def transform_paints_data(raw_data: Dict) -> List[Dict]:
+def transform_paints_data(raw_data: Dict) -> Iterator[Dict]:
+    """Gera as variações (produto x cor) uma a uma, sem montar a lista completa"""
     products = raw_data["products"]
     colors = raw_data["colors"]
     
-    transformed_paints = []
-    
     for product in products:
         if product["line"] == "Premium":
             product_colors = colors
@@ -34,9 +33,7 @@ def transform_paints_data(raw_data: Dict) -> List[Dict]:
                 "line": product["line"]
             }
             
-            transformed_paints.append(transformed_paint)
-    
-    return transformed_paints
+            yield transformed_paint
 
 
 def validate_paint_data(paint: Dict) -> bool:
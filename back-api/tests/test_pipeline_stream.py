@@ -0,0 +1,43 @@
+from collections import Counter
+from itertools import count, islice
+
+import pytest
+
+from pipelines.stream import chunked, counted
+
+
+def test_chunked_agrupa_com_o_ultimo_lote_parcial():
+    assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunked([], 3)) == []
+    assert list(chunked(range(3), 3)) == [[0, 1, 2]]
+
+
+def test_chunked_nao_consome_alem_do_lote_atual():
+    consumed = []
+
+    def source():
+        for item in count():
+            consumed.append(item)
+            yield item
+
+    chunks = chunked(source(), 2)
+    assert next(chunks) == [0, 1]
+    assert consumed == [0, 1]
+    # Funciona com iteráveis infinitos
+    assert list(islice(chunks, 2)) == [[2, 3], [4, 5]]
+
+
+def test_chunked_rejeita_tamanho_invalido():
+    with pytest.raises(ValueError):
+        list(chunked(range(3), 0))
+
+
+def test_counted_conta_o_que_passou_pela_etapa():
+    counts = Counter()
+    stage = counted(range(5), counts, "lidas")
+    assert counts["lidas"] == 0
+    assert list(islice(stage, 2)) == [0, 1]
+    assert counts["lidas"] == 2
+    evens = counted((item for item in stage if item % 2 == 0), counts, "pares")
+    assert list(evens) == [2, 4]
+    assert counts == Counter({"lidas": 5, "pares": 2})
@@ -0,0 +1,31 @@
+"""
+Worker do outbox de embeddings em processo dedicado.
+
+Usado com EMBEDDING_WORKER=false nas instâncias da API; várias cópias podem rodar
+juntas (as tintas são reivindicadas com FOR UPDATE SKIP LOCKED + lease).
+
+Uso:
+    python worker.py
+"""
+import asyncio
+import logging
+import sys
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.infrastructure.config.settings import settings
+from app.infrastructure.services.embedding_worker import create_embedding_worker
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if not settings.embedding.outbox:
+        print("[ERRO] EMBEDDING_OUTBOX=false: os embeddings são gerados na requisição, não há fila para o worker")
+        sys.exit(1)
+    try:
+        asyncio.run(create_embedding_worker().run())
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(f"[ERRO] {e}")
+        sys.exit(1)